@@ -0,0 +1,66 @@
+import threading
+import time
+
+from common.blockchain_util import BlockChainUtil
+
+DEFAULT_MAX_STALENESS = 3
+REFRESH_WAIT_TIMEOUT = 10
+
+
+class BlockHeightCache(object):
+    """
+        Process wide view of the current block number.
+        A read returns the cached height while it is younger than `max_staleness` seconds, otherwise a single
+        caller refreshes it from the node. Concurrent readers get the stale height meanwhile instead of issuing
+        their own call, until there is a first height they wait for the refresh at most `REFRESH_WAIT_TIMEOUT`
+        seconds before they fetch it themselves, so a hung node does not block every reader of the process.
+    """
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, fetch_block_number, max_staleness=DEFAULT_MAX_STALENESS):
+        self._fetch_block_number = fetch_block_number
+        self.max_staleness = max_staleness
+        self._block_number = None
+        self._fetched_at = None
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def for_provider(cls, provider_type, provider, max_staleness=DEFAULT_MAX_STALENESS):
+        """ Returns the cache shared by every caller of the same node, creating it and its provider on first use. """
+        key = (provider_type, provider)
+        with cls._caches_lock:
+            cache = cls._caches.get(key, None)
+            if cache is None:
+                blockchain_util = BlockChainUtil(provider_type=provider_type, provider=provider)
+                cache = cls(lambda: blockchain_util.get_current_block_no(), max_staleness=max_staleness)
+                cls._caches[key] = cache
+            return cache
+
+    def get_block_number(self):
+        if self._is_fresh():
+            return self._block_number
+        refreshing = self._refresh_lock.acquire(blocking=False)
+        if not refreshing and self._block_number is not None:
+            return self._block_number
+        if not refreshing:
+            refreshing = self._refresh_lock.acquire(timeout=REFRESH_WAIT_TIMEOUT)
+        try:
+            if refreshing and self._is_fresh():
+                return self._block_number
+            return self._refresh()
+        finally:
+            if refreshing:
+                self._refresh_lock.release()
+
+    def _is_fresh(self):
+        fetched_at = self._fetched_at
+        return fetched_at is not None and time.monotonic() - fetched_at < self.max_staleness
+
+    def _refresh(self):
+        block_number = self._fetch_block_number()
+        # the chain never moves backwards, ignore a lagging node behind a load balancer
+        if self._block_number is None or block_number > self._block_number:
+            self._block_number = block_number
+        self._fetched_at = time.monotonic()
+        return self._block_number
@@ -1,4 +1,5 @@
 import json
+import threading
 import uuid
 from enum import Enum
 
@@ -18,6 +19,11 @@ class ContractType(Enum):
 
 
 class BlockChainUtil(object):
+    # parsed contract json and checksum addresses are shared by every instance of the process, contract objects
+    # are bound to the web3 object that builds them and are cached per instance
+    _contract_json_cache = {}
+    _contract_address_cache = {}
+    _contract_cache_lock = threading.Lock()
 
     def __init__(self, provider_type, provider):
         if provider_type == "HTTP_PROVIDER":
@@ -27,29 +33,46 @@ class BlockChainUtil(object):
         else:
             raise Exception("Only HTTP_PROVIDER and WS_PROVIDER provider type are supported.")
         self.web3_object = Web3(self.provider)
+        self._contract_instance_cache = {}
 
     def load_contract(self, path):
-        with open(path) as f:
-            contract = json.load(f)
+        contract = BlockChainUtil._contract_json_cache.get(path, None)
+        if contract is None:
+            with open(path) as f:
+                contract = json.load(f)
+            with BlockChainUtil._contract_cache_lock:
+                BlockChainUtil._contract_json_cache[path] = contract
         return contract
 
     def read_contract_address(self, net_id, path, key):
-        contract = self.load_contract(path)
-        return Web3.toChecksumAddress(contract[str(net_id)][key])
+        cache_key = (path, str(net_id), key)
+        contract_address = BlockChainUtil._contract_address_cache.get(cache_key, None)
+        if contract_address is None:
+            contract = self.load_contract(path)
+            contract_address = Web3.toChecksumAddress(contract[str(net_id)][key])
+            with BlockChainUtil._contract_cache_lock:
+                BlockChainUtil._contract_address_cache[cache_key] = contract_address
+        return contract_address
 
     def contract_instance(self, contract_abi, address):
         return self.web3_object.eth.contract(abi=contract_abi, address=address)
 
+    def _get_cached_contract_instance(self, abi_path, address_path, net_id):
+        """ Contract objects make their calls through the web3 object that built them, so they are not shared. """
+        cache_key = (abi_path, address_path, str(net_id))
+        contract_instance = self._contract_instance_cache.get(cache_key, None)
+        if contract_instance is None:
+            contract_address = self.read_contract_address(net_id=net_id, path=address_path, key='address')
+            contract_abi = self.load_contract(abi_path)
+            logger.debug(f"contract address is {contract_address}")
+            contract_instance = self.contract_instance(contract_abi=contract_abi, address=contract_address)
+            self._contract_instance_cache[cache_key] = contract_instance
+        return contract_instance
+
     def get_contract_instance(self, base_path, contract_name, net_id):
         contract_network_path, contract_abi_path = self.get_contract_file_paths(base_path, contract_name)
-
-        contract_address = self.read_contract_address(net_id=net_id, path=contract_network_path,
-                                                      key='address')
-        contract_abi = self.load_contract(contract_abi_path)
-        logger.debug(f"contract address is {contract_address}")
-        contract_instance = self.contract_instance(contract_abi=contract_abi, address=contract_address)
-
-        return contract_instance
+        return self._get_cached_contract_instance(abi_path=contract_abi_path, address_path=contract_network_path,
+                                                  net_id=net_id)
 
     def generate_signature(self, data_types, values, signer_key):
         signer_key = "0x" + signer_key if not signer_key.startswith("0x") else signer_key
@@ -74,13 +97,12 @@ class BlockChainUtil(object):
     def create_transaction_object(self, *positional_inputs, method_name, address, contract_path, contract_address_path,
                                   net_id):
         nonce = self.get_nonce(address=address)
-        self.contract = self.load_contract(path=contract_path)
-        self.contract_address = self.read_contract_address(net_id=net_id, path=contract_address_path, key='address')
-        self.contract_instance = self.contract_instance(contract_abi=self.contract, address=self.contract_address)
+        contract_instance = self._get_cached_contract_instance(abi_path=contract_path,
+                                                               address_path=contract_address_path, net_id=net_id)
         print("gas_price == ", self.web3_object.eth.gasPrice)
         print("nonce == ", nonce)
         gas_price = 3 * (self.web3_object.eth.gasPrice)
-        transaction_object = getattr(self.contract_instance.functions, method_name)(
+        transaction_object = getattr(contract_instance.functions, method_name)(
             *positional_inputs).buildTransaction({
             "from": address,
             "nonce": nonce,
@@ -99,6 +121,10 @@ class BlockChainUtil(object):
     def get_current_block_no(self):
         return self.web3_object.eth.blockNumber
 
+    def get_logs(self, address, from_block, to_block, topics):
+        return self.web3_object.eth.getLogs({"address": address, "fromBlock": from_block, "toBlock": to_block,
+                                             "topics": topics})
+
     def get_transaction_receipt_from_blockchain(self, transaction_hash):
         return self.web3_object.eth.getTransactionReceipt(transaction_hash)
 
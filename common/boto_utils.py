@@ -1,30 +1,74 @@
 import json
+import threading
+import time
 
 import boto3
 from botocore.config import Config
 
+from common.lambda_transport import LocalLambdaClient, is_local_dispatch
+
+DEFAULT_CLIENT_CONFIG = Config(max_pool_connections=50)
+SSM_PARAMETER_CACHE_TTL = 300
+
 
 class BotoUtils:
+    """
+        Clients are created once per (service, region, config) and shared by every BotoUtils of the process,
+        so credential and endpoint resolution and the HTTP connection pool survive across calls and warm invocations.
+    """
+    _clients = {}
+    _clients_lock = threading.Lock()
+    _ssm_parameter_cache = {}
+
     def __init__(self, region_name):
         self.region_name = region_name
 
-    def get_ssm_parameter(self, parameter, config=Config(retries={'max_attempts': 1})):
-        """ Format config=Config(connect_timeout=1, read_timeout=0.1, retries={'max_attempts': 1}) """
-        ssm = boto3.client('ssm', region_name=self.region_name, config=config)
-        parameter = ssm.get_parameter(Name=parameter, WithDecryption=True)
-        return parameter["Parameter"]["Value"]
+    @classmethod
+    def get_client(cls, service_name, region_name=None, config=None):
+        if service_name == 'lambda' and is_local_dispatch():
+            return LocalLambdaClient.get_instance()
+        client_config = DEFAULT_CLIENT_CONFIG.merge(config) if config is not None else DEFAULT_CLIENT_CONFIG
+        cache_key = (service_name, region_name, cls.__get_config_key(client_config))
+        client = cls._clients.get(cache_key, None)
+        if client is None:
+            # client creation through the default session is not thread safe, the clients themselves are
+            with cls._clients_lock:
+                client = cls._clients.get(cache_key, None)
+                if client is None:
+                    client = boto3.client(service_name, region_name=region_name, config=client_config)
+                    cls._clients[cache_key] = client
+        return client
+
+    @staticmethod
+    def __get_config_key(config):
+        return tuple(sorted((option, repr(value)) for option, value in config._user_provided_options.items()))
+
+    def get_ssm_parameter(self, parameter, config=Config(retries={'max_attempts': 1}),
+                          cache_ttl=SSM_PARAMETER_CACHE_TTL):
+        """
+            Format config=Config(connect_timeout=1, read_timeout=0.1, retries={'max_attempts': 1})
+            Values are cached for cache_ttl seconds, pass cache_ttl=0 to always read the parameter store.
+        """
+        cache_key = (self.region_name, parameter)
+        cached_parameter = BotoUtils._ssm_parameter_cache.get(cache_key, None)
+        if cached_parameter is not None and time.monotonic() - cached_parameter[1] < cache_ttl:
+            return cached_parameter[0]
+        ssm = self.get_client('ssm', region_name=self.region_name, config=config)
+        parameter_value = ssm.get_parameter(Name=parameter, WithDecryption=True)["Parameter"]["Value"]
+        BotoUtils._ssm_parameter_cache[cache_key] = (parameter_value, time.monotonic())
+        return parameter_value
 
     def invoke_lambda(self, lambda_function_arn, invocation_type, payload, config=Config(retries={'max_attempts': 1})):
         """ Format config=Config(connect_timeout=1, read_timeout=0.1, retries={'max_attempts': 1}) """
-        lambda_client = boto3.client('lambda', region_name=self.region_name, config=config)
+        lambda_client = self.get_client('lambda', region_name=self.region_name, config=config)
         lambda_response = lambda_client.invoke(FunctionName=lambda_function_arn, InvocationType=invocation_type,
                                                Payload=payload)
         return json.loads(lambda_response.get('Payload').read())
 
     def s3_upload_file(self, filename, bucket, key):
-        s3_client = boto3.client('s3')
+        s3_client = self.get_client('s3')
         s3_client.upload_file(filename, bucket, key)
 
     def s3_download_file(self, bucket, key, filename):
-        s3_client = boto3.client('s3')
+        s3_client = self.get_client('s3')
         s3_client.download_file(bucket, key, filename)
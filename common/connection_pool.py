@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PooledConnection(object):
+
+    def __init__(self, raw_connection):
+        self.raw_connection = raw_connection
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+    def age(self, now):
+        return now - self.created_at
+
+    def idle_time(self, now):
+        return now - self.last_used_at
+
+
+class ConnectionPool(object):
+    """
+        Bounded, thread safe pool of DB-API connections.
+        Connections are validated on borrow when they have been idle for more than `validation_interval`
+        seconds, evicted after `idle_timeout` seconds of inactivity and recycled after `max_lifetime` seconds.
+    """
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, connect, max_size=5, borrow_timeout=30, idle_timeout=300, max_lifetime=3600,
+                 validation_interval=5):
+        self._connect = connect
+        self.max_size = max_size
+        self.borrow_timeout = borrow_timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.validation_interval = validation_interval
+        self._idle = deque()
+        self._size = 0
+        self._condition = threading.Condition(threading.Lock())
+
+    @classmethod
+    def get_pool(cls, key, connect, **pool_config):
+        """ Returns the process wide pool registered for `key`, creating it on first use. """
+        with cls._pools_lock:
+            pool = cls._pools.get(key, None)
+            if pool is None:
+                pool = cls(connect, **pool_config)
+                cls._pools[key] = pool
+            return pool
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def borrow(self):
+        deadline = time.monotonic() + self.borrow_timeout
+        while True:
+            connection = self._take_idle_or_reserve(deadline)
+            if connection is None:
+                return self._open()
+            if self._is_usable(connection):
+                return connection
+            self._discard(connection)
+
+    def release(self, connection, discard=False):
+        now = time.monotonic()
+        if discard or connection.age(now) >= self.max_lifetime:
+            self._discard(connection)
+            return
+        connection.last_used_at = now
+        with self._condition:
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        expired = []
+        with self._condition:
+            for connection in list(self._idle):
+                if connection.idle_time(now) >= self.idle_timeout or connection.age(now) >= self.max_lifetime:
+                    self._idle.remove(connection)
+                    expired.append(connection)
+        for connection in expired:
+            self._discard(connection)
+        return len(expired)
+
+    def close_all(self):
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+        for connection in idle:
+            self._discard(connection)
+
+    def _take_idle_or_reserve(self, deadline):
+        """ Returns an idle connection, or None once a slot for a new connection has been reserved. """
+        self.evict_idle()
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for a connection, pool size {self.max_size}")
+                self._condition.wait(remaining)
+
+    def _open(self):
+        try:
+            return PooledConnection(self._connect())
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _is_usable(self, connection):
+        now = time.monotonic()
+        if connection.age(now) >= self.max_lifetime:
+            return False
+        if connection.idle_time(now) < self.validation_interval:
+            return True
+        try:
+            connection.raw_connection.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.info(f"Discarding broken connection from pool, error: {repr(e)}")
+            return False
+
+    def _discard(self, connection):
+        try:
+            connection.raw_connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
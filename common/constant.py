@@ -4,6 +4,9 @@ MPE_CNTRCT_PATH = COMMON_CNTRCT_PATH + '/abi/MultiPartyEscrow.json'
 REG_ADDR_PATH = COMMON_CNTRCT_PATH + '/networks/Registry.json'
 MPE_ADDR_PATH = COMMON_CNTRCT_PATH + '/networks/MultiPartyEscrow.json'
 
+# seconds the server waits on a slow reader of a streamed result set before it drops the connection
+STREAM_NET_WRITE_TIMEOUT = 600
+
 """ Payment Service """
 PAYMENT_METHOD_PAYPAL = "paypal"
 
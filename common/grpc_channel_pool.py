@@ -0,0 +1,76 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+import grpc
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# daemons built on grpc-go answer pings more frequent than every 5 minutes, or pings without active calls, with
+# GOAWAY too_many_pings, idle channels are closed by the pool instead of being kept alive
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 300000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 0)
+]
+
+
+class GrpcChannelPool(object):
+    """
+        Keeps one gRPC channel per daemon endpoint, so calls to the same daemon share a single HTTP/2
+        connection. Channels not used for `idle_timeout` seconds are closed on the next lookup.
+    """
+
+    def __init__(self, idle_timeout=600, options=None):
+        self.idle_timeout = idle_timeout
+        self.options = options if options is not None else KEEPALIVE_OPTIONS
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def get_channel(self, endpoint):
+        """ endpoint is a daemon url like https://host:port, the scheme decides between a secure and insecure channel. """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            channel_entry = self._channels.get(endpoint, None)
+            if channel_entry is None:
+                channel_entry = [self._open(endpoint), now]
+                self._channels[endpoint] = channel_entry
+            channel_entry[1] = now
+            return channel_entry[0]
+
+    def discard(self, endpoint):
+        """ Closes the channel of the endpoint, used after a call failed so the next call reconnects. """
+        with self._lock:
+            channel_entry = self._channels.pop(endpoint, None)
+        if channel_entry is not None:
+            channel_entry[0].close()
+
+    def close_all(self):
+        with self._lock:
+            channel_entries = list(self._channels.values())
+            self._channels = {}
+        for channel_entry in channel_entries:
+            channel_entry[0].close()
+
+    def _open(self, endpoint):
+        endpoint_object = urlparse(endpoint)
+        if endpoint_object.port is not None:
+            channel_endpoint = endpoint_object.hostname + ":" + str(endpoint_object.port)
+        else:
+            channel_endpoint = endpoint_object.hostname
+
+        if endpoint_object.scheme == "http":
+            return grpc.insecure_channel(channel_endpoint, options=self.options)
+        elif endpoint_object.scheme == "https":
+            return grpc.secure_channel(channel_endpoint, grpc.ssl_channel_credentials(), options=self.options)
+        raise ValueError('Unsupported scheme in service metadata ("{}")'.format(endpoint_object.scheme))
+
+    def _evict_idle(self, now):
+        for endpoint, channel_entry in list(self._channels.items()):
+            if now - channel_entry[1] >= self.idle_timeout:
+                del self._channels[endpoint]
+                logger.info(f"Closing idle grpc channel for {endpoint}")
+                channel_entry[0].close()
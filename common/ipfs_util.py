@@ -1,20 +1,243 @@
+import hashlib
 import ipfsapi
 import io
 import logging
 import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+IPFS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+IPFS_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+
+
+class ChunkedStream(io.RawIOBase):
+    """
+        Read only file object over an iterator of byte chunks, holds at most one chunk in memory besides the buffer
+        read into. read(n) fills up to n bytes before it returns, as s3transfer takes a short read of a non seekable
+        stream for its end and would upload it in one PutObject.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b""
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        filled = 0
+        while filled < len(buffer):
+            if not self._pending:
+                try:
+                    self._pending = memoryview(next(self._chunks))
+                except StopIteration:
+                    break
+                continue
+            size = min(len(buffer) - filled, len(self._pending))
+            buffer[filled:filled + size] = self._pending[:size]
+            self._pending = self._pending[size:]
+            filled += size
+        self.bytes_read += filled
+        return filled
+
+
+class IPFSContentCache(object):
+    """
+        Content read from IPFS never changes for a given hash, so it is cached by hash without expiry.
+        Entries live in a memory LRU bounded by max_bytes and, when disk_dir is set, in files that outlive the LRU
+        (e.g. /tmp of a warm Lambda, or a mounted volume shared by backfill workers).
+    """
+
+    def __init__(self, max_bytes=IPFS_CACHE_MAX_BYTES, max_entry_bytes=IPFS_CACHE_MAX_ENTRY_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, ipfs_hash):
+        with self._lock:
+            content = self._entries.get(ipfs_hash, None)
+            if content is not None:
+                self._entries.move_to_end(ipfs_hash)
+                self._metrics["memory_hits"] += 1
+                return content
+        content = self._read_from_disk(ipfs_hash)
+        with self._lock:
+            if content is None:
+                self._metrics["misses"] += 1
+                return None
+            self._metrics["disk_hits"] += 1
+        self._put_in_memory(ipfs_hash, content)
+        return content
+
+    def open(self, ipfs_hash):
+        """ Like get but returns a file object, so large entries of the disk tier are not loaded into memory. """
+        with self._lock:
+            content = self._entries.get(ipfs_hash, None)
+            if content is not None:
+                self._entries.move_to_end(ipfs_hash)
+                self._metrics["memory_hits"] += 1
+                return io.BytesIO(content)
+        cached_file = self._open_from_disk(ipfs_hash)
+        with self._lock:
+            self._metrics["disk_hits" if cached_file is not None else "misses"] += 1
+        return cached_file
+
+    def put(self, ipfs_hash, content):
+        self._put_in_memory(ipfs_hash, content)
+        self._write_to_disk(ipfs_hash, [content])
+
+    def cache_chunks(self, ipfs_hash, chunks):
+        """ Passes the chunks through and caches the content once all of them were read. """
+        memory_chunks = []
+        size = 0
+        disk_file = self._open_disk_temp_file()
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                if memory_chunks is not None:
+                    memory_chunks.append(chunk)
+                    if size > self.max_entry_bytes:
+                        memory_chunks = None
+                if disk_file is not None:
+                    disk_file = self._write_chunk_to_disk(disk_file, chunk)
+                yield chunk
+        except BaseException:
+            self._discard_disk_temp_file(disk_file)
+            raise
+        if memory_chunks is not None:
+            self._put_in_memory(ipfs_hash, b"".join(memory_chunks))
+        self._commit_disk_temp_file(ipfs_hash, disk_file)
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["size_in_bytes"] = self._size
+            metrics["entries"] = len(self._entries)
+        lookups = metrics["memory_hits"] + metrics["disk_hits"] + metrics["misses"]
+        metrics["hit_ratio"] = (metrics["memory_hits"] + metrics["disk_hits"]) / lookups if lookups else 0.0
+        return metrics
+
+    def _put_in_memory(self, ipfs_hash, content):
+        if len(content) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if ipfs_hash in self._entries:
+                self._entries.move_to_end(ipfs_hash)
+                return
+            self._entries[ipfs_hash] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted_content = self._entries.popitem(last=False)
+                self._size -= len(evicted_content)
+
+    def _get_disk_path(self, ipfs_hash):
+        # hashes may carry a path (QmHash/hero.png), keep file names flat
+        return os.path.join(self.disk_dir, hashlib.sha256(ipfs_hash.encode("utf-8")).hexdigest())
+
+    def _open_from_disk(self, ipfs_hash):
+        if self.disk_dir is None:
+            return None
+        try:
+            return open(self._get_disk_path(ipfs_hash), "rb")
+        except OSError:
+            return None
+
+    def _read_from_disk(self, ipfs_hash):
+        cached_file = self._open_from_disk(ipfs_hash)
+        if cached_file is None:
+            return None
+        with cached_file:
+            return cached_file.read()
+
+    def _write_to_disk(self, ipfs_hash, chunks):
+        disk_file = self._open_disk_temp_file()
+        for chunk in chunks:
+            if disk_file is None:
+                return
+            disk_file = self._write_chunk_to_disk(disk_file, chunk)
+        self._commit_disk_temp_file(ipfs_hash, disk_file)
+
+    def _open_disk_temp_file(self):
+        if self.disk_dir is None:
+            return None
+        try:
+            return tempfile.NamedTemporaryFile(dir=self.disk_dir, delete=False)
+        except OSError as e:
+            logging.warning(f"IPFS disk cache unavailable, error: {repr(e)}")
+            return None
+
+    def _write_chunk_to_disk(self, disk_file, chunk):
+        """ A full disk only turns the disk tier off for this entry, returns None once writing failed. """
+        try:
+            disk_file.write(chunk)
+            return disk_file
+        except OSError as e:
+            logging.warning(f"Failed to write IPFS disk cache entry, error: {repr(e)}")
+            self._discard_disk_temp_file(disk_file)
+            return None
+
+    def _commit_disk_temp_file(self, ipfs_hash, disk_file):
+        if disk_file is None:
+            return
+        try:
+            disk_file.close()
+            # readers never see a partially written entry
+            os.replace(disk_file.name, self._get_disk_path(ipfs_hash))
+        except OSError as e:
+            logging.warning(f"Failed to write IPFS disk cache entry, error: {repr(e)}")
+            self._discard_disk_temp_file(disk_file)
+
+    @staticmethod
+    def _discard_disk_temp_file(disk_file):
+        if disk_file is None:
+            return
+        try:
+            disk_file.close()
+            os.remove(disk_file.name)
+        except OSError:
+            pass
 
 
 class IPFSUtil(object):
+    # shared by every IPFSUtil of the process, IPFS_CACHE_DIR adds the on disk tier
+    _content_cache = IPFSContentCache(disk_dir=os.environ.get("IPFS_CACHE_DIR", None))
 
     def __init__(self, ipfs_url, port):
         self.ipfs_conn = ipfsapi.connect(host=ipfs_url, port=port)
 
+    @classmethod
+    def get_cache_metrics(cls):
+        return cls._content_cache.metrics()
+
+    def read_bytes_from_ipfs(self, ipfs_hash):
+        ipfs_data = self._content_cache.get(ipfs_hash)
+        if ipfs_data is None:
+            ipfs_data = self.ipfs_conn.cat(ipfs_hash)
+            self._content_cache.put(ipfs_hash, ipfs_data)
+        return ipfs_data
+
     def read_bytesio_from_ipfs(self, ipfs_hash):
 
-        ipfs_data = self.ipfs_conn.cat(ipfs_hash)
+        ipfs_data = self.read_bytes_from_ipfs(ipfs_hash)
         f = io.BytesIO(ipfs_data)
         return f
 
+    def read_stream_from_ipfs(self, ipfs_hash):
+        """ Returns a file object that reads the content while it is downloaded instead of buffering all of it. """
+        cached_file = self._content_cache.open(ipfs_hash)
+        if cached_file is not None:
+            return cached_file
+        return ChunkedStream(self._content_cache.cache_chunks(ipfs_hash, self.ipfs_conn.cat(ipfs_hash, stream=True)))
+
     def write_file_in_ipfs(self, filepath, wrap_with_directory=True):
         """
             push a file to ipfs given its path
@@ -32,5 +255,5 @@ class IPFSUtil(object):
 
     def read_file_from_ipfs(self, ipfs_hash):
 
-        ipfs_data = self.ipfs_conn.cat(ipfs_hash)
+        ipfs_data = self.read_bytes_from_ipfs(ipfs_hash)
         return json.loads(ipfs_data.decode('utf8'))
@@ -0,0 +1,38 @@
+import json
+import re
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_DECODE_CACHE_SIZE = 8192
+# orjson turns integers beyond 64 bit into floats, amounts in cogs must keep their precision
+LONG_NUMBER = re.compile(r"\d{19,}")
+
+
+def _decode(text):
+    if orjson is not None and LONG_NUMBER.search(text if isinstance(text, str) else text.decode("utf-8")) is None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the standard decoder, let json.loads decide
+            pass
+    return json.loads(text)
+
+
+@lru_cache(maxsize=JSON_DECODE_CACHE_SIZE)
+def _decode_cached(text):
+    return _decode(text)
+
+
+def loads_cached(text):
+    """
+        json.loads for column values that are rewritten rarely and read on every request, e.g. pricing, payment
+        or assets_url. Decoded values are memoized by their text and shared between callers, so they must be
+        treated as read only.
+    """
+    if isinstance(text, (str, bytes)):
+        return _decode_cached(text)
+    return json.loads(text)
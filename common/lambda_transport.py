@@ -0,0 +1,132 @@
+import importlib
+import io
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+LAMBDA_INVOKE = "lambda"
+LOCAL_DISPATCH = "local"
+LOCAL_EVENT_MAX_WORKERS = 8
+LOCAL_HANDLER_TIMEOUT = 900
+
+
+def get_transport():
+    """ LAMBDA_TRANSPORT=local dispatches inter-service calls to handlers of the current process. """
+    return os.environ.get("LAMBDA_TRANSPORT", LAMBDA_INVOKE)
+
+
+def is_local_dispatch():
+    return get_transport() == LOCAL_DISPATCH
+
+
+def get_lambda_client(region_name=None, config=None):
+    """
+        Returns the client used to call other services, the shared boto3 lambda client of BotoUtils unless local
+        dispatch is enabled.
+    """
+    # boto_utils imports this module, import it on use
+    from common.boto_utils import BotoUtils
+    return BotoUtils.get_client("lambda", region_name=region_name, config=config)
+
+
+class LocalLambdaContext(object):
+
+    def __init__(self, function_name, timeout=LOCAL_HANDLER_TIMEOUT):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self):
+        return max(int((self._deadline - time.monotonic()) * 1000), 0)
+
+
+class LocalLambdaClient(object):
+    """
+        Stand in for the boto3 lambda client that calls the target handler function directly.
+        Routes map a function name or arn to a handler in serverless.yml notation, e.g.
+        {"arn:aws:lambda:...:function:process-order": "orchestrator/order_handler.process"}, and are read from the
+        json file named by LOCAL_LAMBDA_ROUTES or added with register. Events still go through a json round trip so
+        handlers see the same payload they would receive from Lambda, and responses keep the shape of invoke.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, routes=None):
+        self._routes = dict(routes) if routes is not None else {}
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._event_executor = ThreadPoolExecutor(max_workers=LOCAL_EVENT_MAX_WORKERS)
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(routes=cls.__load_routes(os.environ.get("LOCAL_LAMBDA_ROUTES", None)))
+            return cls._instance
+
+    @staticmethod
+    def __load_routes(routes_file):
+        if routes_file is None:
+            return {}
+        with open(routes_file) as routes:
+            return json.load(routes)
+
+    def register(self, function_name, handler):
+        """ handler is either a callable taking (event, context) or its path like contract_api/mpe_handler.get. """
+        with self._lock:
+            self._routes[function_name] = handler
+            self._handlers.pop(function_name, None)
+
+    def invoke(self, FunctionName, InvocationType="RequestResponse", Payload=None, **kwargs):
+        handler = self._get_handler(FunctionName)
+        event = json.loads(Payload) if Payload else {}
+        if InvocationType == "Event":
+            self._event_executor.submit(self._run_handler, FunctionName, handler, event)
+            return {"StatusCode": 202, "Payload": io.BytesIO(b"")}
+        if InvocationType == "DryRun":
+            return {"StatusCode": 204, "Payload": io.BytesIO(b"")}
+        response, function_error = self._run_handler(FunctionName, handler, event)
+        invoke_response = {"StatusCode": 200, "Payload": io.BytesIO(json.dumps(response).encode("utf-8"))}
+        if function_error:
+            invoke_response["FunctionError"] = "Unhandled"
+        return invoke_response
+
+    def _get_handler(self, function_name):
+        with self._lock:
+            handler = self._handlers.get(function_name, None)
+            if handler is not None:
+                return handler
+            route = self._routes.get(function_name, None)
+            if route is None:
+                # callers pass the full arn while routes may only name the function
+                route = self._routes.get(function_name.split(":function:")[-1].split(":")[0], None)
+            if route is None:
+                raise Exception(f"No local handler registered for lambda {function_name}")
+            handler = route if callable(route) else self.__import_handler(route)
+            self._handlers[function_name] = handler
+            return handler
+
+    @staticmethod
+    def __import_handler(handler_path):
+        module_name, function_name = handler_path.replace("/", ".").rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), function_name)
+
+    def _run_handler(self, function_name, handler, event):
+        """ Returns the handler response and whether it failed, a failure is reported like an unhandled Lambda error. """
+        try:
+            return handler(event, LocalLambdaContext(function_name)), False
+        except Exception as e:
+            logger.error(f"Local invocation of {function_name} failed, error: {repr(e)}")
+            return {
+                "errorMessage": str(e),
+                "errorType": type(e).__name__,
+                "stackTrace": traceback.format_exc().splitlines()
+            }, True
@@ -1,8 +1,36 @@
+import threading
+from collections import namedtuple
+
 import pymysql
+from pymysql.cursors import SSCursor
+
+from common.connection_pool import ConnectionPool
+from common.constant import STREAM_NET_WRITE_TIMEOUT
+
+
+def make_row_type(field_names):
+    """ Builds one compact row type per result set; every row shares its column metadata. """
+    row_tuple = namedtuple("Row", field_names, rename=True)
+
+    class Row(row_tuple):
+        __slots__ = ()
+        _index = {name: position for position, name in enumerate(field_names)}
+
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return tuple.__getitem__(self, self._index[key])
+            return tuple.__getitem__(self, key)
+
+        def get(self, key, default=None):
+            position = self._index.get(key, None)
+            if position is None:
+                return default
+            return tuple.__getitem__(self, position)
+
+    return Row
 
 
 class Repository:
-    connection = None
 
     def __init__(self, net_id, NETWORKS):
         self.DB_HOST = NETWORKS[net_id]['db']['DB_HOST']
@@ -10,30 +38,43 @@ class Repository:
         self.DB_PASSWORD = NETWORKS[net_id]['db']['DB_PASSWORD']
         self.DB_NAME = NETWORKS[net_id]['db']['DB_NAME']
         self.DB_PORT = 3306
-        self.connection = self.__get_connection()
+        self.pool = ConnectionPool.get_pool(
+            key=(self.DB_HOST, self.DB_PORT, self.DB_USER, self.DB_NAME), connect=self.__connect,
+            **self.__get_pool_config(NETWORKS[net_id]['db']))
+        self._transaction = threading.local()
         self.auto_commit = True
 
     def execute(self, query, params=None):
         return self.__execute_query(query, params)
 
-    def __get_connection(self):
-        open = True
-        if self.connection is not None:
-            try:
-                self.execute("select 1")
-                open = False
-            except Exception as e:
-                open = True
+    def __get_pool_config(self, db_config):
+        return {
+            "max_size": db_config.get("DB_POOL_SIZE", 5),
+            "borrow_timeout": db_config.get("DB_POOL_BORROW_TIMEOUT", 30),
+            "idle_timeout": db_config.get("DB_POOL_IDLE_TIMEOUT", 300),
+            "max_lifetime": db_config.get("DB_POOL_MAX_LIFETIME", 3600)
+        }
+
+    def __connect(self):
+        return pymysql.connect(self.DB_HOST, user=self.DB_USER,
+                               passwd=self.DB_PASSWORD, db=self.DB_NAME, port=self.DB_PORT)
 
-        if open:
-            self.connection = pymysql.connect(self.DB_HOST, user=self.DB_USER,
-                                              passwd=self.DB_PASSWORD, db=self.DB_NAME, port=self.DB_PORT)
-        return self.connection
+    def __get_transaction_connection(self):
+        return getattr(self._transaction, "connection", None)
+
+    def __borrow(self):
+        """ Returns the connection pinned to the current transaction, or a connection borrowed for one statement. """
+        connection = self.__get_transaction_connection()
+        if connection is not None:
+            return connection, False
+        return self.pool.borrow(), True
 
     def __execute_query(self, query, params=None):
         result = list()
+        connection, borrowed = self.__borrow()
+        discard = False
         try:
-            with self.connection.cursor() as cursor:
+            with connection.raw_connection.cursor() as cursor:
                 qry_resp = cursor.execute(query, params)
                 db_rows = cursor.fetchall()
                 if cursor.description is not None:
@@ -44,30 +85,104 @@ class Repository:
                 else:
                     result.append(qry_resp)
                     result.append({'last_row_id': cursor.lastrowid})
-                if self.auto_commit:
-                    self.connection.commit()
+                if self.auto_commit and borrowed:
+                    connection.raw_connection.commit()
         except Exception as e:
-            self.connection.rollback()
+            discard = self.__rollback(connection)
             print("DB Error in %s, error: %s" % (str(query), repr(e)))
             raise e
+        finally:
+            if borrowed:
+                self.pool.release(connection, discard=discard)
         return result
 
+    def iter_execute(self, query, params=None):
+        """ Lazily yields rows of a server side cursor, see stream. """
+        for batch in self.stream(query, params):
+            for row in batch:
+                yield row
+
+    def stream(self, query, params=None, batch_size=1000, net_write_timeout=STREAM_NET_WRITE_TIMEOUT):
+        """
+            Yields lists of at most batch_size rows read through an unbuffered server side cursor, so large
+            result sets are never held in memory at once. Rows support both row.column and row["column"] access.
+            The stream holds its own pooled connection until it is exhausted or closed, so it does not see
+            uncommitted writes of an open transaction.
+            The server keeps the rest of the result set waiting while the consumer works on a batch and drops
+            the connection once that takes longer than net_write_timeout seconds, so the timeout is raised for
+            the streaming session. Consumers doing slow work per row should collect the rows first.
+        """
+        connection = self.pool.borrow()
+        discard = False
+        try:
+            with connection.raw_connection.cursor() as session_cursor:
+                session_cursor.execute("SET SESSION net_write_timeout = %s", [net_write_timeout])
+            cursor = connection.raw_connection.cursor(SSCursor)
+            cursor.execute(query, params)
+            row_type = make_row_type([field[0] for field in cursor.description])
+            while True:
+                db_rows = cursor.fetchmany(batch_size)
+                if not db_rows:
+                    break
+                yield [row_type._make(values) for values in db_rows]
+            cursor.close()
+            connection.raw_connection.commit()
+        except GeneratorExit:
+            # closing an unbuffered cursor early would drain the remaining rows, drop the connection instead
+            discard = True
+            raise
+        except Exception as e:
+            discard = self.__rollback(connection)
+            print("DB Error in %s, error: %s" % (str(query), repr(e)))
+            raise e
+        finally:
+            self.pool.release(connection, discard=discard)
+
     def bulk_query(self, query, params=None):
+        connection, borrowed = self.__borrow()
+        discard = False
         try:
-            with self.connection.cursor() as cursor:
+            with connection.raw_connection.cursor() as cursor:
                 result = cursor.executemany(query, params)
-                self.connection.commit()
+                if borrowed:
+                    connection.raw_connection.commit()
                 return result
         except Exception as err:
-            self.connection.rollback()
+            discard = self.__rollback(connection)
             print("DB Error in %s, error: %s" % (str(query), repr(err)))
+        finally:
+            if borrowed:
+                self.pool.release(connection, discard=discard)
+
+    def __rollback(self, connection):
+        """ Rolls back the connection and returns True when it is no longer usable. """
+        try:
+            connection.raw_connection.rollback()
+            return False
+        except Exception:
+            return True
 
     def begin_transaction(self):
-        self.connection.begin()
+        connection = self.__get_transaction_connection()
+        if connection is None:
+            connection = self.pool.borrow()
+            self._transaction.connection = connection
+        connection.raw_connection.begin()
 
     def commit_transaction(self):
-        self.connection.commit()
+        connection = self.__get_transaction_connection()
+        if connection is not None:
+            self._transaction.connection = None
+            try:
+                connection.raw_connection.commit()
+            except Exception:
+                self.pool.release(connection, discard=True)
+                raise
+            self.pool.release(connection)
         self.auto_commit = True
 
     def rollback_transaction(self):
-        self.connection.rollback()
+        connection = self.__get_transaction_connection()
+        if connection is not None:
+            self._transaction.connection = None
+            self.pool.release(connection, discard=self.__rollback(connection))
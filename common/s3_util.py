@@ -1,6 +1,18 @@
-import boto3
+import threading
+import time
 from urllib.parse import urlparse
 
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# uploads above 8 MB go through multipart, at most max_concurrency parts are buffered at a time
+STREAMING_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024,
+                                           multipart_chunksize=8 * 1024 * 1024, max_concurrency=4)
+
 # create an STS client object that represents a live connection to the
 # STS service
 
@@ -10,6 +22,8 @@ class S3Util(object):
     def __init__(self, aws_access_key, aws_secrete_key):
         self.aws_access_key = aws_access_key
         self.aws_secrete_key = aws_secrete_key
+        self._s3_client = None
+        self._s3_client_lock = threading.Lock()
 
     def get_s3_resource_from_key(self):
         s3_resource = boto3.resource(
@@ -21,6 +35,17 @@ class S3Util(object):
 
         return s3_resource
 
+    def get_s3_client_from_key(self):
+        """ Returns one client per S3Util, unlike resources a client can be shared by concurrent transfers. """
+        with self._s3_client_lock:
+            if self._s3_client is None:
+                self._s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=self.aws_access_key,
+                    aws_secret_access_key=self.aws_secrete_key
+                )
+            return self._s3_client
+
     def get_s3_resource_from_assumed_role(self):
         sts_client = boto3.client('sts')
 
@@ -56,10 +81,21 @@ class S3Util(object):
             print(bucket.name)
 
     def push_io_bytes_to_s3(self, key, bucket_name, io_bytes):
+        """ io_bytes may be any readable file object, e.g. a stream from IPFSUtil.read_stream_from_ipfs. """
         s3_url = 'https://{}.s3.amazonaws.com/{}'.format(bucket_name, key)
-        s3_resource = self.get_s3_resource_from_key()
-        object = s3_resource.Object(bucket_name, key)
-        result = object.upload_fileobj(io_bytes)
+        transferred_bytes = [0]
+        lock = threading.Lock()
+
+        def count_transferred_bytes(bytes_amount):
+            with lock:
+                transferred_bytes[0] += bytes_amount
+
+        started_at = time.monotonic()
+        self.get_s3_client_from_key().upload_fileobj(io_bytes, bucket_name, key, Config=STREAMING_TRANSFER_CONFIG,
+                                                     Callback=count_transferred_bytes)
+        elapsed_time = max(time.monotonic() - started_at, 1e-6)
+        logger.info(f"Uploaded {transferred_bytes[0]} bytes to {s3_url} in {elapsed_time:.2f}s "
+                    f"({transferred_bytes[0] / elapsed_time / (1024 * 1024):.2f} MB/s)")
         return s3_url
 
     def get_bucket_and_key_from_url(self, url):
@@ -68,7 +104,6 @@ class S3Util(object):
         return parsed_url.hostname.split(".")[0], parsed_url.path[1:]
 
     def delete_file_from_s3(self, url):
-        s3_resource = self.get_s3_resource_from_key()
         bucket, key = self.get_bucket_and_key_from_url(url)
-        result = s3_resource.Object(bucket, key).delete()
+        result = self.get_s3_client_from_key().delete_object(Bucket=bucket, Key=key)
         return result
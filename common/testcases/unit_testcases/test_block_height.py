@@ -0,0 +1,81 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from common.block_height import BlockHeightCache
+
+
+class TestBlockHeightCache(unittest.TestCase):
+    def setUp(self):
+        self.block_numbers = [100, 101, 99]
+        self.fetch_count = 0
+
+        def fetch_block_number():
+            block_number = self.block_numbers[self.fetch_count]
+            self.fetch_count += 1
+            return block_number
+
+        self.fetch_block_number = fetch_block_number
+
+    def test_block_number_is_served_from_cache_within_staleness_budget(self):
+        cache = BlockHeightCache(self.fetch_block_number, max_staleness=3)
+        with patch("common.block_height.time.monotonic", return_value=1000):
+            assert (cache.get_block_number() == 100)
+        with patch("common.block_height.time.monotonic", return_value=1002.9):
+            assert (cache.get_block_number() == 100)
+        assert (self.fetch_count == 1)
+
+    def test_stale_block_number_is_refreshed_and_never_moves_backwards(self):
+        cache = BlockHeightCache(self.fetch_block_number, max_staleness=3)
+        with patch("common.block_height.time.monotonic", return_value=1000):
+            cache.get_block_number()
+        with patch("common.block_height.time.monotonic", return_value=1003):
+            assert (cache.get_block_number() == 101)
+        with patch("common.block_height.time.monotonic", return_value=1006):
+            assert (cache.get_block_number() == 101)
+        assert (self.fetch_count == 3)
+
+    def test_concurrent_readers_share_one_refresh(self):
+        release_fetch = threading.Event()
+
+        def slow_fetch():
+            release_fetch.wait(timeout=5)
+            return self.fetch_block_number()
+
+        cache = BlockHeightCache(slow_fetch, max_staleness=3)
+        results = []
+        readers = [threading.Thread(target=lambda: results.append(cache.get_block_number())) for _ in range(5)]
+        for reader in readers:
+            reader.start()
+        release_fetch.set()
+        for reader in readers:
+            reader.join(timeout=5)
+        assert (results == [100] * 5)
+        assert (self.fetch_count == 1)
+
+    def test_stale_block_number_is_served_while_another_reader_refreshes(self):
+        fetch_started = threading.Event()
+        release_fetch = threading.Event()
+
+        def hung_fetch():
+            if self.fetch_count > 0:
+                fetch_started.set()
+                release_fetch.wait(timeout=5)
+            return self.fetch_block_number()
+
+        cache = BlockHeightCache(hung_fetch, max_staleness=3)
+        with patch("common.block_height.time.monotonic", return_value=1000):
+            cache.get_block_number()
+        with patch("common.block_height.time.monotonic", return_value=1003):
+            refresher = threading.Thread(target=cache.get_block_number)
+            refresher.start()
+            fetch_started.wait(timeout=5)
+            assert (cache.get_block_number() == 100)
+            release_fetch.set()
+            refresher.join(timeout=5)
+            assert (cache.get_block_number() == 101)
+        assert (self.fetch_count == 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+import unittest
+
+from common.blockchain_util import BlockChainUtil
+
+
+class TestBlockChainUtil(unittest.TestCase):
+
+    def test_cached_contract_instance_calls_through_the_calling_instance(self):
+        with tempfile.TemporaryDirectory() as contract_dir:
+            abi_path = os.path.join(contract_dir, "MultiPartyEscrow.json")
+            address_path = os.path.join(contract_dir, "MultiPartyEscrowNetworks.json")
+            with open(abi_path, "w") as f:
+                json.dump([], f)
+            with open(address_path, "w") as f:
+                json.dump({"3": {"address": "0x8fb1dc8df86b388c7e00689d1ecb533a160b4d0c"}}, f)
+
+            first_blockchain_util = BlockChainUtil("HTTP_PROVIDER", "http://node.dummy.io")
+            second_blockchain_util = BlockChainUtil("HTTP_PROVIDER", "http://node.dummy.io")
+            first_contract = first_blockchain_util._get_cached_contract_instance(abi_path, address_path, 3)
+            assert (first_blockchain_util._get_cached_contract_instance(abi_path, address_path, 3) is first_contract)
+
+            os.remove(abi_path)
+            os.remove(address_path)
+            second_contract = second_blockchain_util._get_cached_contract_instance(abi_path, address_path, 3)
+            assert (second_contract.address == first_contract.address)
+            assert (first_contract.web3 is first_blockchain_util.web3_object)
+            assert (second_contract.web3 is second_blockchain_util.web3_object)
+
+
+if __name__ == '__main__':
+    unittest.main()
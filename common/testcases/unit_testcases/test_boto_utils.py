@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+
+from botocore.config import Config
+
+from common.boto_utils import BotoUtils
+
+
+class TestBotoUtils(unittest.TestCase):
+    def setUp(self):
+        BotoUtils._clients.clear()
+        BotoUtils._ssm_parameter_cache.clear()
+
+    @patch("common.boto_utils.boto3.client")
+    def test_clients_are_shared_per_service_region_and_config(self, mock_client):
+        mock_client.side_effect = lambda service_name, region_name, config: object()
+        lambda_client = BotoUtils.get_client("lambda", region_name="us-east-1")
+        assert (BotoUtils("us-east-1").get_client("lambda", region_name="us-east-1") is lambda_client)
+        single_attempt_client = BotoUtils.get_client("lambda", region_name="us-east-1",
+                                                     config=Config(retries={'max_attempts': 1}))
+        assert (single_attempt_client is not lambda_client)
+        assert (BotoUtils.get_client("lambda", region_name="us-east-1",
+                                     config=Config(retries={'max_attempts': 1})) is single_attempt_client)
+        assert (BotoUtils.get_client("ssm", region_name="us-east-1") is not lambda_client)
+        assert (mock_client.call_count == 3)
+        assert (mock_client.call_args[1]["config"].max_pool_connections == 50)
+
+    @patch("common.boto_utils.boto3.client")
+    def test_ssm_parameters_are_cached_until_ttl_expires(self, mock_client):
+        mock_client.return_value.get_parameter.return_value = {"Parameter": {"Value": "secret"}}
+        boto_utils = BotoUtils("us-east-1")
+        with patch("common.boto_utils.time.monotonic", return_value=1000):
+            assert (boto_utils.get_ssm_parameter("PAYPAL_SECRET") == "secret")
+        with patch("common.boto_utils.time.monotonic", return_value=1299):
+            assert (boto_utils.get_ssm_parameter("PAYPAL_SECRET") == "secret")
+        assert (mock_client.return_value.get_parameter.call_count == 1)
+        with patch("common.boto_utils.time.monotonic", return_value=1300):
+            boto_utils.get_ssm_parameter("PAYPAL_SECRET")
+        assert (mock_client.return_value.get_parameter.call_count == 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
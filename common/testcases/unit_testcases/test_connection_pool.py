@@ -0,0 +1,80 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from common.connection_pool import ConnectionPool
+
+
+class FakeConnection(object):
+
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("connection lost")
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect():
+            connection = FakeConnection()
+            self.opened.append(connection)
+            return connection
+
+        self.connect = connect
+
+    def test_borrow_reuses_released_connection(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        connection = pool.borrow()
+        pool.release(connection)
+        assert (pool.borrow() is connection)
+        assert (len(self.opened) == 1)
+
+    def test_borrow_blocks_until_release_when_pool_is_exhausted(self):
+        pool = ConnectionPool(self.connect, max_size=1, borrow_timeout=5)
+        connection = pool.borrow()
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.borrow()))
+        waiter.start()
+        pool.release(connection)
+        waiter.join(timeout=5)
+        assert (borrowed == [connection])
+        assert (pool.size == 1)
+
+    def test_borrow_times_out_when_pool_is_exhausted(self):
+        pool = ConnectionPool(self.connect, max_size=1, borrow_timeout=0.05)
+        pool.borrow()
+        self.assertRaises(TimeoutError, pool.borrow)
+
+    def test_broken_connection_is_replaced_on_borrow(self):
+        pool = ConnectionPool(self.connect, max_size=1, validation_interval=0)
+        connection = pool.borrow()
+        pool.release(connection)
+        connection.raw_connection.alive = False
+        new_connection = pool.borrow()
+        assert (new_connection is not connection)
+        assert (connection.raw_connection.closed)
+        assert (pool.size == 1)
+
+    def test_idle_and_expired_connections_are_evicted(self):
+        pool = ConnectionPool(self.connect, max_size=2, idle_timeout=10, max_lifetime=100)
+        with patch("common.connection_pool.time.monotonic", return_value=1000):
+            first, second = pool.borrow(), pool.borrow()
+            pool.release(first)
+        with patch("common.connection_pool.time.monotonic", return_value=1011):
+            assert (pool.evict_idle() == 1)
+            pool.release(second)
+        with patch("common.connection_pool.time.monotonic", return_value=1200):
+            assert (pool.borrow() is not second)
+        assert (first.raw_connection.closed and second.raw_connection.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from common.grpc_channel_pool import GrpcChannelPool, KEEPALIVE_OPTIONS
+
+
+class TestGrpcChannelPool(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("common.grpc_channel_pool.grpc")
+        self.grpc = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.grpc.insecure_channel.side_effect = lambda endpoint, options: Mock(endpoint=endpoint)
+        self.grpc.secure_channel.side_effect = lambda endpoint, credentials, options: Mock(endpoint=endpoint)
+
+    def test_channel_is_shared_per_endpoint(self):
+        channel_pool = GrpcChannelPool()
+        channel = channel_pool.get_channel("https://example.io:8080")
+        assert (channel_pool.get_channel("https://example.io:8080") is channel)
+        assert (channel.endpoint == "example.io:8080")
+        assert (channel_pool.get_channel("http://example.io:8081") is not channel)
+        self.grpc.secure_channel.assert_called_once()
+        self.grpc.insecure_channel.assert_called_once()
+
+    def test_keepalive_does_not_ping_idle_channels(self):
+        GrpcChannelPool().get_channel("http://example.io:8080")
+        options = dict(self.grpc.insecure_channel.call_args[1]["options"])
+        assert (options == dict(KEEPALIVE_OPTIONS))
+        assert (options["grpc.keepalive_time_ms"] >= 300000 and options["grpc.keepalive_permit_without_calls"] == 0)
+
+    @patch("common.grpc_channel_pool.time.monotonic")
+    def test_idle_channels_are_closed_on_lookup(self, mock_monotonic):
+        channel_pool = GrpcChannelPool(idle_timeout=600)
+        mock_monotonic.return_value = 0
+        idle_channel = channel_pool.get_channel("https://example.io:8080")
+        mock_monotonic.return_value = 300
+        active_channel = channel_pool.get_channel("https://example.io:8081")
+        mock_monotonic.return_value = 700
+        assert (channel_pool.get_channel("https://example.io:8081") is active_channel)
+        idle_channel.close.assert_called_once()
+        assert (channel_pool.get_channel("https://example.io:8080") is not idle_channel)
+
+    def test_discard_and_close_all(self):
+        channel_pool = GrpcChannelPool()
+        channel = channel_pool.get_channel("https://example.io:8080")
+        other_channel = channel_pool.get_channel("https://example.io:8081")
+        channel_pool.discard("https://example.io:8080")
+        channel.close.assert_called_once()
+        assert (channel_pool.get_channel("https://example.io:8080") is not channel)
+        channel_pool.close_all()
+        other_channel.close.assert_called_once()
+
+    def test_unsupported_scheme_is_rejected(self):
+        self.assertRaises(ValueError, GrpcChannelPool().get_channel, "ftp://example.io:8080")
+
+
+if __name__ == '__main__':
+    unittest.main()
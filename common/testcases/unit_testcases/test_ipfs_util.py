@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from common.ipfs_util import IPFSContentCache, IPFSUtil
+
+
+class TestIPFSUtil(unittest.TestCase):
+    def setUp(self):
+        IPFSUtil._content_cache = IPFSContentCache()
+
+    @patch("common.ipfs_util.ipfsapi.connect")
+    def test_stream_reads_content_chunk_by_chunk(self, mock_connect):
+        mock_connect.return_value.cat.return_value = iter([b"hero", b"", b"_image", b".png"])
+        stream = IPFSUtil("localhost", 5001).read_stream_from_ipfs("QmA/hero_image.png")
+        assert (stream.read(3) == b"her")
+        assert (stream.read() == b"o_image.png")
+        assert (stream.read() == b"")
+        assert (stream.bytes_read == 14)
+        mock_connect.return_value.cat.assert_called_once_with("QmA/hero_image.png", stream=True)
+
+        assert (IPFSUtil("localhost", 5001).read_stream_from_ipfs("QmA/hero_image.png").read() == b"hero_image.png")
+        assert (mock_connect.return_value.cat.call_count == 1)
+
+    @patch("common.ipfs_util.ipfsapi.connect")
+    def test_metadata_is_read_from_ipfs_once(self, mock_connect):
+        mock_connect.return_value.cat.return_value = b'{"version": 1}'
+        for _ in range(3):
+            assert (IPFSUtil("localhost", 5001).read_file_from_ipfs("QmMetadata") == {"version": 1})
+        assert (mock_connect.return_value.cat.call_count == 1)
+        metrics = IPFSUtil.get_cache_metrics()
+        assert (metrics["memory_hits"] == 2 and metrics["misses"] == 1)
+        assert (round(metrics["hit_ratio"], 2) == 0.67)
+
+
+class TestIPFSContentCache(unittest.TestCase):
+
+    def test_least_recently_used_entries_are_evicted_by_size(self):
+        cache = IPFSContentCache(max_bytes=10, max_entry_bytes=10)
+        cache.put("QmA", b"aaaa")
+        cache.put("QmB", b"bbbb")
+        cache.get("QmA")
+        cache.put("QmC", b"cccc")
+        assert (cache.get("QmB") is None)
+        assert (cache.get("QmA") == b"aaaa" and cache.get("QmC") == b"cccc")
+        assert (cache.metrics()["size_in_bytes"] == 8)
+
+    def test_disk_tier_serves_entries_evicted_from_memory(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            cache = IPFSContentCache(max_bytes=4, max_entry_bytes=4, disk_dir=disk_dir)
+            assert (list(cache.cache_chunks("QmA/large.png", [b"large", b"-image"])) == [b"large", b"-image"])
+            cache.put("QmB", b"bbbb")
+            assert (cache.get("QmA/large.png") == b"large-image")
+            with cache.open("QmA/large.png") as cached_file:
+                assert (cached_file.read() == b"large-image")
+            assert (cache.metrics()["disk_hits"] == 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
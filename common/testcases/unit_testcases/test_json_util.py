@@ -0,0 +1,30 @@
+import unittest
+from unittest.mock import patch
+
+from common import json_util
+from common.json_util import loads_cached
+
+
+class TestJsonUtil(unittest.TestCase):
+    def setUp(self):
+        json_util._decode_cached.cache_clear()
+
+    def test_same_text_is_decoded_once(self):
+        pricing = '[{"price_model": "fixed_price", "price_in_cogs": 1, "default": true}]'
+        with patch("common.json_util._decode", wraps=json_util._decode) as mock_decode:
+            first = loads_cached(pricing)
+            second = loads_cached(pricing)
+        assert (first == [{"price_model": "fixed_price", "price_in_cogs": 1, "default": True}])
+        assert (second is first)
+        assert (mock_decode.call_count == 1)
+
+    def test_values_match_standard_decoder(self):
+        assert (loads_cached('{"rating": 0.0, "total_users_rated": 0}') == {"rating": 0.0, "total_users_rated": 0})
+        assert (loads_cached("null") is None)
+        assert (loads_cached('{"amount": 123456789012345678901234567890}') ==
+                {"amount": 123456789012345678901234567890})
+        self.assertRaises(ValueError, loads_cached, "{invalid")
+
+
+if __name__ == '__main__':
+    unittest.main()
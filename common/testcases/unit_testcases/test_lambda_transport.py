@@ -0,0 +1,64 @@
+import json
+import threading
+import unittest
+from unittest.mock import patch
+
+from common.boto_utils import BotoUtils
+from common.lambda_transport import LocalLambdaClient, get_lambda_client
+
+
+def echo_handler(event, context):
+    return {"statusCode": 200, "body": json.dumps({"event": event, "function_name": context.function_name})}
+
+
+def failing_handler(event, context):
+    raise ValueError("invalid order")
+
+
+class TestLocalLambdaClient(unittest.TestCase):
+    def setUp(self):
+        self.client = LocalLambdaClient(routes={
+            "orchestrator-dev-get-order": "common.testcases.unit_testcases.test_lambda_transport.echo_handler"})
+
+    def test_request_response_is_dispatched_to_the_routed_handler(self):
+        arn = "arn:aws:lambda:us-east-1:123456789012:function:orchestrator-dev-get-order"
+        response = self.client.invoke(FunctionName=arn, InvocationType="RequestResponse",
+                                      Payload=json.dumps({"path": "/order"}))
+        assert (response["StatusCode"] == 200)
+        assert ("FunctionError" not in response)
+        body = json.loads(json.loads(response["Payload"].read())["body"])
+        assert (body == {"event": {"path": "/order"}, "function_name": arn})
+
+    def test_handler_failure_is_reported_as_function_error(self):
+        self.client.register("payments-dev-execute", failing_handler)
+        response = self.client.invoke(FunctionName="payments-dev-execute", InvocationType="RequestResponse",
+                                      Payload="{}")
+        assert (response["FunctionError"] == "Unhandled")
+        error = json.loads(response["Payload"].read())
+        assert (error["errorType"] == "ValueError" and error["errorMessage"] == "invalid order")
+
+    def test_event_invocation_runs_in_background(self):
+        handled = threading.Event()
+        self.client.register("process-order", lambda event, context: handled.set())
+        response = self.client.invoke(FunctionName="process-order", InvocationType="Event", Payload="{}")
+        assert (response["StatusCode"] == 202)
+        assert (handled.wait(timeout=5))
+
+    def test_unknown_function_raises(self):
+        self.assertRaises(Exception, self.client.invoke, FunctionName="unknown", Payload="{}")
+
+    @patch.dict("os.environ", {"LAMBDA_TRANSPORT": "local"})
+    def test_local_transport_replaces_boto_client(self):
+        assert (get_lambda_client(region_name="us-east-1") is LocalLambdaClient.get_instance())
+
+    @patch("common.boto_utils.boto3.client")
+    def test_lambda_transport_shares_cached_boto_client(self, mock_boto_client):
+        BotoUtils._clients.clear()
+        lambda_client = get_lambda_client(region_name="us-east-1")
+        assert (get_lambda_client(region_name="us-east-1") is lambda_client)
+        assert (BotoUtils.get_client("lambda", region_name="us-east-1") is lambda_client)
+        mock_boto_client.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
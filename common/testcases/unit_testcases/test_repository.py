@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from common.repository import Repository, make_row_type
+
+
+class TestMakeRowType(unittest.TestCase):
+    def test_row_supports_attribute_key_and_index_access(self):
+        row_type = make_row_type(["row_id", "org_id", "class"])
+        row = row_type._make((1, "snet", "service"))
+        assert (row.row_id == 1 and row["org_id"] == "snet" and row[2] == "service")
+        assert (row["class"] == "service")
+        assert (row.get("org_id") == "snet" and row.get("service_id", "default") == "default")
+        self.assertRaises(KeyError, lambda: row["service_id"])
+
+
+class TestRepositoryStream(unittest.TestCase):
+    def setUp(self):
+        self.rows = [(1, "snet"), (2, "snet"), (3, "example-org")]
+        self.connections = []
+        self.ss_cursors = []
+
+        def connect(*args, **kwargs):
+            connection = Mock()
+            ss_cursor = Mock()
+            ss_cursor.description = [("row_id",), ("org_id",)]
+            batches = [self.rows[:2], self.rows[2:], []]
+            ss_cursor.fetchmany.side_effect = lambda batch_size: batches.pop(0)
+            connection.cursor.side_effect = lambda *args: ss_cursor if args else MagicMock()
+            self.connections.append(connection)
+            self.ss_cursors.append(ss_cursor)
+            return connection
+
+        patcher = patch("common.repository.pymysql.connect", side_effect=connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        networks = {3: {"db": {"DB_HOST": f"stream-test-{id(self)}", "DB_USER": "user", "DB_PASSWORD": "password",
+                               "DB_NAME": "marketplace"}}}
+        self.repo = Repository(net_id=3, NETWORKS=networks)
+
+    def test_stream_yields_batches_and_releases_connection(self):
+        batches = list(self.repo.stream("SELECT row_id, org_id FROM service", batch_size=2))
+        assert ([len(batch) for batch in batches] == [2, 1])
+        assert (batches[1][0].org_id == "example-org" and batches[0][1]["row_id"] == 2)
+        self.ss_cursors[0].close.assert_called_once()
+        assert (self.repo.pool.idle_count == 1 and not self.connections[0].close.called)
+
+    def test_iter_execute_closed_early_discards_connection(self):
+        rows = self.repo.iter_execute("SELECT row_id, org_id FROM service")
+        assert (next(rows).row_id == 1)
+        rows.close()
+        self.connections[0].close.assert_called_once()
+        self.ss_cursors[0].close.assert_not_called()
+        assert (self.repo.pool.idle_count == 0 and self.repo.pool.size == 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
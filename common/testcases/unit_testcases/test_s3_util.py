@@ -0,0 +1,39 @@
+import unittest
+
+import boto3
+from aws_xray_sdk import global_sdk_config
+from botocore.stub import Stubber
+
+from common.ipfs_util import ChunkedStream
+from common.s3_util import S3Util, STREAMING_TRANSFER_CONFIG
+
+
+class TestS3Util(unittest.TestCase):
+    def setUp(self):
+        # Lambda handlers imported by other tests patch botocore with X-Ray, which needs a segment per call.
+        self._xray_sdk_enabled = global_sdk_config.sdk_enabled()
+        global_sdk_config.set_sdk_enabled(False)
+
+    def tearDown(self):
+        global_sdk_config.set_sdk_enabled(self._xray_sdk_enabled)
+
+    def test_stream_larger_than_multipart_threshold_is_uploaded_in_parts(self):
+        s3_util = S3Util("dummy_access_key", "dummy_secret_key")
+        s3_util._s3_client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="dummy_access_key",
+                                          aws_secret_access_key="dummy_secret_key")
+        chunk = b"a" * 64 * 1024
+        chunk_count = (STREAMING_TRANSFER_CONFIG.multipart_threshold + len(chunk)) // len(chunk)
+        stream = ChunkedStream(chunk for _ in range(chunk_count))
+        with Stubber(s3_util._s3_client) as stubber:
+            stubber.add_response("create_multipart_upload", {"UploadId": "upload-1"})
+            stubber.add_response("upload_part", {"ETag": "etag-1"})
+            stubber.add_response("upload_part", {"ETag": "etag-2"})
+            stubber.add_response("complete_multipart_upload", {})
+            s3_url = s3_util.push_io_bytes_to_s3("assets/hero_image.png", "dummy-bucket", stream)
+            stubber.assert_no_pending_responses()
+        assert (s3_url == "https://dummy-bucket.s3.amazonaws.com/assets/hero_image.png")
+        assert (stream.bytes_read == chunk_count * len(chunk))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,8 @@ import sys
 import traceback
 
 import requests
-import web3
-from web3 import Web3
 
+from common.block_height import BlockHeightCache
 from common.constant import COGS_TO_AGI, StatusCode
 from common.exceptions import OrganizationNotFound
 
@@ -64,8 +63,7 @@ class Utils:
         return url
 
     def get_current_block_no(self, ws_provider):
-        w3Obj = Web3(web3.providers.WebsocketProvider(ws_provider))
-        return w3Obj.eth.blockNumber
+        return BlockHeightCache.for_provider(provider_type="WS_PROVIDER", provider=ws_provider).get_block_number()
 
     def cogs_to_agi(self, cogs):
         with decimal.localcontext() as ctx:
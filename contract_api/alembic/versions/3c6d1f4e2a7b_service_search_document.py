@@ -0,0 +1,53 @@
+"""service_search_document
+
+Revision ID: 3c6d1f4e2a7b
+Revises: 698ffdd6eeba
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c6d1f4e2a7b'
+down_revision = '698ffdd6eeba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute("""
+            CREATE TABLE `service_search_document` (
+              `row_id` int(11) NOT NULL AUTO_INCREMENT,
+              `service_row_id` int(11) NOT NULL,
+              `org_id` varchar(128) NOT NULL,
+              `service_id` varchar(128) NOT NULL,
+              `organization_name` varchar(128) DEFAULT NULL,
+              `display_name` varchar(256) DEFAULT NULL,
+              `tags` varchar(2048) DEFAULT NULL,
+              `row_created` timestamp NULL DEFAULT NULL,
+              `row_updated` timestamp NULL DEFAULT NULL,
+              PRIMARY KEY (`row_id`),
+              UNIQUE KEY `uq_srvc_srch_doc` (`org_id`, `service_id`),
+              UNIQUE KEY `uq_srvc_srch_doc_srvc` (`service_row_id`),
+              KEY `idx_srvc_srch_doc_display_name` (`display_name`),
+              CONSTRAINT `ServiceSearchDocFK` FOREIGN KEY (`service_row_id`) REFERENCES `service` (`row_id`) ON DELETE CASCADE
+            ) ;
+        """)
+    conn.execute("""
+            INSERT INTO `service_search_document` (service_row_id, org_id, service_id, organization_name, display_name,
+              tags, row_created, row_updated)
+            SELECT M.service_row_id, M.org_id, M.service_id, O.organization_name, M.display_name,
+              (SELECT GROUP_CONCAT(T.tag_name ORDER BY T.tag_name) FROM service_tags T WHERE T.service_row_id = M.service_row_id),
+              UTC_TIMESTAMP, UTC_TIMESTAMP
+            FROM service_metadata M LEFT JOIN organization O ON O.org_id = M.org_id
+        """)
+    conn.execute("CREATE INDEX `idx_srvc_endpt_available` ON `service_endpoint` (`service_row_id`, `is_available`);")
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute("DROP INDEX `idx_srvc_endpt_available` ON `service_endpoint`;")
+    conn.execute("DROP TABLE `service_search_document`;")
@@ -0,0 +1,31 @@
+"""service_search_document fulltext
+
+Revision ID: 5e2b7a9c4d18
+Revises: 3c6d1f4e2a7b
+Create Date: 2026-10-18 21:18:05.512734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b7a9c4d18'
+down_revision = '3c6d1f4e2a7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute("CREATE FULLTEXT INDEX `ft_srvc_srch_doc_all` ON `service_search_document` "
+                 "(`org_id`, `organization_name`, `display_name`, `tags`);")
+    conn.execute("CREATE FULLTEXT INDEX `ft_srvc_srch_doc_display_name` ON `service_search_document` (`display_name`);")
+    conn.execute("CREATE FULLTEXT INDEX `ft_srvc_srch_doc_tags` ON `service_search_document` (`tags`);")
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute("DROP INDEX `ft_srvc_srch_doc_tags` ON `service_search_document`;")
+    conn.execute("DROP INDEX `ft_srvc_srch_doc_display_name` ON `service_search_document`;")
+    conn.execute("DROP INDEX `ft_srvc_srch_doc_all` ON `service_search_document`;")
@@ -1,2 +1,3 @@
 GET_ALL_SERVICE_OFFSET_LIMIT = 0
 GET_ALL_SERVICE_LIMIT = 15
+ASSET_TRANSFER_MAX_WORKERS = 8
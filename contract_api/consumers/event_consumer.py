@@ -1,3 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from contract_api.constant import ASSET_TRANSFER_MAX_WORKERS
+
 
 class EventConsumer(object):
 
@@ -13,9 +17,12 @@ class EventConsumer(object):
         :param service_id:
         :return: dict of asset_type and new_s3_url
         """
-        # this function compare assets and deletes and update the new assets
+        # this function compare assets and only deletes removed assets and pushes added ones, unchanged assets
+        # keep their s3 url
 
         assets_url_mapping = {}
+        urls_to_be_removed = []
+        hashes_to_be_pushed = []
 
         if not existing_assets_hash:
             existing_assets_hash = {}
@@ -27,22 +34,24 @@ class EventConsumer(object):
         for new_asset_type, new_asset_hash in new_assets_hash.items():
 
             if isinstance(new_asset_hash, list):
-                # if this asset_type contains list of assets than remove all existing assetes from s3 and add all new assets to s3
-                #
+                # list of assets, match items by their ipfs hash so a reordered or partly changed gallery only
+                # transfers the items that actually changed
+                existing_url_for_hash = self._get_existing_url_for_hash(
+                    existing_assets_hash.get(new_asset_type, None), existing_assets_url.get(new_asset_type, None))
                 new_urls_list = []
-
-                # remove all existing assets if exits
-                if new_asset_type in existing_assets_url:
-                    for url in existing_assets_url[new_asset_type]:
-                        self._s3_util.delete_file_from_s3(url)
-
-                # add new files to s3 and update the url
-                for hash in new_assets_hash[new_asset_type]:
-                    new_urls_list.append(
-                        self._push_asset_to_s3_using_hash(hash, org_id, service_id))
-
+                for hash in new_asset_hash:
+                    if hash in existing_url_for_hash:
+                        new_urls_list.append(existing_url_for_hash[hash])
+                    else:
+                        new_urls_list.append(None)
+                        hashes_to_be_pushed.append((new_asset_type, len(new_urls_list) - 1, hash))
                 assets_url_mapping[new_asset_type] = new_urls_list
 
+                existing_urls = existing_assets_url.get(new_asset_type, [])
+                if isinstance(existing_urls, str):
+                    existing_urls = [existing_urls]
+                urls_to_be_removed.extend(url for url in existing_urls if url not in new_urls_list)
+
             elif isinstance(new_asset_hash, str):
                 # if this asset_type has single value
                 if new_asset_type in existing_assets_hash and existing_assets_hash[new_asset_type] == new_asset_hash:
@@ -50,23 +59,43 @@ class EventConsumer(object):
                     assets_url_mapping[new_asset_type] = existing_assets_url[new_asset_type]
 
                 else:
-                    if new_asset_type in existing_assets_url:
-                        url_of_file_to_be_removed = existing_assets_url[new_asset_type]
-                        self._s3_util.delete_file_from_s3(
-                            url_of_file_to_be_removed)
-
-                    hash_of_file_to_be_pushed_to_s3 = new_assets_hash[new_asset_type]
-
-                    assets_url_mapping[new_asset_type] = self._push_asset_to_s3_using_hash(
-                        hash_of_file_to_be_pushed_to_s3, org_id, service_id)
+                    existing_url = existing_assets_url.get(new_asset_type, None)
+                    if isinstance(existing_url, list):
+                        urls_to_be_removed.extend(existing_url)
+                    elif existing_url is not None:
+                        urls_to_be_removed.append(existing_url)
+                    hashes_to_be_pushed.append((new_asset_type, None, new_asset_hash))
 
             else:
                 print(
                     "unknown type assets for org_id %s  service_id %s", org_id, service_id)
 
+        self._transfer_assets(urls_to_be_removed, hashes_to_be_pushed, assets_url_mapping, org_id, service_id)
         return assets_url_mapping
 
-
+    @staticmethod
+    def _get_existing_url_for_hash(existing_hashes, existing_urls):
+        """ Hashes and urls of a list asset are stored in the same order, anything else is treated as not synced. """
+        if not isinstance(existing_hashes, list) or not isinstance(existing_urls, list) \
+                or len(existing_hashes) != len(existing_urls):
+            return {}
+        return dict(zip(existing_hashes, existing_urls))
+
+    def _transfer_assets(self, urls_to_be_removed, hashes_to_be_pushed, assets_url_mapping, org_id, service_id):
+        if not urls_to_be_removed and not hashes_to_be_pushed:
+            return
+        with ThreadPoolExecutor(max_workers=ASSET_TRANSFER_MAX_WORKERS) as executor:
+            # the s3 key only depends on the file name, so a replaced file may share the key of its new version,
+            # deletes have to finish before the pushes start
+            list(executor.map(self._s3_util.delete_file_from_s3, set(urls_to_be_removed)))
+            pushed_urls = executor.map(
+                lambda hash_to_be_pushed: self._push_asset_to_s3_using_hash(hash_to_be_pushed[2], org_id, service_id),
+                hashes_to_be_pushed)
+            for (asset_type, position, hash), new_url in zip(hashes_to_be_pushed, pushed_urls):
+                if position is None:
+                    assets_url_mapping[asset_type] = new_url
+                else:
+                    assets_url_mapping[asset_type][position] = new_url
 
     def on_event(self, event):
         pass
@@ -33,7 +33,7 @@ class OrganizationEventConsumer(EventConsumer):
         pass
 
     def _push_asset_to_s3_using_hash(self, hash, org_id, service_id):
-        io_bytes = self._ipfs_util.read_bytesio_from_ipfs(hash)
+        io_bytes = self._ipfs_util.read_stream_from_ipfs(hash)
         filename = hash.split("/")[1]
         if service_id:
             s3_filename = ASSETS_PREFIX + "/" + org_id + "/" + service_id + "/" + filename
@@ -113,6 +113,7 @@ class OrganizationCreatedEventConsumer(OrganizationEventConsumer):
                 self._organization_repository.create_organization_groups(
                     org_id=org_id, groups=ipfs_org_metadata["groups"])
                 self._organization_repository.del_members(org_id=org_id)
+                self._service_repository.refresh_search_documents(org_id=org_id)
                 # self.organization_dao.create_or_update_members(org_id, org_data[4])
                 self._organization_repository.commit_transaction()
 
@@ -136,12 +137,7 @@ class OrganizationDeletedEventConsumer(OrganizationEventConsumer):
             self._connection.begin_transaction()
             self._organization_repository.delete_organization(org_id=org_id)
             self._organization_repository.delete_organization_groups(org_id=org_id)
-            services = self._service_repository.get_services(org_id=org_id)
-            for service in services:
-                self._service_repository.delete_service_dependents(
-                    org_id=org_id, service_id=service['service_id'])
-                self._service_repository.delete_service(
-                    org_id=org_id, service_id=service['service_id'])
+            self._service_repository.delete_services_of_org(org_id=org_id)
 
             self._connection.commit_transaction()
         except Exception as e:
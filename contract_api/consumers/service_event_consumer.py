@@ -85,7 +85,7 @@ class ServiceCreatedEventConsumer(ServiceEventConsumer):
                                    new_ipfs_data=service_ipfs_data, tags_data=tags_data)
 
     def _push_asset_to_s3_using_hash(self, hash, org_id, service_id):
-        io_bytes = self._ipfs_util.read_bytesio_from_ipfs(hash)
+        io_bytes = self._ipfs_util.read_stream_from_ipfs(hash)
         filename = hash.split("/")[1]
         if service_id:
             s3_filename = ASSETS_PREFIX + "/" + org_id + "/" + service_id + "/" + filename
@@ -118,8 +118,6 @@ class ServiceCreatedEventConsumer(ServiceEventConsumer):
             assets_url = self._get_new_assets_url(
                 org_id, service_id, new_ipfs_data)
 
-            self._service_repository.delete_service_dependents(
-                org_id=org_id, service_id=service_id)
             service_data = self._service_repository.create_or_update_service(
                 org_id=org_id, service_id=service_id, ipfs_hash=new_ipfs_hash)
             service_row_id = service_data['last_row_id']
@@ -127,38 +125,29 @@ class ServiceCreatedEventConsumer(ServiceEventConsumer):
             self._service_repository.create_or_update_service_metadata(service_row_id=service_row_id, org_id=org_id,
                                                                        service_id=service_id,
                                                                        ipfs_data=new_ipfs_data, assets_url=assets_url)
+            # dependents are diffed against the stored rows, so unchanged endpoints keep their health check state
             groups = new_ipfs_data.get('groups', [])
-            group_insert_count = 0
-            for group in groups:
-                service_group_data = self._service_repository.create_group(service_row_id=service_row_id, org_id=org_id,
-                                                                           service_id=service_id,
-                                                                           grp_data={
-                                                                               'group_id': group['group_id'],
-                                                                               'group_name': group['group_name'],
-                                                                               'pricing': json.dumps(group['pricing'])
-                                                                           })
-                group_insert_count = group_insert_count + service_group_data[0]
-                endpoints = group.get('endpoints', [])
-                endpoint_insert_count = 0
-                for endpoint in endpoints:
-                    service_data = self._service_repository.create_endpoints(service_row_id=service_row_id,
-                                                                             org_id=org_id,
-                                                                             service_id=service_id,
-                                                                             endpt_data={
-                                                                                 'endpoint': endpoint,
-                                                                                 'group_id': group['group_id'],
-                                                                             })
-                    endpoint_insert_count = endpoint_insert_count + service_data[0]
-
-            if (tags_data is not None and tags_data[0]):
-                tags = tags_data[3]
-                for tag in tags:
-                    tag = tag.decode('utf-8')
-                    tag = tag.rstrip("\u0000")
-                    self._service_repository.create_tags(service_row_id=service_row_id, org_id=org_id,
+            self._service_repository.sync_service_groups(service_row_id=service_row_id, org_id=org_id,
                                                          service_id=service_id,
-                                                         tag_name=tag,
-                                                         )
+                                                         groups=[{
+                                                             'group_id': group['group_id'],
+                                                             'group_name': group['group_name'],
+                                                             'pricing': json.dumps(group['pricing'])
+                                                         } for group in groups])
+            self._service_repository.sync_service_endpoints(service_row_id=service_row_id, org_id=org_id,
+                                                            service_id=service_id,
+                                                            endpoints=[{
+                                                                'endpoint': endpoint,
+                                                                'group_id': group['group_id'],
+                                                            } for group in groups
+                                                                for endpoint in group.get('endpoints', [])])
+
+            tag_names = []
+            if (tags_data is not None and tags_data[0]):
+                tag_names = [tag.decode('utf-8').rstrip("\u0000") for tag in tags_data[3]]
+            self._service_repository.sync_service_tags(service_row_id=service_row_id, org_id=org_id,
+                                                       service_id=service_id, tag_names=tag_names)
+            self._service_repository.refresh_search_documents(org_id=org_id, service_id=service_id)
             self._connection.commit_transaction()
 
         except Exception as e:
@@ -11,3 +11,11 @@ class CommonRepository(object):
 
     def rollback_transaction(self):
         self.connection.rollback_transaction()
+
+    def bulk_insert(self, insert_query, rows, on_duplicate_key_update=""):
+        """ Writes all rows with one multi-row INSERT, insert_query names the table and columns up to VALUES. """
+        if not rows:
+            return [0, {'last_row_id': None}]
+        row_placeholder = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        query = insert_query + " " + ", ".join([row_placeholder] * len(rows)) + " " + on_duplicate_key_update
+        return self.connection.execute(query, [value for row in rows for value in row])
@@ -41,29 +41,24 @@ class OrganizationRepository(CommonRepository):
         qry_res = self.connection.execute(del_org, [org_id])
 
     def create_organization_groups(self, org_id, groups):
-        insert_qry = "Insert into org_group (org_id, group_id, group_name, payment, row_updated, row_created) " \
-                     "VALUES ( %s, %s, %s, %s, %s, %s ) "
-        count = 0
-        for group in groups:
-            insert_params = [org_id, group['group_id'], group['group_name'], json.dumps(
-                group['payment']), datetime.utcnow(), datetime.utcnow()]
-            query_response = self.connection.execute(insert_qry, insert_params)
-            count = count + query_response[0]
+        insert_qry = "Insert into org_group (org_id, group_id, group_name, payment, row_updated, row_created) VALUES"
+        current_time = datetime.utcnow()
+        query_response = self.bulk_insert(insert_qry, [
+            [org_id, group['group_id'], group['group_name'], json.dumps(group['payment']), current_time, current_time]
+            for group in groups])
+        return query_response[0]
 
     def delete_organization_groups(self, org_id):
         delete_query = self.connection.execute(
             "DELETE FROM org_group WHERE org_id = %s ", [org_id])
 
     def create_or_update_members(self, org_id, members):
-        upsrt_members = "INSERT INTO members ( org_id, member, row_created, row_updated ) " \
-                        "VALUES ( %s, %s, %s, %s ) " \
-                        "ON DUPLICATE KEY UPDATE row_updated = %s "
-        count = 0
-        for member in members:
-            upsrt_members_params = [org_id, member,
-                                    datetime.utcnow(), datetime.utcnow(), datetime.utcnow()]
-            query_response = self.connection.execute(upsrt_members, upsrt_members_params)
-            count = count + query_response[0]
+        upsrt_members = "INSERT INTO members ( org_id, member, row_created, row_updated ) VALUES"
+        current_time = datetime.utcnow()
+        query_response = self.bulk_insert(upsrt_members, [[org_id, member, current_time, current_time]
+                                                          for member in members],
+                                          on_duplicate_key_update="ON DUPLICATE KEY UPDATE row_updated = VALUES(row_updated)")
+        return query_response[0]
 
     def del_members(self, org_id):
         del_org = 'DELETE FROM members WHERE org_id = %s '
@@ -71,6 +66,4 @@ class OrganizationRepository(CommonRepository):
 
     def read_registry_events(self):
         query = 'select * from registry_events_raw where processed = 0 order by block_no asc '
-        events = self.connection.execute(query)
-        print('read_registry_events::read_count: ', len(events))
-        return events
+        return self.connection.iter_execute(query)
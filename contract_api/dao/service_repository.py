@@ -51,49 +51,55 @@ class ServiceRepository(CommonRepository):
 
     def update_tags(self, org_id, service_id, tags_data):
         try:
-            self.delete_tags(org_id=org_id, service_id=service_id)
+            self.begin_transaction()
+            tag_names = []
             if (tags_data is not None and tags_data[0]):
-                tags = tags_data[3]
-                service_data = self.get_service_row_id(
-                    service_id=service_id, org_id=org_id)
-                service_row_id = service_data[0]['row_id']
-                for tag in tags:
-                    tag = tag.decode('utf-8')
-                    tag = tag.rstrip("\u0000")
-                    self.create_tags(srvc_rw_id=service_row_id, org_id=org_id, service_id=service_id, tag_name=tag)
-                    self.commit_transaction()
+                tag_names = [tag.decode('utf-8').rstrip("\u0000") for tag in tags_data[3]]
+            service_data = self.get_service_row_id(
+                service_id=service_id, org_id=org_id)
+            service_row_id = service_data[0]['row_id']
+            self.sync_service_tags(service_row_id=service_row_id, org_id=org_id, service_id=service_id,
+                                   tag_names=tag_names)
+            self.refresh_search_documents(org_id=org_id, service_id=service_id)
+            self.commit_transaction()
         except Exception as e:
 
             self.rollback_transaction()
 
-    def create_endpoints(self, service_row_id, org_id, service_id, endpt_data):
+    def create_service_endpoints(self, service_row_id, org_id, service_id, endpoints):
+        """ endpoints is a list of dicts with group_id and endpoint, all of them are inserted with one statement. """
         insert_endpoints = "INSERT INTO service_endpoint (service_row_id, org_id, service_id, group_id, endpoint, " \
-                           "is_available, row_created, row_updated) " \
-                           "VALUES(%s, %s, %s, %s, %s, %s, %s, %s)"
+                           "is_available, row_created, row_updated) VALUES"
         is_available = 1
-        insert_endpoint_paramteres = [service_row_id, org_id, service_id, endpt_data['group_id'],
-                                      endpt_data['endpoint'], is_available, datetime.utcnow(), datetime.utcnow()]
-        return self.connection.execute(insert_endpoints, insert_endpoint_paramteres)
-
-    def create_tags(self, service_row_id, org_id, service_id, tag_name):
-        insrt_tag = "INSERT INTO service_tags (service_row_id, org_id, service_id, tag_name, row_created, row_updated) " \
-                    "VALUES(%s, %s, %s, %s, %s, %s) " \
-                    "ON DUPLICATE KEY UPDATE tag_name = %s, row_updated = %s "
-        insrt_tag_params = [service_row_id, org_id, service_id,
-                            tag_name, datetime.utcnow(), datetime.utcnow(), tag_name, datetime.utcnow()]
-        qry_res = self.connection.execute(insrt_tag, insrt_tag_params)
-        print('_create_tags::qry_res: ', qry_res)
+        current_time = datetime.utcnow()
+        return self.bulk_insert(insert_endpoints, [
+            [service_row_id, org_id, service_id, endpt_data['group_id'], endpt_data['endpoint'], is_available,
+             current_time, current_time] for endpt_data in endpoints])
+
+    def create_service_tags(self, service_row_id, org_id, service_id, tag_names):
+        insert_tags = "INSERT INTO service_tags (service_row_id, org_id, service_id, tag_name, row_created, " \
+                      "row_updated) VALUES"
+        current_time = datetime.utcnow()
+        return self.bulk_insert(
+            insert_tags, [[service_row_id, org_id, service_id, tag_name, current_time, current_time]
+                          for tag_name in tag_names],
+            on_duplicate_key_update="ON DUPLICATE KEY UPDATE tag_name = VALUES(tag_name), "
+                                    "row_updated = VALUES(row_updated)")
 
     def delete_tags(self, org_id, service_id):
         delete_service_tags = 'DELETE FROM service_tags WHERE service_id = %s AND org_id = %s '
         delete_service_tags_count = self.connection.execute(delete_service_tags, [service_id, org_id])
 
     def delete_service_dependents(self, org_id, service_id):
-        self.delete_service_group(org_id, service_id)
         self.delete_tags(org_id=org_id, service_id=service_id)
         self.delete_service_group(org_id=org_id, service_id=service_id)
         self.delete_service_endpoint(org_id=org_id, service_id=service_id)
 
+    def delete_services_of_org(self, org_id):
+        """ Deletes every service of the org with its dependents, one statement per table. """
+        for table in ["service_tags", "service_group", "service_endpoint", "service"]:
+            self.connection.execute("DELETE FROM " + table + " WHERE org_id = %s ", [org_id])
+
     def delete_service_endpoint(self, org_id, service_id):
 
         delete_service_endpoint = 'DELETE FROM service_endpoint WHERE service_id = %s AND org_id = %s '
@@ -145,11 +151,98 @@ class ServiceRepository(CommonRepository):
 
         return service_tags
 
-    def create_group(self, service_row_id, org_id, service_id, grp_data):
-        insert_group = "INSERT INTO service_group (service_row_id, org_id, service_id, group_id, group_name," \
-                       "pricing, row_updated, row_created)" \
-                       "VALUES(%s, %s, %s, %s, %s, %s, %s, %s)"
-        insert_group_param = [service_row_id, org_id, service_id, grp_data['group_id'], grp_data['group_name'],
-                              grp_data['pricing'], datetime.utcnow(), datetime.utcnow()]
-
-        return self.connection.execute(insert_group, insert_group_param)
+    def create_groups(self, service_row_id, org_id, service_id, groups):
+        """ groups is a list of dicts with group_id, group_name and pricing, all of them are inserted with one statement. """
+        insert_groups = "INSERT INTO service_group (service_row_id, org_id, service_id, group_id, group_name, " \
+                        "pricing, row_updated, row_created) VALUES"
+        current_time = datetime.utcnow()
+        return self.bulk_insert(
+            insert_groups, [[service_row_id, org_id, service_id, grp_data['group_id'], grp_data['group_name'],
+                             grp_data['pricing'], current_time, current_time] for grp_data in groups],
+            on_duplicate_key_update="ON DUPLICATE KEY UPDATE service_row_id = VALUES(service_row_id), "
+                                    "group_name = VALUES(group_name), pricing = VALUES(pricing), "
+                                    "row_updated = VALUES(row_updated)")
+
+    def sync_service_groups(self, service_row_id, org_id, service_id, groups):
+        """ Upserts new and changed groups and deletes removed ones, unchanged groups are not written. """
+        query = "SELECT row_id, service_row_id, group_id, group_name, pricing FROM service_group " \
+                "WHERE org_id = %s AND service_id = %s"
+        existing_groups = {group["group_id"]: group for group in self.connection.execute(query, [org_id, service_id])}
+        new_group_ids = set(grp_data["group_id"] for grp_data in groups)
+        changed_groups = [grp_data for grp_data in groups
+                          if not self._is_group_unchanged(existing_groups.get(grp_data["group_id"], None),
+                                                          service_row_id, grp_data)]
+        self.delete_rows("service_group", [group["row_id"] for group_id, group in existing_groups.items()
+                                           if group_id not in new_group_ids])
+        self.create_groups(service_row_id, org_id, service_id, changed_groups)
+
+    @staticmethod
+    def _is_group_unchanged(existing_group, service_row_id, grp_data):
+        if existing_group is None:
+            return False
+        existing_pricing = json.loads(existing_group["pricing"]) if existing_group["pricing"] is not None else None
+        return existing_group["service_row_id"] == service_row_id and \
+            existing_group["group_name"] == grp_data["group_name"] and \
+            existing_pricing == json.loads(grp_data["pricing"])
+
+    def sync_service_endpoints(self, service_row_id, org_id, service_id, endpoints):
+        """
+            Inserts new endpoints and deletes removed ones. Endpoints that stay keep their row and with it the
+            availability and check schedule maintained by service_status.
+        """
+        query = "SELECT row_id, group_id, endpoint FROM service_endpoint WHERE org_id = %s AND service_id = %s"
+        existing_endpoint_keys = set()
+        row_ids_to_be_deleted = []
+        new_endpoint_keys = set((endpt_data["group_id"], endpt_data["endpoint"]) for endpt_data in endpoints)
+        for endpoint in self.connection.execute(query, [org_id, service_id]):
+            endpoint_key = (endpoint["group_id"], endpoint["endpoint"])
+            if endpoint_key not in new_endpoint_keys or endpoint_key in existing_endpoint_keys:
+                row_ids_to_be_deleted.append(endpoint["row_id"])
+            existing_endpoint_keys.add(endpoint_key)
+        self.delete_rows("service_endpoint", row_ids_to_be_deleted)
+        endpoints_to_be_added = []
+        for endpt_data in endpoints:
+            endpoint_key = (endpt_data["group_id"], endpt_data["endpoint"])
+            if endpoint_key not in existing_endpoint_keys:
+                existing_endpoint_keys.add(endpoint_key)
+                endpoints_to_be_added.append(endpt_data)
+        self.create_service_endpoints(service_row_id, org_id, service_id, endpoints_to_be_added)
+
+    def sync_service_tags(self, service_row_id, org_id, service_id, tag_names):
+        query = "SELECT row_id, tag_name FROM service_tags WHERE org_id = %s AND service_id = %s"
+        existing_tags = {tag["tag_name"]: tag["row_id"] for tag in self.connection.execute(query, [org_id, service_id])}
+        self.delete_rows("service_tags", [row_id for tag_name, row_id in existing_tags.items()
+                                          if tag_name not in tag_names])
+        self.create_service_tags(service_row_id, org_id, service_id,
+                                 [tag_name for tag_name in dict.fromkeys(tag_names) if tag_name not in existing_tags])
+
+    def delete_rows(self, table, row_ids):
+        if not row_ids:
+            return
+        delete_query = "DELETE FROM " + table + " WHERE row_id IN (" + ", ".join(["%s"] * len(row_ids)) + ")"
+        return self.connection.execute(delete_query, row_ids)
+
+    def refresh_search_documents(self, org_id, service_id=None):
+        """ Rebuilds the denormalized search document of one service, or of every service of the org. """
+        refresh_query = "INSERT INTO service_search_document (service_row_id, org_id, service_id, organization_name, " \
+                        "display_name, tags, row_created, row_updated) " \
+                        "SELECT M.service_row_id, M.org_id, M.service_id, O.organization_name, M.display_name, " \
+                        "(SELECT GROUP_CONCAT(T.tag_name ORDER BY T.tag_name) FROM service_tags T WHERE T.service_row_id = M.service_row_id), " \
+                        "%s, %s FROM service_metadata M LEFT JOIN organization O ON O.org_id = M.org_id " \
+                        "WHERE M.org_id = %s "
+        refresh_params = [datetime.utcnow(), datetime.utcnow(), org_id]
+        if service_id is not None:
+            refresh_query += "AND M.service_id = %s "
+            refresh_params.append(service_id)
+        refresh_query += "ON DUPLICATE KEY UPDATE service_row_id = VALUES(service_row_id), " \
+                         "organization_name = VALUES(organization_name), display_name = VALUES(display_name), " \
+                         "tags = VALUES(tags), row_updated = VALUES(row_updated)"
+        return self.connection.execute(refresh_query, refresh_params)
+
+    def get_search_document(self, org_id, service_id):
+        query = "SELECT org_id, service_id, organization_name, display_name, tags FROM service_search_document " \
+                "WHERE org_id = %s AND service_id = %s"
+        search_document = self.connection.execute(query, [org_id, service_id])
+        if len(search_document) > 0:
+            return search_document[0]
+        return None
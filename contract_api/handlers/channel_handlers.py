@@ -57,16 +57,28 @@ def get_channels_for_group(event, context):
 @handle_exception_with_slack_notification(logger=logger, NETWORK_ID=NETWORK_ID, SLACK_HOOK=SLACK_HOOK)
 def get_channels_old_api(event, context):
     payload_dict = event.get('queryStringParameters')
-    user_address = payload_dict["user_address"]
     org_id = payload_dict.get("org_id", None)
     service_id = payload_dict.get("service_id", None)
     group_id = payload_dict.get("group_id", None)
-    response_data = obj_mpe.get_channels(
-        user_address=user_address,
-        org_id=org_id,
-        service_id=service_id,
-        group_id=group_id
-    )
+    if "user_addresses" in payload_dict:
+        if org_id is None or group_id is None:
+            return generate_lambda_response(StatusCode.BAD_REQUEST, "Bad Request", cors_enabled=True)
+        user_addresses = [address for address in payload_dict["user_addresses"].split(",") if address]
+        response_data = {
+            "org_id": org_id,
+            "group_id": group_id,
+            "channels": obj_mpe.get_channels_by_user_addresses_org_group(
+                user_addresses=user_addresses, org_id=org_id, group_id=group_id)
+        }
+    elif "user_address" in payload_dict:
+        response_data = obj_mpe.get_channels(
+            user_address=payload_dict["user_address"],
+            org_id=org_id,
+            service_id=service_id,
+            group_id=group_id
+        )
+    else:
+        return generate_lambda_response(StatusCode.BAD_REQUEST, "Bad Request", cors_enabled=True)
     return generate_lambda_response(
         200, {"status": "success", "data": response_data}, cors_enabled=True)
 
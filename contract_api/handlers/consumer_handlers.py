@@ -1,4 +1,5 @@
 from common.constant import StatusCode
+from common.ipfs_util import IPFSUtil
 from common.logger import get_logger
 from common.utils import generate_lambda_response, Utils
 from contract_api.config import NETWORKS, SLACK_HOOK
@@ -15,6 +16,7 @@ def organization_event_consumer_handler(event, context):
         logger.info(f"Got Organization Event {event}")
         organization_event_consumer = get_organization_event_consumer(event)
         organization_event_consumer.on_event(event)
+        logger.info(f"IPFS cache metrics {IPFSUtil.get_cache_metrics()}")
 
         return generate_lambda_response(200, StatusCode.OK)
     except Exception as e:
@@ -29,6 +31,7 @@ def service_event_consumer_handler(event, context):
     try:
         service_event_consumer = get_service_event_consumer(event)
         service_event_consumer.on_event(event)
+        logger.info(f"IPFS cache metrics {IPFSUtil.get_cache_metrics()}")
         return generate_lambda_response(200, StatusCode.OK)
     except Exception as e:
         logger.exception(f"error  {str(e)} while processing event {event}")
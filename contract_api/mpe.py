@@ -1,7 +1,7 @@
 import decimal
-import json
 
-from common.blockchain_util import BlockChainUtil
+from common.block_height import BlockHeightCache
+from common.json_util import loads_cached
 from common.logger import get_logger
 from common.utils import Utils
 from contract_api.config import NETWORKS, NETWORK_ID
@@ -14,7 +14,8 @@ class MPE:
     def __init__(self, obj_repo):
         self.repo = obj_repo
         self.obj_util = Utils()
-        self.blockchain_util = BlockChainUtil(provider_type="WS_PROVIDER", provider=NETWORKS[NETWORK_ID]["ws_provider"])
+        self.block_height = BlockHeightCache.for_provider(provider_type="WS_PROVIDER",
+                                                          provider=NETWORKS[NETWORK_ID]["ws_provider"])
 
     def get_channels(self, user_address, org_id=None, service_id=None, group_id=None):
         if user_address and org_id and group_id:
@@ -30,7 +31,7 @@ class MPE:
             raise Exception("Invalid Request")
 
     def get_channels_by_user_address_v2(self, user_address):
-        last_block_no = self.blockchain_util.get_current_block_no()
+        last_block_no = self.block_height.get_block_number()
         logger.info(f"got block number {last_block_no}")
         channel_details_query = "SELECT mc.channel_id, mc.sender, mc.recipient, mc.groupId as group_id, " \
                                 "mc.balance_in_cogs, mc.pending, mc.nonce, mc.consumed_balance, mc.expiration, " \
@@ -61,7 +62,7 @@ class MPE:
                 org_data[org_id] = {
                     "org_name": channel_record["organization_name"],
                     "org_id": org_id,
-                    "hero_image": json.loads(channel_record["org_assets_url"]).get("hero_image", ""),
+                    "hero_image": loads_cached(channel_record["org_assets_url"]).get("hero_image", ""),
                     "groups": {}
                 }
             if group_id not in org_data[org_id]["groups"]:
@@ -93,7 +94,7 @@ class MPE:
         return list(org_data.values())
 
     def get_channels_by_user_address(self, user_address, service_id, org_id):
-        last_block_no = self.blockchain_util.get_current_block_no()
+        last_block_no = self.block_height.get_block_number()
         params = [last_block_no]
         print('Inside get_channel_info::user_address',
               user_address, '|', org_id, '|', service_id)
@@ -142,21 +143,30 @@ class MPE:
         return list(channel_dta.values())
 
     def get_channels_by_user_address_org_group(self, user_address, org_id=None, group_id=None):
-        last_block_no = self.blockchain_util.get_current_block_no()
-        params = [last_block_no, org_id, group_id, user_address]
+        channels_by_sender = self.get_channels_by_user_addresses_org_group([user_address], org_id, group_id)
+        channel_data = {
+            'group_id': group_id,
+            'org_id': org_id,
+            'channels': [channel for channels in channels_by_sender.values() for channel in channels]
+        }
+        return channel_data
+
+    def get_channels_by_user_addresses_org_group(self, user_addresses, org_id, group_id):
+        """ Returns the channels of many senders in one query, keyed by sender address. """
+        if len(user_addresses) == 0:
+            return {}
+        last_block_no = self.block_height.get_block_number()
+        params = [last_block_no, org_id, group_id] + list(user_addresses)
         raw_channel_data = self.repo.execute(
             "SELECT C.* , OG.payment, OG.org_id, IF(C.expiration > %s, 'active','inactive') AS status FROM "
             "mpe_channel C JOIN org_group OG ON C.groupId = OG.group_id "
-            "where OG.org_id = %s and C.groupId = %s and C.sender = %s", params
+            "where OG.org_id = %s and C.groupId = %s and C.sender IN (" + ",".join(["%s"] * len(user_addresses)) +
+            ")", params
         )
         self.obj_util.clean(raw_channel_data)
-        channel_data = {
-            'group_id': group_id,
-            'org_id': org_id,
-            'channels': []
-        }
+        channels_by_sender = {}
         for record in raw_channel_data:
-            record["payment"] = json.loads(record["payment"])
+            record["payment"] = loads_cached(record["payment"])
             if record["recipient"] == record["payment"]["payment_address"]:
                 channel = {'channel_id': record['channel_id'],
                            'recipient': record['recipient'],
@@ -170,9 +180,9 @@ class MPE:
                            'signer': record['signer'],
                            'status': record['status']
                            }
-                channel_data['channels'].append(channel)
+                channels_by_sender.setdefault(record['sender'], []).append(channel)
 
-        return channel_data
+        return channels_by_sender
 
     def get_channel_data_by_group_id_and_channel_id(self, group_id, channel_id):
         try:
@@ -1,9 +1,18 @@
-import json
+import re
 from collections import defaultdict
 from common.utils import Utils
+from common.exceptions import BadRequestException
+from common.json_util import loads_cached
 from contract_api.filter import Filter
 from contract_api.constant import GET_ALL_SERVICE_OFFSET_LIMIT, GET_ALL_SERVICE_LIMIT
 
+SEARCH_FILTER_COLUMNS = {"org_id": "D.org_id", "service_id": "D.service_id", "display_name": "D.display_name",
+                         "ranking": "M.ranking"}
+# columns of the FULLTEXT indexes of service_search_document searched by each value of the s parameter
+SEARCH_FULLTEXT_COLUMNS = {"all": "D.org_id, D.organization_name, D.display_name, D.tags",
+                           "display_name": "D.display_name", "tag_name": "D.tags"}
+SEARCH_TERM_SEPARATOR = re.compile(r"\W+")
+
 
 class Registry:
     def __init__(self, obj_repo):
@@ -13,7 +22,7 @@ class Registry:
     def _get_all_service(self):
         """ Method to generate org_id and service mapping."""
         try:
-            all_orgs_srvcs_raw = self.repo.execute("SELECT O.org_id, O.organization_name,O.org_assets_url, O.owner_address, S.service_id  FROM service S, "
+            all_orgs_srvcs_raw = self.repo.iter_execute("SELECT O.org_id, O.organization_name,O.org_assets_url, O.owner_address, S.service_id  FROM service S, "
                                                    "organization O WHERE S.org_id = O.org_id AND S.is_curated = 1")
             all_orgs_srvcs = {}
             for rec in all_orgs_srvcs_raw:
@@ -65,39 +74,41 @@ class Registry:
             raise e
 
     def _prepare_subquery(self, s, q, fm):
+        """
+            Services match when every word of q starts a word of the searched columns, answered from the FULLTEXT
+            indexes of service_search_document. org_id is matched by prefix on its unique key.
+        """
         try:
-            sub_qry = ""
-            if s == "all":
-                for rec in fm:
-                    sub_qry += fm[rec] + " LIKE '%" + str(q) + "%' OR "
-                sub_qry = sub_qry[:-3] if sub_qry.endswith("OR ") else sub_qry
-            else:
-                sub_qry += fm[s] + " LIKE '%" + str(q) + "%' "
-            return sub_qry.replace("org_id", "M.org_id")
+            if s != "all" and s not in fm:
+                raise KeyError(s)
+            search_terms = [term for term in SEARCH_TERM_SEPARATOR.split(str(q)) if term != ""]
+            if len(search_terms) == 0:
+                return "TRUE", []
+            if s == "org_id":
+                return "D.org_id LIKE %s", [str(q).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"]
+            return "MATCH (" + SEARCH_FULLTEXT_COLUMNS[s] + ") AGAINST (%s IN BOOLEAN MODE)", \
+                   [" ".join("+" + term + "*" for term in search_terms)]
         except Exception as err:
             raise err
 
     def _get_total_count(self, sub_qry, filter_query, values):
         try:
-            if filter_query != "":
-                filter_query = " AND " + filter_query
-            search_count_query = "SELECT count(*) as search_count FROM service A, (SELECT DISTINCT M.org_id, M.service_id FROM " \
-                                 "service_metadata M LEFT JOIN service_tags T ON M.service_row_id = T.service_row_id WHERE (" \
-                                 + sub_qry.replace('%', '%%') + ")" + filter_query + ") B WHERE A.service_id = B.service_id " \
-                                 "AND A.org_id = B.org_id AND A.is_curated = 1 "
-
+            search_count_query = "SELECT count(*) as search_count FROM service_search_document D " \
+                                 "JOIN service S ON S.row_id = D.service_row_id " \
+                                 "JOIN service_metadata M ON M.service_row_id = D.service_row_id " \
+                                 "WHERE S.is_curated = 1 AND (" + sub_qry + ")" + filter_query
             res = self.repo.execute(search_count_query, values)
             return res[0].get("search_count", 0)
         except Exception as err:
             raise err
 
     def _convert_service_metadata_str_to_json(self, record):
-        record["service_rating"] = json.loads(record["service_rating"])
-        record["assets_url"] = json.loads(record["assets_url"])
-        record["org_assets_url"] = json.loads(record["org_assets_url"])
-        record["assets_hash"] = json.loads(record["assets_hash"])
-        record["contributors"] = json.loads(record.get("contributors", "[]"))
-        record["contacts"] = json.loads(record.get("contacts", "[]"))
+        record["service_rating"] = loads_cached(record["service_rating"])
+        record["assets_url"] = loads_cached(record["assets_url"])
+        record["org_assets_url"] = loads_cached(record["org_assets_url"])
+        record["assets_hash"] = loads_cached(record["assets_hash"])
+        record["contributors"] = loads_cached(record.get("contributors", "[]"))
+        record["contacts"] = loads_cached(record.get("contacts", "[]"))
 
         if record["contacts"] is None:
             record["contacts"] = []
@@ -105,56 +116,40 @@ class Registry:
             record["contributors"] = []
 
     def _search_query_data(self, sub_qry, sort_by, order_by, offset, limit, filter_query, values):
+        """ Returns the requested page of matching services and the total match count from one indexed query. """
         try:
-            if filter_query != "":
-                filter_query = " AND " + filter_query
-            srch_qry = "SELECT * FROM service A, (SELECT M.org_id, M.service_id, group_concat(T.tag_name) AS tags FROM " \
-                       "service_metadata M LEFT JOIN service_tags T ON M.service_row_id = T.service_row_id " \
-                       "LEFT JOIN service_endpoint E ON M.service_row_id = E.service_row_id WHERE (" \
-                       + sub_qry.replace('%', '%%') + ")" + filter_query + \
-                       " GROUP BY M.org_id, M.service_id ORDER BY E.is_available DESC, " + sort_by + " " + order_by + \
-                       " ) B WHERE A.service_id = B.service_id AND A.org_id=B.org_id AND A.is_curated= 1 LIMIT %s , %s"
-
-            qry_dta = self.repo.execute(
-                srch_qry, values + [int(offset), int(limit)])
-            org_srvc_tuple = ()
-            rslt = {}
-            for rec in qry_dta:
-                org_id = rec['org_id']
-                service_id = rec['service_id']
-                tags = rec['tags']
-                org_srvc_tuple = org_srvc_tuple + ((org_id, service_id),)
-                if org_id not in rslt.keys():
-                    rslt[org_id] = {}
-                if service_id not in rslt[org_id].keys():
-                    rslt[org_id][service_id] = {}
-                rslt[org_id][service_id]["tags"] = tags
-            qry_part = " AND (S.org_id, S.service_id) IN " + \
-                str(org_srvc_tuple).replace(',)', ')')
-            print("qry_part::", qry_part)
-            sort_by = sort_by.replace("org_id", "M.org_id")
+            srch_qry = "SELECT D.service_row_id, D.tags, " \
+                       "EXISTS (SELECT 1 FROM service_endpoint E WHERE E.service_row_id = D.service_row_id " \
+                       "AND E.is_available = 1) AS is_available, COUNT(*) OVER () AS total_count " \
+                       "FROM service_search_document D JOIN service S ON S.row_id = D.service_row_id " \
+                       "JOIN service_metadata M ON M.service_row_id = D.service_row_id " \
+                       "WHERE S.is_curated = 1 AND (" + sub_qry + ")" + filter_query + \
+                       " ORDER BY is_available DESC, " + sort_by + " " + order_by + " LIMIT %s , %s"
+            search_page = self.repo.execute(srch_qry, values + [int(offset), int(limit)])
+            if len(search_page) == 0:
+                return 0, []
+            total_count = search_page[0]["total_count"]
+
+            service_row_ids = [rec["service_row_id"] for rec in search_page]
             services = self.repo.execute(
-                "SELECT M.*,O.organization_name,O.org_assets_url FROM service_endpoint E, service_metadata M, service S "
-                ", organization O WHERE O.org_id = S.org_id AND S.row_id = M.service_row_id AND "
-                "S.row_id = E.service_row_id " + qry_part + "ORDER BY E.is_available DESC, " + sort_by + " " + order_by)
-            obj_utils = Utils()
-            obj_utils.clean(services)
-            available_service = self._get_is_available_service()
-            for rec in services:
+                "SELECT M.*, O.organization_name, O.org_assets_url FROM service_metadata M, organization O "
+                "WHERE O.org_id = M.org_id AND M.service_row_id IN (" + ",".join(["%s"] * len(service_row_ids)) + ")",
+                service_row_ids)
+            services_by_row_id = {rec["service_row_id"]: rec for rec in services}
+            result = []
+            for search_rec in search_page:
+                rec = services_by_row_id.get(search_rec["service_row_id"], None)
+                if rec is None:
+                    continue
+                self.obj_utils.clean_row(rec)
                 self._convert_service_metadata_str_to_json(rec)
-
-                org_id = rec["org_id"]
-                service_id = rec["service_id"]
                 tags = []
-                is_available = 0
-                if rslt.get(org_id, {}).get(service_id, {}).get("tags", None) is not None:
-                    tags = rslt[org_id][service_id]["tags"].split(",")
-                if (org_id, service_id) in available_service:
-                    is_available = 1
+                if search_rec["tags"] is not None:
+                    tags = search_rec["tags"].split(",")
                 rec.update({"tags": tags})
-                rec.update({"is_available": is_available})
-
-            return services
+                rec.update({"is_available": int(search_rec["is_available"])})
+                result.append(rec)
+            return total_count, result
         except Exception as err:
             raise err
 
@@ -166,33 +161,36 @@ class Registry:
 
     def get_all_srvcs(self, qry_param):
         try:
-            fields_mapping = {"display_name": "display_name",
-                              "tag_name": "tag_name", "org_id": "org_id"}
+            fields_mapping = {"display_name": "D.display_name",
+                              "tag_name": "D.tags", "org_id": "D.org_id"}
             s = qry_param.get('s', 'all')
             q = qry_param.get('q', '')
             offset = qry_param.get('offset', GET_ALL_SERVICE_OFFSET_LIMIT)
             limit = qry_param.get('limit', GET_ALL_SERVICE_LIMIT)
             sort_by = fields_mapping.get(
-                qry_param.get('sort_by', None), "ranking")
+                qry_param.get('sort_by', None), "M.ranking")
             order_by = qry_param.get('order_by', 'desc')
             if order_by.lower() != "desc":
                 order_by = "asc"
 
-            sub_qry = self._prepare_subquery(s=s, q=q, fm=fields_mapping)
+            sub_qry, values = self._prepare_subquery(s=s, q=q, fm=fields_mapping)
             print("get_all_srvcs::sub_qry: ", sub_qry)
 
-            filter_qry = ""
+            filter_query = ""
             if qry_param.get("filters", None) is not None:
-                filter_query, values = self._filters_to_query(
+                filter_query, filter_values = self._filters_to_query(
                     qry_param.get("filters"))
                 print("get_all_srvcs::filter_query: ",
-                      filter_query, "|values: ", values)
-            total_count = self._get_total_count(
-                sub_qry=sub_qry, filter_query=filter_query, values=values)
-            if total_count == 0:
-                return self._search_response_format(total_count, offset, limit, [])
-            q_dta = self._search_query_data(sub_qry=sub_qry, sort_by=sort_by, order_by=order_by,
-                                            offset=offset, limit=limit, filter_query=filter_query, values=values)
+                      filter_query, "|values: ", filter_values)
+                if filter_query != "":
+                    filter_query = " AND (" + filter_query + ")"
+                    values = values + filter_values
+            total_count, q_dta = self._search_query_data(sub_qry=sub_qry, sort_by=sort_by, order_by=order_by,
+                                                         offset=offset, limit=limit, filter_query=filter_query,
+                                                         values=values)
+            if total_count == 0 and int(offset) > 0:
+                # page is past the last match, the window count is not available
+                total_count = self._get_total_count(sub_qry=sub_qry, filter_query=filter_query, values=values)
             return self._search_response_format(total_count, offset, limit, q_dta)
         except Exception as e:
             print(repr(e))
@@ -210,7 +208,7 @@ class Registry:
                 if group_id not in groups.keys():
                     groups = {group_id: {"group_id": rec['group_id'],
                                          "group_name": rec['group_name'],
-                                         "pricing": json.loads(rec['pricing']),
+                                         "pricing": loads_cached(rec['pricing']),
                                          "endpoints": []
                                          }
                               }
@@ -221,31 +219,24 @@ class Registry:
             print(repr(e))
             raise e
 
-    def _get_is_available_service(self):
-        try:
-            available_service = []
-            srvc_st_dta = self.repo.execute(
-                "SELECT DISTINCT org_id, service_id  FROM service_endpoint WHERE is_available = 1")
-            for rec in srvc_st_dta:
-                available_service.append((rec['org_id'], rec['service_id']), )
-            return available_service
-        except Exception as err:
-            print(repr(err))
-            raise err
-
     def _filter_condition_to_query(self, filter_condition):
-        value = []
-        if filter_condition.attr in ["org_id", "service_id"]:
-            filter_condition.attr = "M." + filter_condition.attr
+        value = filter_condition.value
+        if not isinstance(value, list):
+            value = [value]
         if filter_condition.operator == "=":
-            value = filter_condition.value
-            return '%s %s"%s"' % (filter_condition.attr, filter_condition.operator, "%s"), value
-        if filter_condition.operator == "IN":
-            value = filter_condition.value
-            return '%s %s %s' % (filter_condition.attr, filter_condition.operator, "(" + (("%s,")*len(value))[:-1] + ")"), value
-        if filter_condition.operator == "BETWEEN":
-            value = filter_condition.value
-            return '%s %s %s AND %s' % (filter_condition.attr, filter_condition.operator, "%s", "%s"), value
+            condition = "= %s"
+        elif filter_condition.operator == "IN":
+            condition = "IN (" + ",".join(["%s"] * len(value)) + ")"
+        elif filter_condition.operator == "BETWEEN":
+            condition = "BETWEEN %s AND %s"
+        else:
+            raise BadRequestException(f"Unsupported filter operator {filter_condition.operator}")
+        if filter_condition.attr == "tag_name":
+            return "EXISTS (SELECT 1 FROM service_tags T WHERE T.service_row_id = D.service_row_id " \
+                   "AND T.tag_name " + condition + ")", value
+        if filter_condition.attr not in SEARCH_FILTER_COLUMNS:
+            raise BadRequestException(f"Unsupported filter attribute {filter_condition.attr}")
+        return SEARCH_FILTER_COLUMNS[filter_condition.attr] + " " + condition, value
 
     def _filters_to_query(self, filter_json):
         query = ""
@@ -295,7 +286,7 @@ class Registry:
         try:
             groups_data = self.repo.execute(
                 "SELECT group_id, group_name, payment FROM org_group WHERE org_id = %s", [org_id])
-            [group_record.update({'payment': json.loads(group_record['payment'])})
+            [group_record.update({'payment': loads_cached(group_record['payment'])})
              for group_record in groups_data]
             groups = {"org_id": org_id,
                       "groups": groups_data}
@@ -310,7 +301,7 @@ class Registry:
             "SELECT group_id, group_name, payment , org_id FROM org_group WHERE org_id = %s and group_id = %s",
             [org_id, group_id]
         )
-        [group_record.update({'payment': json.loads(group_record['payment'])})
+        [group_record.update({'payment': loads_cached(group_record['payment'])})
          for group_record in group_data]
         return {"groups": group_data}
 
@@ -346,7 +337,7 @@ class Registry:
 
             for rec in org_group_data:
                 org_groups_dict[rec['group_id']] = {
-                    "payment": json.loads(rec["payment"])}
+                    "payment": loads_cached(rec["payment"])}
 
             is_available = 0
             # Hard Coded Free calls in group data
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import Mock
+
+from contract_api.consumers.event_consumer import EventConsumer
+
+
+class TestEventConsumer(unittest.TestCase):
+    def setUp(self):
+        self.event_consumer = EventConsumer()
+        self.event_consumer._s3_util = Mock()
+        self.event_consumer._push_asset_to_s3_using_hash = Mock(
+            side_effect=lambda hash, org_id, service_id: "https://s3/" + hash)
+
+    def test_only_changed_items_of_list_assets_are_transferred(self):
+        existing_assets_hash = {"hero_image": "QmA/hero.png", "gallery": ["QmB/1.png", "QmC/2.png", "QmD/3.png"]}
+        existing_assets_url = {"hero_image": "https://s3/QmA/hero.png",
+                               "gallery": ["https://s3/QmB/1.png", "https://s3/QmC/2.png", "https://s3/QmD/3.png"]}
+        new_assets_hash = {"hero_image": "QmA/hero.png", "gallery": ["QmD/3.png", "QmE/4.png", "QmB/1.png"]}
+
+        assets_url_mapping = self.event_consumer._comapre_assets_and_push_to_s3(
+            existing_assets_hash, new_assets_hash, existing_assets_url, "snet", "example-service")
+
+        assert (assets_url_mapping == {
+            "hero_image": "https://s3/QmA/hero.png",
+            "gallery": ["https://s3/QmD/3.png", "https://s3/QmE/4.png", "https://s3/QmB/1.png"]
+        })
+        self.event_consumer._push_asset_to_s3_using_hash.assert_called_once_with(
+            "QmE/4.png", "snet", "example-service")
+        self.event_consumer._s3_util.delete_file_from_s3.assert_called_once_with("https://s3/QmC/2.png")
+
+    def test_list_assets_without_matching_hashes_are_fully_synced(self):
+        assets_url_mapping = self.event_consumer._comapre_assets_and_push_to_s3(
+            {}, {"gallery": ["QmB/1.png", "QmC/2.png"]}, {"gallery": ["https://s3/old.png"]}, "snet", "")
+
+        assert (assets_url_mapping == {"gallery": ["https://s3/QmB/1.png", "https://s3/QmC/2.png"]})
+        self.event_consumer._s3_util.delete_file_from_s3.assert_called_once_with("https://s3/old.png")
+
+
+if __name__ == '__main__':
+    unittest.main()
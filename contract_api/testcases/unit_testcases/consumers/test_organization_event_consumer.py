@@ -14,7 +14,7 @@ class TestOrganizationEventConsumer(unittest.TestCase):
 
     @patch('common.s3_util.S3Util.push_io_bytes_to_s3')
     @patch('common.ipfs_util.IPFSUtil.read_file_from_ipfs')
-    @patch('common.ipfs_util.IPFSUtil.read_bytesio_from_ipfs')
+    @patch('common.ipfs_util.IPFSUtil.read_stream_from_ipfs')
     @patch(
         'contract_api.consumers.organization_event_consumer.OrganizationEventConsumer._get_org_details_from_blockchain')
     def test_organziation_create_update_event(self, mock_get_org_details_from_blockchain, nock_read_bytesio_from_ipfs,
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from common.repository import Repository
 from contract_api.config import NETWORKS, NETWORK_ID
 from contract_api.consumers.service_event_consumer import ServiceCreatedEventConsumer
+from contract_api.dao.organization_repository import OrganizationRepository
 from contract_api.dao.service_repository import ServiceRepository
 
 
@@ -14,7 +15,7 @@ class TestOrganizationEventConsumer(unittest.TestCase):
 
     @patch('common.s3_util.S3Util.push_io_bytes_to_s3')
     @patch('common.ipfs_util.IPFSUtil.read_file_from_ipfs')
-    @patch('common.ipfs_util.IPFSUtil.read_bytesio_from_ipfs')
+    @patch('common.ipfs_util.IPFSUtil.read_stream_from_ipfs')
     @patch('contract_api.consumers.service_event_consumer.ServiceEventConsumer._fetch_tags')
     def test_on_service_created_event(self, mock_fetch_tags, nock_read_bytesio_from_ipfs, mock_ipfs_read, mock_s3_push):
         event = {"data": {'row_id': 202, 'block_no': 6325625, 'event': 'ServiceCreated',
@@ -29,6 +30,9 @@ class TestOrganizationEventConsumer(unittest.TestCase):
         service_repository = ServiceRepository(connection)
         service_repository.delete_service(org_id='snet', service_id='gene-annotation-service')
         service_repository.delete_service_dependents(org_id='snet', service_id='gene-annotation-service')
+        OrganizationRepository(connection).create_or_updatet_organization(
+            org_id='snet', org_name='SingularityNET', owner_address='0x123', org_metadata_uri='', description='{}',
+            assets_hash='{}', assets_url='{}', contacts='[]')
 
         nock_read_bytesio_from_ipfs.return_value = "some_value to_be_pushed_to_s3_whic_is_mocked"
         mock_ipfs_read.return_value = {
@@ -102,3 +106,7 @@ class TestOrganizationEventConsumer(unittest.TestCase):
         assert service_tags == [{'org_id': 'snet', 'service_id': 'gene-annotation-service', 'tag_name': 'atomese'},
                                 {'org_id': 'snet', 'service_id': 'gene-annotation-service',
                                  'tag_name': 'bioinformatics'}]
+        search_document = service_repository.get_search_document(org_id='snet', service_id='gene-annotation-service')
+        assert search_document == {'org_id': 'snet', 'service_id': 'gene-annotation-service',
+                                   'organization_name': 'SingularityNET',
+                                   'display_name': 'Annotation Service', 'tags': 'atomese,bioinformatics'}
@@ -0,0 +1,35 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from contract_api.handlers.channel_handlers import get_channels_old_api
+
+
+class TestChannelHandlers(unittest.TestCase):
+
+    @patch("contract_api.mpe.MPE.get_channels_by_user_addresses_org_group")
+    def test_get_channels_of_many_user_addresses(self, mock_get_channels_by_user_addresses_org_group):
+        mock_get_channels_by_user_addresses_org_group.return_value = {"0x123": [], "0x456": []}
+        event = {"queryStringParameters": {"user_addresses": "0x123,0x456", "org_id": "snet",
+                                           "group_id": "GROUP-123"}}
+        response = get_channels_old_api(event=event, context=None)
+        assert (response["statusCode"] == 200)
+        assert (json.loads(response["body"])["data"]["channels"] == {"0x123": [], "0x456": []})
+        mock_get_channels_by_user_addresses_org_group.assert_called_once_with(
+            user_addresses=["0x123", "0x456"], org_id="snet", group_id="GROUP-123")
+
+    @patch("contract_api.mpe.MPE.get_channels")
+    @patch("contract_api.mpe.MPE.get_channels_by_user_addresses_org_group")
+    def test_get_channels_without_org_group_or_user_address_is_a_bad_request(
+            self, mock_get_channels_by_user_addresses_org_group, mock_get_channels):
+        for query_string_parameters in [{"user_addresses": "0x123,0x456"},
+                                        {"user_addresses": "0x123,0x456", "org_id": "snet"},
+                                        {"org_id": "snet", "group_id": "GROUP-123"}]:
+            response = get_channels_old_api(event={"queryStringParameters": query_string_parameters}, context=None)
+            assert (response["statusCode"] == 400)
+        mock_get_channels_by_user_addresses_org_group.assert_not_called()
+        mock_get_channels.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
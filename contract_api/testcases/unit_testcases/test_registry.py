@@ -0,0 +1,30 @@
+import unittest
+from unittest.mock import Mock
+
+from contract_api.registry import Registry
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry(obj_repo=Mock())
+        self.fields_mapping = {"display_name": "D.display_name", "tag_name": "D.tags", "org_id": "D.org_id"}
+
+    def test_search_words_are_matched_by_prefix_on_the_fulltext_index(self):
+        sub_qry, values = self.registry._prepare_subquery(s="all", q="gene-annot", fm=self.fields_mapping)
+        assert (sub_qry == "MATCH (D.org_id, D.organization_name, D.display_name, D.tags) "
+                           "AGAINST (%s IN BOOLEAN MODE)")
+        assert (values == ["+gene* +annot*"])
+        sub_qry, values = self.registry._prepare_subquery(s="tag_name", q='"nlp" (-audio)', fm=self.fields_mapping)
+        assert (sub_qry == "MATCH (D.tags) AGAINST (%s IN BOOLEAN MODE)" and values == ["+nlp* +audio*"])
+
+    def test_org_id_is_matched_by_prefix(self):
+        sub_qry, values = self.registry._prepare_subquery(s="org_id", q="snet_%", fm=self.fields_mapping)
+        assert (sub_qry == "D.org_id LIKE %s" and values == ["snet\\_\\%%"])
+
+    def test_empty_search_matches_every_service(self):
+        assert (self.registry._prepare_subquery(s="all", q="", fm=self.fields_mapping) == ("TRUE", []))
+        self.assertRaises(KeyError, self.registry._prepare_subquery, s="description", q="gene", fm=self.fields_mapping)
+
+
+if __name__ == '__main__':
+    unittest.main()
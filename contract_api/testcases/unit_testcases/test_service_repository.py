@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import Mock
+
+from contract_api.dao.organization_repository import OrganizationRepository
+from contract_api.dao.service_repository import ServiceRepository
+
+
+class TestServiceRepository(unittest.TestCase):
+    def setUp(self):
+        self.connection = Mock()
+        self.connection.execute.return_value = [2, {"last_row_id": 10}]
+
+    def test_endpoints_of_all_groups_are_inserted_with_one_statement(self):
+        ServiceRepository(self.connection).create_service_endpoints(
+            service_row_id=1, org_id="snet", service_id="example-service",
+            endpoints=[{"group_id": "group-1", "endpoint": "https://example.io:8080"},
+                       {"group_id": "group-2", "endpoint": "https://example.io:8081"}])
+        self.connection.execute.assert_called_once()
+        query, params = self.connection.execute.call_args[0]
+        assert (query.count("(%s, %s, %s, %s, %s, %s, %s, %s)") == 2)
+        assert (params[3:5] == ["group-1", "https://example.io:8080"])
+        assert (params[11:13] == ["group-2", "https://example.io:8081"])
+
+    def test_empty_rows_are_not_written(self):
+        ServiceRepository(self.connection).create_service_tags(
+            service_row_id=1, org_id="snet", service_id="example-service", tag_names=[])
+        self.connection.execute.assert_not_called()
+
+    def test_members_are_upserted_with_one_statement(self):
+        assert (OrganizationRepository(self.connection).create_or_update_members("snet", ["0x1", "0x2"]) == 2)
+        query, params = self.connection.execute.call_args[0]
+        assert (query.endswith("ON DUPLICATE KEY UPDATE row_updated = VALUES(row_updated)"))
+        assert (len(params) == 8)
+
+    def test_sync_only_writes_changed_endpoints(self):
+        self.connection.execute.side_effect = [
+            [{"row_id": 1, "group_id": "group-1", "endpoint": "https://example.io:8080"},
+             {"row_id": 2, "group_id": "group-1", "endpoint": "https://example.io:8081"}],
+            [1, {"last_row_id": None}],
+            [1, {"last_row_id": 3}]
+        ]
+        ServiceRepository(self.connection).sync_service_endpoints(
+            service_row_id=1, org_id="snet", service_id="example-service",
+            endpoints=[{"group_id": "group-1", "endpoint": "https://example.io:8080"},
+                       {"group_id": "group-1", "endpoint": "https://example.io:8082"}])
+        delete_query, delete_params = self.connection.execute.call_args_list[1][0]
+        assert (delete_query == "DELETE FROM service_endpoint WHERE row_id IN (%s)" and delete_params == [2])
+        insert_query, insert_params = self.connection.execute.call_args_list[2][0]
+        assert (insert_query.count("(%s, %s, %s, %s, %s, %s, %s, %s)") == 1)
+        assert (insert_params[4] == "https://example.io:8082")
+
+    def test_unchanged_groups_are_not_written(self):
+        self.connection.execute.return_value = [
+            {"row_id": 1, "service_row_id": 1, "group_id": "group-1", "group_name": "default_group",
+             "pricing": '[{"default": true, "price_model": "fixed_price"}]'}]
+        ServiceRepository(self.connection).sync_service_groups(
+            service_row_id=1, org_id="snet", service_id="example-service",
+            groups=[{"group_id": "group-1", "group_name": "default_group",
+                     "pricing": '[{"price_model": "fixed_price", "default": true}]'}])
+        self.connection.execute.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,8 @@
 import json
 import re
 import traceback
-import boto3
 from dapp_user.config import NETWORKS, GET_FREE_CALLS_METERING_ARN, SLACK_HOOK, NETWORK_ID
+from common.lambda_transport import get_lambda_client
 from common.repository import Repository
 from common.utils import Utils
 from common.utils import handle_exception_with_slack_notification
@@ -61,7 +61,7 @@ def request_handler(event, context):
             feedback_data=payload_dict['feedback'], user_data=event['requestContext'])
 
     elif "/usage/freecalls" == path:
-        lambda_client = boto3.client('lambda')
+        lambda_client = get_lambda_client()
         response = lambda_client.invoke(FunctionName=GET_FREE_CALLS_METERING_ARN, InvocationType='RequestResponse',
                                         Payload=json.dumps(event))
         result = json.loads(response.get('Payload').read())
@@ -7,98 +7,78 @@ logger = get_logger(__name__)
 
 class EventRepository(object):
     EVENTS_LIMIT = 10
+    INSERT_BATCH_SIZE = 1000
+    RAW_EVENT_TABLES = {"REGISTRY": "registry_events_raw", "MPE": "mpe_events_raw", "RFAI": "rfai_events_raw"}
 
     def __init__(self, connection):
         self.connection = connection
 
-    def read_rfai_events(self):
+    def read_rfai_events(self, limit=EVENTS_LIMIT):
 
-        query = 'select row_id, block_no, event, json_str, processed, transactionHash, logIndex, error_code, error_msg, row_updated, row_created from rfai_events_raw where processed = 0 order by block_no asc limit ' + str(
-            EventRepository.EVENTS_LIMIT)
+        query = 'select row_id, block_no, event, json_str, processed, transactionHash, logIndex, error_code, error_msg, row_updated, row_created from rfai_events_raw where processed = 0 order by block_no asc limit ' + str(int(limit))
         events = self.connection.execute(query)
 
         return events
 
-    def read_registry_events(self):
-        query = 'select * from registry_events_raw where processed = 0 order by block_no asc limit ' + str(
-            EventRepository.EVENTS_LIMIT)
+    def read_registry_events(self, limit=EVENTS_LIMIT):
+        query = 'select * from registry_events_raw where processed = 0 order by block_no asc limit ' + str(int(limit))
         events = self.connection.execute(query)
         return events
 
-    def read_mpe_events(self):
-        query = 'select * from mpe_events_raw where processed = 0 order by block_no asc limit ' + str(
-            EventRepository.EVENTS_LIMIT)
+    def read_mpe_events(self, limit=EVENTS_LIMIT):
+        query = 'select * from mpe_events_raw where processed = 0 order by block_no asc limit ' + str(int(limit))
         events = self.connection.execute(query)
         return events
 
-    def update_mpe_raw_events(self, processed, row_id, error_code, error_message):
+    def update_raw_events(self, event_type, processed, event_statuses):
+        """ Marks a batch of raw events with their own error code and message in one UPDATE statement. """
+        if len(event_statuses) == 0:
+            return
+        row_ids = [row_id for row_id, error_code, error_message in event_statuses]
+        error_code_cases = " ".join(["WHEN %s THEN %s"] * len(event_statuses))
+        error_message_cases = " ".join(["WHEN %s THEN %s"] * len(event_statuses))
+        update_events = "UPDATE " + EventRepository.RAW_EVENT_TABLES[event_type] + \
+                        " SET processed = %s, error_code = CASE row_id " + error_code_cases + \
+                        " END, error_msg = CASE row_id " + error_message_cases + \
+                        " END WHERE row_id IN (" + ",".join(["%s"] * len(row_ids)) + ")"
+        update_params = [processed]
+        for row_id, error_code, error_message in event_statuses:
+            update_params.extend([row_id, error_code])
+        for row_id, error_code, error_message in event_statuses:
+            update_params.extend([row_id, error_message])
+        update_params.extend(row_ids)
         try:
-            update_events = 'UPDATE mpe_events_raw SET processed = %s , error_code = %s, error_msg = %s WHERE row_id = %s '
-            update_events_reponse = self.connection.execute(update_events,
-                                                            [processed, error_code, error_message, row_id])
-
+            self.connection.execute(update_events, update_params)
         except Exception as e:
+            logger.exception(f"Error while updating the {event_type} raw events {str(e)}")
             self.connection.rollback_transaction()
             raise e
 
-    def update_registry_raw_events(self, processed, row_id, error_code, error_message):
-        try:
-            update_events = 'UPDATE registry_events_raw SET processed = %s, error_code = %s, error_msg = %s WHERE row_id = %s '
-            update_events_reponse = self.connection.execute(update_events,
-                                                            [processed, error_code, error_message, row_id])
-
-        except Exception as e:
-            logger.exception(f"Error while updating the registry_raw_event {str(e)}")
-            self.connection.rollback_transaction()
-            raise e
-
-    def update_rfai_raw_events(self, processed, row_id, error_code, error_message):
+    def insert_raw_events_and_update_last_block_number(self, event_type, events, last_block_number):
+        """
+            Inserts all raw events of a block range with multi row inserts and advances the block number marker
+            in the same transaction, so a batch is either fully recorded or retried as a whole.
+        """
+        insert_query = "Insert into " + EventRepository.RAW_EVENT_TABLES[event_type] + \
+                       " (block_no, event, json_str, processed, transactionHash, logIndex ,error_code,error_msg,row_updated,row_created) " \
+                       "VALUES ( %s, %s, %s, %s, %s , %s, %s, %s, %s, %s ) "
+        current_time = datetime.utcnow()
+        insert_params = [[block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
+                          error_message, current_time, current_time]
+                         for block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
+                             error_message in events]
         try:
-            update_events = 'UPDATE rfai_events_raw SET processed = %s, error_code = %s, error_msg = %s WHERE row_id = %s '
-            update_events_reponse = self.connection.execute(update_events,
-                                                            [processed, error_code, error_message, row_id])
-
+            self.connection.begin_transaction()
+            for index in range(0, len(insert_params), EventRepository.INSERT_BATCH_SIZE):
+                self.connection.bulk_query(insert_query,
+                                           insert_params[index:index + EventRepository.INSERT_BATCH_SIZE])
+            self.update_last_read_block_number_for_event(event_type, last_block_number)
+            self.connection.commit_transaction()
         except Exception as e:
-            logger.exception(f"Error while updating the registry_raw_event {str(e)}")
+            logger.exception(f"Error while inserting {event_type} raw events {str(e)}")
             self.connection.rollback_transaction()
             raise e
 
-    def insert_registry_event(self, block_number, event_name, json_str, processed, transaction_hash, log_index,
-                              error_code, error_message):
-        # insert into database here
-        insert_query = "Insert into registry_events_raw (block_no, event, json_str, processed, transactionHash, logIndex ,error_code,error_msg,row_updated,row_created) " \
-                       "VALUES ( %s, %s, %s, %s, %s , %s, %s, %s, %s, %s ) "
-        insert_params = [block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
-                         error_message,
-                         datetime.utcnow(), datetime.utcnow()]
-
-        query_reponse = self.connection.execute(insert_query, insert_params)
-
-    def insert_mpe_event(self, block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
-                         error_message):
-        # insert into database here
-        insert_query = "Insert into mpe_events_raw (block_no, event, json_str, processed, transactionHash, logIndex ,error_code,error_msg,row_updated,row_created) " \
-                       "VALUES ( %s, %s, %s, %s, %s , %s, %s, %s, %s, %s ) "
-        insert_params = [block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
-                         error_message,
-                         datetime.utcnow(), datetime.utcnow()]
-
-        query_reponse = self.connection.execute(insert_query, insert_params)
-
-
-
-    def insert_rfai_event(self, block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
-                         error_message):
-        # insert into database here
-        insert_query = "Insert into rfai_events_raw (block_no, event, json_str, processed, transactionHash, logIndex ,error_code,error_msg,row_updated,row_created) " \
-                       "VALUES ( %s, %s, %s, %s, %s , %s, %s, %s, %s, %s ) "
-        insert_params = [block_number, event_name, json_str, processed, transaction_hash, log_index, error_code,
-                         error_message,
-                         datetime.utcnow(), datetime.utcnow()]
-
-        query_reponse = self.connection.execute(insert_query, insert_params)
-
-
     def read_last_read_block_number_for_event(self, event_type):
         read_query = "SELECT row_id, event_type, last_block_number, row_created, row_updated FROM  event_blocknumber_marker where event_type = %s"
 
@@ -1,3 +1,8 @@
+import ast
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from common.logger import get_logger
 from event_pubsub.repository import Repository
 from event_pubsub.config import NETWORKS, EVENT_SUBSCRIPTIONS
@@ -12,9 +17,17 @@ logger = get_logger(__name__)
 class EventListener(object):
     _connection = Repository(NETWORKS=NETWORKS)
     _event_repository = EventRepository(_connection)
+    EVENTS_LIMIT = 100
+    PUBLISH_MAX_WORKERS = 10
+    LISTENER_CONCURRENCY_LIMIT = 5
+    # event arguments identifying the entities whose events have to be delivered in block order, events sharing
+    # the value of any of them are delivered sequentially
+    ENTITY_KEY_ATTRIBUTES = []
 
     def __init__(self, repository=None):
         self.event_consumer_map = EventListener.initiate_event_subscription()
+        self._listener_semaphores = {}
+        self._listener_semaphores_lock = threading.Lock()
 
     def subscribe(self, event_names, event_consumer):
         for event in event_names:
@@ -43,12 +56,46 @@ class EventListener(object):
         elif listener["type"] == "lambda_arn":
             return LambdaArnHandler(listener["url"])
 
-    def _publish_events(self, events):
-
+    def _get_listener_semaphore(self, listener):
+        with self._listener_semaphores_lock:
+            if listener["url"] not in self._listener_semaphores:
+                self._listener_semaphores[listener["url"]] = threading.BoundedSemaphore(
+                    self.LISTENER_CONCURRENCY_LIMIT)
+            return self._listener_semaphores[listener["url"]]
+
+    def _get_entity_keys(self, event):
+        try:
+            event_data = ast.literal_eval(event["json_str"])
+        except (ValueError, SyntaxError, TypeError):
+            return []
+        return [(attribute, event_data[attribute]) for attribute in self.ENTITY_KEY_ATTRIBUTES
+                if attribute in event_data]
+
+    def _group_events_by_entity(self, events):
+        """ Groups events sharing any entity key, transitively, keeping the order in which they were read. """
+        group_ids = list(range(len(events)))
+
+        def find_group_id(index):
+            while group_ids[index] != index:
+                group_ids[index] = group_ids[group_ids[index]]
+                index = group_ids[index]
+            return index
+
+        first_index_by_key = {}
+        for index, event in enumerate(events):
+            for entity_key in self._get_entity_keys(event):
+                if entity_key in first_index_by_key:
+                    group_ids[find_group_id(index)] = find_group_id(first_index_by_key[entity_key])
+                else:
+                    first_index_by_key[entity_key] = index
+        events_by_group = OrderedDict()
+        for index, event in enumerate(events):
+            events_by_group.setdefault(find_group_id(index), []).append(event)
+        return list(events_by_group.values())
+
+    def _publish_entity_events(self, entity_events):
         error_map = {}
-        success_list = []
-
-        for event in events:
+        for event in entity_events:
             listeners = []
             if event['event'] in self.event_consumer_map:
                 listeners = self.event_consumer_map[event['event']]
@@ -57,61 +104,63 @@ class EventListener(object):
                 logger.debug(f"pushing events {push_event} to listener {listener['url']}")
                 try:
                     listener_handler = self._get_listener_handler(listener)
-                    listener_handler.push_event(push_event)
+                    with self._get_listener_semaphore(listener):
+                        listener_handler.push_event(push_event)
                 except Exception as e:
                     logger.exception(
                         f"Error while processing event with error {str(e)} for event {event} listener {listener['url']}")
                     error_map[event["row_id"]] = {"error_code": 500,
                                                   "error_message": f"for listener {listener['url']} got error {str(e)}"}
-            success_list.append(event["row_id"])
+        return error_map
+
+    def _publish_events(self, events):
+        """
+            Delivers events on a worker pool. Events of the same entity are pushed sequentially in the order
+            they were read, events of different entities concurrently.
+        """
+        error_map = {}
+        success_list = [event["row_id"] for event in events]
+
+        with ThreadPoolExecutor(max_workers=self.PUBLISH_MAX_WORKERS) as executor:
+            for entity_error_map in executor.map(self._publish_entity_events, self._group_events_by_entity(events)):
+                error_map.update(entity_error_map)
 
         return error_map, success_list
 
+    def _update_published_events(self, event_type, error_map, success_list):
+        event_statuses = [(row_id, error['error_code'], error['error_message']) for row_id, error in error_map.items()]
+        event_statuses.extend([(row_id, 200, "") for row_id in success_list if row_id not in error_map])
+        self._event_repository.update_raw_events(event_type, 1, event_statuses)
+
 
 class MPEEventListener(EventListener):
-    EVENTS_LIMIT = 30
+    ENTITY_KEY_ATTRIBUTES = ["channelId", "sender"]
 
     def listen_and_publish_mpe_events(self):
-        mpe_events = self._event_repository.read_mpe_events()
+        mpe_events = self._event_repository.read_mpe_events(self.EVENTS_LIMIT)
         logger.debug(f" read mpe_events to push to subscribers {mpe_events}")
         error_map, success_list = self._publish_events(mpe_events)
-        # need to change it to batch update
-        for row_id, error in error_map.items():
-            self._event_repository.update_mpe_raw_events(1, row_id, error['error_code'], error['error_message'])
-
-        for row_id in success_list:
-            self._event_repository.update_mpe_raw_events(1, row_id, 200, "")
+        self._update_published_events("MPE", error_map, success_list)
 
         return error_map, success_list
 
 
 class RegistryEventListener(EventListener):
-    EVENTS_LIMIT = 30
+    ENTITY_KEY_ATTRIBUTES = ["orgId"]
 
     def listen_and_publish_registry_events(self):
-        registry_events = self._event_repository.read_registry_events()
+        registry_events = self._event_repository.read_registry_events(self.EVENTS_LIMIT)
         error_map, success_map = self._publish_events(registry_events)
-        # need to change it to batch update
-        for row_id, error in error_map.items():
-            self._event_repository.update_registry_raw_events(1, row_id, error['error_code'], error['error_message'])
-
-        for row_id in success_map:
-            self._event_repository.update_registry_raw_events(1, row_id, 200, "")
+        self._update_published_events("REGISTRY", error_map, success_map)
         return error_map, success_map
 
 
 class RFAIEventListener(EventListener):
-    EVENTS_LIMIT = 30
+    ENTITY_KEY_ATTRIBUTES = ["requestId"]
 
     def listen_and_publish_rfai_events(self):
-        rfai_events = self._event_repository.read_rfai_events()
+        rfai_events = self._event_repository.read_rfai_events(self.EVENTS_LIMIT)
         error_map, success_map = self._publish_events(rfai_events)
-        # need to change is to batch update
-        for row_id, error in error_map.items():
-            self._event_repository.update_rfai_raw_events(1, row_id, error['error_code'], error['error_message'])
-
-        for row_id in success_map:
-            self._event_repository.update_rfai_raw_events(1, row_id, 200, "")
+        self._update_published_events("RFAI", error_map, success_map)
 
         return error_map, success_map
-
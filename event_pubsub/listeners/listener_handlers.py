@@ -1,7 +1,7 @@
 import requests
 import json
-import boto3
 
+from common.lambda_transport import get_lambda_client
 from event_pubsub.config import REGION_NAME
 
 
@@ -25,7 +25,7 @@ class WebHookHandler(ListenersHandlers):
 
 
 class LambdaArnHandler(ListenersHandlers):
-    lambda_client = boto3.client('lambda',region_name=REGION_NAME)
+    lambda_client = get_lambda_client(region_name=REGION_NAME)
 
     def __init__(self, arn):
         self.arn = arn
@@ -3,15 +3,22 @@ import os
 from common.blockchain_util import BlockChainUtil, ContractType
 from common.logger import get_logger
 from event_pubsub.event_repository import EventRepository
+from event_pubsub.producers.blockchain_log_fetcher import BlockchainLogFetcher
 from event_pubsub.producers.event_producer import EventProducer
 
 logger = get_logger(__name__)
 
 
 class BlockchainEventProducer(EventProducer):
+    LOG_FETCH_MAX_WORKERS = 4
+    LOG_FETCH_SUB_RANGE_SIZE = 5000
+
     def __init__(self, ws_provider, repository=None, ):
         self._blockchain_util = BlockChainUtil("WS_PROVIDER", ws_provider)
         self._event_repository = EventRepository(repository)
+        self._log_fetcher = BlockchainLogFetcher(lambda: BlockChainUtil("WS_PROVIDER", ws_provider),
+                                                 max_workers=self.LOG_FETCH_MAX_WORKERS,
+                                                 sub_range_size=self.LOG_FETCH_SUB_RANGE_SIZE)
 
     def _get_base_contract_path(self):
         pass
@@ -20,18 +27,7 @@ class BlockchainEventProducer(EventProducer):
 
         base_contract_path = self._get_base_contract_path()
         contract = self._blockchain_util.get_contract_instance(base_contract_path, self._contract_name, net_id=net_id)
-        contract_events = contract.events
-        all_blockchain_events = []
-
-        for attributes in contract_events.abi:
-            if attributes['type'] == 'event':
-                event_name = attributes['name']
-                event_object = getattr(contract.events, event_name)
-                blockchain_events = event_object.createFilter(fromBlock=start_block_number,
-                                                              toBlock=end_block_number).get_all_entries()
-                all_blockchain_events.extend(blockchain_events)
-
-        return all_blockchain_events
+        return self._log_fetcher.fetch_events(contract, start_block_number, end_block_number)
 
     def _produce_contract_events(self, start_block_number, end_block_number, net_id):
 
@@ -47,18 +43,7 @@ class BlockchainEventProducer(EventProducer):
 
         return end_block_number
 
-    def produce_event(self, net_id):
-        pass
-
-
-class RegistryEventProducer(BlockchainEventProducer):
-    REGISTRY_EVENT_READ_BATCH_LIMIT = 50000
-
-    def __init__(self, ws_provider, repository=None):
-        super().__init__(ws_provider, repository)
-        self._contract_name = "REGISTRY"
-
-    def _push_event(self, event):
+    def _convert_event_to_raw_event(self, event):
         """
           `row_id` int(11) NOT NULL AUTO_INCREMENT,
           `block_no` int(11) NOT NULL,
@@ -79,20 +64,27 @@ class RegistryEventProducer(BlockchainEventProducer):
         event_name = event.event
         json_str = str(dict(event.args))
         processed = 0
-        transaction_hash =  event.transactionHash.hex()
+        transaction_hash = event.transactionHash.hex()
         log_index = event.logIndex
         error_code = 0
         error_message = ""
+        return block_number, event_name, json_str, processed, transaction_hash, log_index, error_code, error_message
 
-        # insert into database here
+    def _push_events_to_repository(self, events, end_block_number):
+        raw_events = [self._convert_event_to_raw_event(event) for event in events]
+        self._event_repository.insert_raw_events_and_update_last_block_number(self._contract_name, raw_events,
+                                                                              end_block_number)
 
-        self._event_repository.insert_registry_event(block_number, event_name, json_str, processed, transaction_hash,
-                                                     log_index,
-                                                     error_code, error_message)
+    def produce_event(self, net_id):
+        pass
+
+
+class RegistryEventProducer(BlockchainEventProducer):
+    REGISTRY_EVENT_READ_BATCH_LIMIT = 50000
 
-    def _push_events_to_repository(self, events):
-        for event in events:
-            self._push_event(event)
+    def __init__(self, ws_provider, repository=None):
+        super().__init__(ws_provider, repository)
+        self._contract_name = "REGISTRY"
 
     def _get_base_contract_path(self):
         return os.path.abspath(
@@ -104,8 +96,7 @@ class RegistryEventProducer(BlockchainEventProducer):
                                                       RegistryEventProducer.REGISTRY_EVENT_READ_BATCH_LIMIT)
         logger.info(f"reading registry event from {last_block_number} to {end_block_number}")
         events = self._produce_contract_events(last_block_number, end_block_number, net_id)
-        self._push_events_to_repository(events)
-        self._event_repository.update_last_read_block_number_for_event(self._contract_name, end_block_number)
+        self._push_events_to_repository(events, end_block_number)
 
         return events
 
@@ -117,53 +108,16 @@ class MPEEventProducer(BlockchainEventProducer):
         super().__init__(ws_provider, repository)
         self._contract_name = "MPE"
 
-    def _push_event(self, event):
-        """
-          `row_id` int(11) NOT NULL AUTO_INCREMENT,
-          `block_no` int(11) NOT NULL,
-          `event` varchar(256) NOT NULL,
-          `json_str` text,
-          `processed` bit(1) DEFAULT NULL,
-          `transactionHash` varchar(256) DEFAULT NULL,
-          `logIndex` varchar(256) DEFAULT NULL,
-          `error_code` int(11) DEFAULT NULL,
-          `error_msg` varchar(256) DEFAULT NULL,
-          `row_updated` timestamp NULL DEFAULT NULL,
-          `row_created` timestamp NULL DEFAULT NULL,
-        :param event:
-        :return:
-        """
-
-        block_number = event.blockNumber
-        event_name = event.event
-        json_str = str(dict(event.args))
-        processed = 0
-        transaction_hash = event.transactionHash.hex()
-        log_index = event.logIndex
-        error_code = 0
-        error_message = ""
-
-        # insert into database here
-
-        self._event_repository.insert_mpe_event(block_number, event_name, json_str, processed, transaction_hash,
-                                                log_index,
-                                                error_code, error_message)
-
     def _get_base_contract_path(self):
         return os.path.abspath(
             os.path.join(os.path.dirname(__file__), '..', '..', 'node_modules', 'singularitynet-platform-contracts'))
 
-    def _push_events_to_repository(self, events):
-        for event in events:
-            self._push_event(event)
-
     def produce_event(self, net_id):
         last_block_number = self._event_repository.read_last_read_block_number_for_event(self._contract_name)
         end_block_number = self._get_end_block_number(last_block_number, self.MPE_EVENT_READ_BATCH_LIMIT)
         logger.info(f"reading mpe event from {last_block_number} to {end_block_number}")
         events = self._produce_contract_events(last_block_number, end_block_number, net_id)
-        self._push_events_to_repository(events)
-        self._event_repository.update_last_read_block_number_for_event(self._contract_name, end_block_number)
+        self._push_events_to_repository(events, end_block_number)
         return events
 
 
@@ -174,51 +128,14 @@ class RFAIEventProducer(BlockchainEventProducer):
         super().__init__(ws_provider, repository)
         self._contract_name = "RFAI"
 
-    def _push_event(self, event):
-        """
-          `row_id` int(11) NOT NULL AUTO_INCREMENT,
-          `block_no` int(11) NOT NULL,
-          `event` varchar(256) NOT NULL,
-          `json_str` text,
-          `processed` bit(1) DEFAULT NULL,
-          `transactionHash` varchar(256) DEFAULT NULL,
-          `logIndex` varchar(256) DEFAULT NULL,
-          `error_code` int(11) DEFAULT NULL,
-          `error_msg` varchar(256) DEFAULT NULL,
-          `row_updated` timestamp NULL DEFAULT NULL,
-          `row_created` timestamp NULL DEFAULT NULL,
-        :param event:
-        :return:
-        """
-
-        block_number = event.blockNumber
-        event_name = event.event
-        json_str = str(dict(event.args))
-        processed = 0
-        transaction_hash = event.transactionHash.hex()
-        log_index = event.logIndex
-        error_code = 0
-        error_message = ""
-
-        # insert into database here
-
-        self._event_repository.insert_rfai_event(block_number, event_name, json_str, processed, transaction_hash,
-                                                 log_index,
-                                                 error_code, error_message)
-
     def _get_base_contract_path(self):
         return os.path.abspath(
             os.path.join(os.path.dirname(__file__), '..', '..', 'node_modules', 'singularitynet-rfai-contracts'))
 
-    def _push_events_to_repository(self, events):
-        for event in events:
-            self._push_event(event)
-
     def produce_event(self, net_id):
         last_block_number = self._event_repository.read_last_read_block_number_for_event(self._contract_name)
         end_block_number = self._get_end_block_number(last_block_number, self.RFAI_EVENT_READ_BATCH_LIMIT)
         logger.info(f"reading mpe event from {last_block_number} to {end_block_number}")
         events = self._produce_contract_events(last_block_number, end_block_number, net_id)
-        self._push_events_to_repository(events)
-        self._event_repository.update_last_read_block_number_for_event(self._contract_name, end_block_number)
+        self._push_events_to_repository(events, end_block_number)
         return events
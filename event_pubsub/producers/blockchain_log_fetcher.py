@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+RANGE_TOO_LARGE_ERRORS = ("more than", "too large", "too many", "limit exceeded", "-32005")
+
+
+class BlockchainLogFetcher(object):
+    """
+        Reads the logs of every event of a contract with one eth_getLogs call per block sub range and decodes
+        them locally. Sub ranges are fetched on a bounded thread pool and a sub range rejected by the node as
+        too large is split in halves and retried. Providers are kept in a pool owned by the fetcher, so they
+        are reused across calls although every call starts new worker threads.
+    """
+
+    def __init__(self, blockchain_util_factory, max_workers=4, sub_range_size=5000):
+        self._blockchain_util_factory = blockchain_util_factory
+        self._max_workers = max_workers
+        self._sub_range_size = sub_range_size
+        self._idle_blockchain_utils = []
+        self._blockchain_utils_lock = threading.Lock()
+
+    def fetch_events(self, contract, start_block_number, end_block_number):
+        event_names_by_topic = {
+            Web3.toHex(event_abi_to_log_topic(attributes)): attributes['name']
+            for attributes in contract.events.abi if attributes['type'] == 'event'}
+        topics = [list(event_names_by_topic.keys())]
+
+        block_ranges = self._split_block_range(start_block_number, end_block_number)
+        if len(block_ranges) == 0:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self._max_workers, len(block_ranges))) as executor:
+            logs_per_range = list(executor.map(
+                lambda block_range: self._get_logs(contract.address, block_range[0], block_range[1], topics),
+                block_ranges))
+
+        events = []
+        for logs in logs_per_range:
+            for log in logs:
+                event_name = event_names_by_topic.get(Web3.toHex(log['topics'][0]), None)
+                if event_name is None:
+                    continue
+                events.append(getattr(contract.events, event_name)().processLog(log))
+        events.sort(key=lambda event: (event.blockNumber, event.logIndex))
+        return events
+
+    def _split_block_range(self, start_block_number, end_block_number):
+        block_ranges = []
+        from_block = start_block_number
+        while from_block <= end_block_number:
+            to_block = min(from_block + self._sub_range_size - 1, end_block_number)
+            block_ranges.append((from_block, to_block))
+            from_block = to_block + 1
+        return block_ranges
+
+    def _borrow_blockchain_util(self):
+        with self._blockchain_utils_lock:
+            if len(self._idle_blockchain_utils) > 0:
+                return self._idle_blockchain_utils.pop()
+        return self._blockchain_util_factory()
+
+    def _release_blockchain_util(self, blockchain_util):
+        with self._blockchain_utils_lock:
+            self._idle_blockchain_utils.append(blockchain_util)
+
+    def _get_logs(self, address, from_block, to_block, topics):
+        blockchain_util = self._borrow_blockchain_util()
+        try:
+            return blockchain_util.get_logs(address, from_block, to_block, topics)
+        except ValueError as e:
+            if from_block >= to_block or not self._is_range_too_large(e):
+                raise e
+        finally:
+            self._release_blockchain_util(blockchain_util)
+        middle_block = (from_block + to_block) // 2
+        logger.info(f"block range {from_block} to {to_block} rejected as too large, splitting at {middle_block}")
+        return self._get_logs(address, from_block, middle_block, topics) + \
+            self._get_logs(address, middle_block + 1, to_block, topics)
+
+    @staticmethod
+    def _is_range_too_large(error):
+        message = str(error).lower()
+        return any(error_text in message for error_text in RANGE_TOO_LARGE_ERRORS)
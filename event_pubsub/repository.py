@@ -56,11 +56,13 @@ class Repository:
         try:
             with self.connection.cursor() as cursor:
                 result = cursor.executemany(query, params)
-                self.connection.commit()
+                if self.auto_commit:
+                    self.connection.commit()
                 return result
         except Exception as err:
             self.connection.rollback()
             print("DB Error in %s, error: %s" % (str(query), repr(err)))
+            raise err
 
     def begin_transaction(self):
         self.auto_commit = False
@@ -0,0 +1,33 @@
+import unittest
+from unittest.mock import Mock
+
+from event_pubsub.producers.blockchain_log_fetcher import BlockchainLogFetcher
+
+
+class TestBlockchainLogFetcher(unittest.TestCase):
+    def test_providers_are_reused_across_calls_and_splits(self):
+        blockchain_util = Mock()
+
+        def get_logs(address, from_block, to_block, topics):
+            if to_block - from_block >= 10:
+                raise ValueError({"code": -32005, "message": "query returned more than 10000 results"})
+            return [(from_block, to_block)]
+
+        blockchain_util.get_logs.side_effect = get_logs
+        blockchain_util_factory = Mock(return_value=blockchain_util)
+        log_fetcher = BlockchainLogFetcher(blockchain_util_factory)
+
+        assert (log_fetcher._get_logs("0x1", 0, 15, []) == [(0, 7), (8, 15)])
+        assert (log_fetcher._get_logs("0x1", 16, 20, []) == [(16, 20)])
+        blockchain_util_factory.assert_called_once()
+
+    def test_provider_is_returned_to_the_pool_on_error(self):
+        blockchain_util_factory = Mock()
+        blockchain_util_factory.return_value.get_logs.side_effect = ValueError("execution reverted")
+        log_fetcher = BlockchainLogFetcher(blockchain_util_factory)
+        self.assertRaises(ValueError, log_fetcher._get_logs, "0x1", 0, 15, [])
+        assert (log_fetcher._idle_blockchain_utils == [blockchain_util_factory.return_value])
+
+
+if __name__ == '__main__':
+    unittest.main()
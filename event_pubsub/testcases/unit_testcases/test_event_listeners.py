@@ -1,8 +1,9 @@
-import unittest
+import threading
+import time
 import unittest
 from unittest.mock import patch, Mock
 
-from event_pubsub.listeners.event_listeners import EventListener, RegistryEventListener
+from event_pubsub.listeners.event_listeners import EventListener, MPEEventListener, RegistryEventListener
 
 
 class TestBlockchainEventSubsriber(unittest.TestCase):
@@ -39,4 +40,62 @@ class TestBlockchainEventSubsriber(unittest.TestCase):
         mock_lambda_handler.return_value = {"statusCode": 500}
 
         error_map, success_list = RegistryEventListener().listen_and_publish_registry_events()
-        assert error_map == {526: {'error_code': 500, 'error_message': 'for listener arn:aws got error Test Error'}}
\ No newline at end of file
+        assert error_map == {526: {'error_code': 500, 'error_message': 'for listener arn:aws got error Test Error'}}
+
+    def _mpe_event(self, row_id, event_name, json_str):
+        return {'row_id': row_id, 'block_no': 6247992 + row_id, 'event': event_name, 'json_str': json_str,
+                'processed': 0, 'transactionHash': "b'0x123'", 'logIndex': '43', 'error_code': 200, 'error_msg': '',
+                'row_updated': '2019-10-31 09:44:00', 'row_created': '2019-10-31 09:44:00'}
+
+    def test_mpe_events_of_a_sender_and_its_channels_are_grouped_in_order(self):
+        events = [
+            self._mpe_event(1, 'DepositFunds', "{'sender': '0xA', 'amount': 10}"),
+            self._mpe_event(2, 'ChannelOpen', "{'channelId': 1, 'sender': '0xB', 'recipient': '0xC'}"),
+            self._mpe_event(3, 'ChannelOpen', "{'channelId': 2, 'sender': '0xA', 'recipient': '0xC'}"),
+            self._mpe_event(4, 'ChannelExtend', "{'channelId': 2, 'newExpiration': 100}"),
+            self._mpe_event(5, 'Withdraw', "{'sender': '0xA', 'amount': 5}"),
+            self._mpe_event(6, 'ChannelClaim', "not a literal"),
+            self._mpe_event(7, 'ChannelAddFunds', "{'channelId': 1, 'additionalFunds': 5}")
+        ]
+        groups = MPEEventListener()._group_events_by_entity(events)
+        assert [[event['row_id'] for event in group] for group in groups] == [[1, 3, 4, 5], [2, 7], [6]]
+
+    @patch('event_pubsub.event_repository.EventRepository.update_raw_events')
+    @patch('event_pubsub.event_repository.EventRepository.read_mpe_events')
+    @patch('event_pubsub.listeners.listener_handlers.LambdaArnHandler.push_event')
+    def test_events_of_an_entity_are_published_in_order_and_failures_are_not_marked_processed(
+            self, mock_push_event, mock_read_mpe_events, mock_update_raw_events):
+        mock_read_mpe_events.return_value = [
+            self._mpe_event(1, 'ChannelOpen', "{'channelId': 1, 'sender': '0xA'}"),
+            self._mpe_event(2, 'ChannelOpen', "{'channelId': 2, 'sender': '0xB'}"),
+            self._mpe_event(3, 'ChannelAddFunds', "{'channelId': 1, 'additionalFunds': 5}"),
+            self._mpe_event(4, 'ChannelAddFunds', "{'channelId': 2, 'additionalFunds': 5}")
+        ]
+        published_row_ids = []
+        published_row_ids_lock = threading.Lock()
+
+        def push_event(push_event):
+            row_id = push_event['data']['row_id']
+            if row_id == 1:
+                time.sleep(0.2)
+            if row_id == 4:
+                raise Exception('Test Error')
+            with published_row_ids_lock:
+                published_row_ids.append(row_id)
+            return {"statusCode": 200}
+
+        mock_push_event.side_effect = push_event
+        listener = MPEEventListener()
+        listener.event_consumer_map = {'ChannelOpen': [{'type': 'lambda_arn', 'url': 'arn:aws'}],
+                                       'ChannelAddFunds': [{'type': 'lambda_arn', 'url': 'arn:aws'}]}
+        error_map, success_list = listener.listen_and_publish_mpe_events()
+        assert published_row_ids == [2, 1, 3]
+        assert error_map == {4: {'error_code': 500, 'error_message': 'for listener arn:aws got error Test Error'}}
+        event_type, processed, event_statuses = mock_update_raw_events.call_args[0]
+        assert (event_type, processed) == ("MPE", 1)
+        assert sorted(event_statuses) == [(1, 200, ""), (2, 200, ""), (3, 200, ""),
+                                          (4, 500, 'for listener arn:aws got error Test Error')]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from event_pubsub.event_repository import EventRepository
+
+
+class TestEventRepository(unittest.TestCase):
+    def setUp(self):
+        self.connection = Mock()
+        self.event_repository = EventRepository(self.connection)
+        self.events = [(100 + index, "OrganizationCreated", "{}", 0, "0x123", index, 200, "")
+                       for index in range(5)]
+
+    @patch("event_pubsub.event_repository.EventRepository.INSERT_BATCH_SIZE", 2)
+    def test_events_are_inserted_in_batches_with_the_block_marker(self):
+        self.event_repository.insert_raw_events_and_update_last_block_number("REGISTRY", self.events, 110)
+        self.connection.begin_transaction.assert_called_once()
+        insert_calls = self.connection.bulk_query.call_args_list
+        assert ([len(insert_call[0][1]) for insert_call in insert_calls] == [2, 2, 1])
+        assert (insert_calls[0][0][0].startswith("Insert into registry_events_raw"))
+        assert (insert_calls[2][0][1][0][:8] == list(self.events[4]))
+        update_query, update_params = self.connection.execute.call_args[0]
+        assert (update_query.startswith("update event_blocknumber_marker"))
+        assert (update_params[0] == 110 and update_params[2] == "REGISTRY")
+        self.connection.commit_transaction.assert_called_once()
+        self.connection.rollback_transaction.assert_not_called()
+
+    def test_failed_insert_rolls_back_events_and_block_marker(self):
+        self.connection.bulk_query.side_effect = Exception("Deadlock found when trying to get lock")
+        self.assertRaises(Exception, self.event_repository.insert_raw_events_and_update_last_block_number,
+                          "MPE", self.events, 110)
+        self.connection.execute.assert_not_called()
+        self.connection.commit_transaction.assert_not_called()
+        self.connection.rollback_transaction.assert_called_once()
+
+    def test_failed_block_marker_update_rolls_back_events(self):
+        self.connection.execute.side_effect = Exception("Lock wait timeout exceeded")
+        self.assertRaises(Exception, self.event_repository.insert_raw_events_and_update_last_block_number,
+                          "RFAI", self.events, 110)
+        self.connection.bulk_query.assert_called_once()
+        self.connection.commit_transaction.assert_not_called()
+        self.connection.rollback_transaction.assert_called_once()
+
+    def test_raw_events_are_marked_with_their_own_status_in_one_update(self):
+        self.event_repository.update_raw_events(
+            "MPE", 1, [(7, 500, "for listener arn:aws got error Timeout"), (3, 200, ""), (5, 200, "")])
+        self.connection.execute.assert_called_once()
+        update_query, update_params = self.connection.execute.call_args[0]
+        assert (update_query == "UPDATE mpe_events_raw SET processed = %s, "
+                                "error_code = CASE row_id WHEN %s THEN %s WHEN %s THEN %s WHEN %s THEN %s END, "
+                                "error_msg = CASE row_id WHEN %s THEN %s WHEN %s THEN %s WHEN %s THEN %s END "
+                                "WHERE row_id IN (%s,%s,%s)")
+        assert (update_params == [1, 7, 500, 3, 200, 5, 200,
+                                  7, "for listener arn:aws got error Timeout", 3, "", 5, "", 7, 3, 5])
+
+    def test_no_update_is_issued_without_events(self):
+        self.event_repository.update_raw_events("REGISTRY", 1, [])
+        self.connection.execute.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+"""create order_processing table
+
+Revision ID: 3b9a4c1d7e02
+Revises: f72d9e8fbd5b
+Create Date: 2026-10-18 20:41:12.381942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9a4c1d7e02'
+down_revision = 'f72d9e8fbd5b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute("""
+         CREATE TABLE `order_processing` (
+            `row_id` int NOT NULL AUTO_INCREMENT,
+            `order_id` varchar(128) NOT NULL,
+            `status` varchar(64) NOT NULL,
+            `step` varchar(64) NOT NULL,
+            `transaction_hash` varchar(128) DEFAULT NULL,
+            `row_created` timestamp NULL DEFAULT NULL,
+            `row_updated` timestamp NULL DEFAULT NULL,
+            PRIMARY KEY (`row_id`),
+            UNIQUE KEY `uq_order_id` (`order_id`)
+        );
+    """)
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute("""
+            drop table order_processing;
+            """)
@@ -16,6 +16,7 @@ NETWORK_ID = 0
 CREATE_ORDER_SERVICE_ARN = ""
 INITIATE_PAYMENT_SERVICE_ARN = ""
 EXECUTE_PAYMENT_SERVICE_ARN = ""
+PROCESS_ORDER_SERVICE_ARN = ""
 WALLETS_SERVICE_ARN = ""
 CREATE_CHANNEL_ARN = ""
 CREATE_CHANNEL_EVENT_ARN = ""
@@ -1 +1,6 @@
 REQUIRED_KEYS_FOR_LAMBDA_EVENT = ["path", "httpMethod"]
+ORG_NAME_CACHE_TTL = 300
+ORDER_IDS_PER_TRANSACTIONS_REQUEST = 100
+CHANNEL_DETAILS_CACHE_TTL = 30
+CHANNEL_DETAILS_CACHE_MAX_SIZE = 1000
+ORDER_PROCESSING_CLAIM_TIMEOUT_IN_SECONDS = 300
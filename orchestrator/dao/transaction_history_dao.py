@@ -1,8 +1,10 @@
 from datetime import datetime as dt
+from datetime import timedelta
 
 from common.logger import get_logger
 from orchestrator.config import ORDER_EXPIRATION_THRESHOLD_IN_MINUTES
-from orchestrator.order_status import OrderStatus
+from orchestrator.constant import ORDER_PROCESSING_CLAIM_TIMEOUT_IN_SECONDS
+from orchestrator.order_status import OrderStatus, OrderProcessingStep
 
 logger = get_logger(__name__)
 
@@ -64,6 +66,48 @@ class TransactionHistoryDAO:
         logger.info(f"update_transaction_status: {update_transaction_status_response}")
         return update_transaction_status_response
 
+    def get_latest_transaction_status(self, order_id):
+        """ Transaction history keeps one row per step of the order, the latest row holds its current status. """
+        transaction_data = self.__repo.execute(
+            "SELECT status FROM transaction_history WHERE order_id = %s ORDER BY row_id DESC LIMIT 1", [order_id])
+        if len(transaction_data) == 0:
+            return None
+        return transaction_data[0]["status"]
+
+    def claim_order_for_processing(self, order_id):
+        """
+            Claims an order before any transaction is submitted for it and returns the step it reached, or None
+            when it is processed or being processed by a live invocation. The unique order_id makes the first
+            claim atomic. A failed claim, or a processing claim older than the lambda timeout, is claimed again
+            so the order is resumed from its saved step.
+        """
+        query_response = self.__repo.execute(
+            "INSERT IGNORE INTO order_processing (order_id, status, step, row_created, row_updated) "
+            "VALUES(%s, %s, %s, %s, %s)",
+            [order_id, OrderStatus.ORDER_PROCESSING.value, OrderProcessingStep.CLAIMED.value, dt.utcnow(),
+             dt.utcnow()])
+        if query_response[0] != 1:
+            claim_expired_at = dt.utcnow() - timedelta(seconds=ORDER_PROCESSING_CLAIM_TIMEOUT_IN_SECONDS)
+            query_response = self.__repo.execute(
+                "UPDATE order_processing SET status = %s, row_updated = %s WHERE order_id = %s AND "
+                "(status = %s OR (status = %s AND row_updated < %s))",
+                [OrderStatus.ORDER_PROCESSING.value, dt.utcnow(), order_id,
+                 OrderStatus.ORDER_PROCESSING_FAILED.value, OrderStatus.ORDER_PROCESSING.value, claim_expired_at])
+            if query_response[0] != 1:
+                return None
+        order_processing = self.__repo.execute(
+            "SELECT order_id, status, step, transaction_hash FROM order_processing WHERE order_id = %s", [order_id])
+        return order_processing[0]
+
+    def update_order_processing_step(self, order_id, step, transaction_hash=None):
+        self.__repo.execute(
+            "UPDATE order_processing SET step = %s, transaction_hash = %s, row_updated = %s WHERE order_id = %s",
+            [step, transaction_hash, dt.utcnow(), order_id])
+
+    def update_order_processing_status(self, order_id, status):
+        self.__repo.execute("UPDATE order_processing SET status = %s, row_updated = %s WHERE order_id = %s",
+                            [status, dt.utcnow(), order_id])
+
     def get_transaction_details_for_given_order_id(self, order_id):
         transaction_data = self.__repo.execute(
             "SELECT username, order_id, order_type, status, payment_id, payment_type, payment_method, raw_payment_data, "
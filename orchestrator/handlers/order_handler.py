@@ -117,6 +117,20 @@ def execute(event, context):
     ), cors_enabled=True)
 
 
+def process(event, context):
+    """ Invoked asynchronously by execute with the order to process, a failed invocation is retried and resumes
+        the order from the step it reached. """
+    logger.info(f"Received request to process order {event.get('order_id', None)}")
+    try:
+        OrderService(obj_repo=repo).process_order(event)
+    except Exception as e:
+        logger.error(f"Failed to process order {event.get('order_id', None)}, error: {repr(e)}")
+        utils.report_slack(1, f"Failed to process order {event.get('order_id', None)}", SLACK_HOOK)
+        traceback.print_exc()
+        raise e
+    return {}
+
+
 def get(event, context):
     logger.info("Received request to get orders for username")
     try:
@@ -132,8 +146,9 @@ def get(event, context):
         else:
             logger.info(f"Getting order details for order_id {order_id}")
             if order_id is not None:
-                response = OrderService(obj_repo=repo).get_order_details_by_order_id(username=username,
-                                                                                     order_id=order_id)
+                order_service = OrderService(obj_repo=repo)
+                response = order_service.get_order_details_by_order_id(username=username, order_id=order_id)
+                response["order_status"] = order_service.get_order_status(order_id=order_id)
             else:
                 bad_request = True
 
@@ -8,6 +8,13 @@ class OrderStatus(Enum):
     PAYMENT_INITIATION_FAILED = "PAYMENT_INITIATION_FAILED"
     PAYMENT_EXECUTED = "PAYMENT_EXECUTED"
     PAYMENT_EXECUTION_FAILED = "PAYMENT_EXECUTION_FAILED"
+    ORDER_PROCESSING = "ORDER_PROCESSING"
     ORDER_PROCESSED = "ORDER_PROCESSED"
     ORDER_PROCESSING_FAILED = "ORDER_PROCESSING_FAILED"
     ORDER_CANCELED = "ORDER_CANCELED"
+
+
+class OrderProcessingStep(Enum):
+    CLAIMED = "CLAIMED"
+    TRANSACTION_SUBMITTING = "TRANSACTION_SUBMITTING"
+    TRANSACTION_SUBMITTED = "TRANSACTION_SUBMITTED"
@@ -1,10 +1,11 @@
 import base64
 import decimal
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from urllib.parse import quote
 
-import boto3
 from web3 import Web3
 
 from common.blockchain_util import BlockChainUtil
@@ -15,10 +16,11 @@ from common.utils import Utils
 from orchestrator.config import CREATE_ORDER_SERVICE_ARN, INITIATE_PAYMENT_SERVICE_ARN, \
     EXECUTE_PAYMENT_SERVICE_ARN, WALLETS_SERVICE_ARN, ORDER_DETAILS_ORDER_ID_ARN, ORDER_DETAILS_BY_USERNAME_ARN, \
     REGION_NAME, SIGNER_ADDRESS, EXECUTOR_ADDRESS, NETWORKS, NETWORK_ID, SIGNER_SERVICE_ARN, \
-    GET_GROUP_FOR_ORG_API_ARN, GET_ALL_ORG_API_ARN, USD_TO_COGS_CONVERSION_FACTOR
+    GET_GROUP_FOR_ORG_API_ARN, GET_ALL_ORG_API_ARN, USD_TO_COGS_CONVERSION_FACTOR, PROCESS_ORDER_SERVICE_ARN
+from orchestrator.constant import ORG_NAME_CACHE_TTL
 from orchestrator.dao.transaction_history_dao import TransactionHistoryDAO
 from orchestrator.exceptions import PaymentInitiateFailed, ChannelCreationFailed, FundChannelFailed
-from orchestrator.order_status import OrderStatus
+from orchestrator.order_status import OrderStatus, OrderProcessingStep
 from orchestrator.services.wallet_service import WalletService
 from orchestrator.transaction_history import TransactionHistory
 
@@ -32,6 +34,7 @@ class Status(Enum):
     PAYMENT_INITIATION_FAILED = "PAYMENT_INITIATION_FAILED"
     PAYMENT_EXECUTED = "PAYMENT_EXECUTED"
     PAYMENT_EXECUTION_FAILED = "PAYMENT_EXECUTION_FAILED"
+    ORDER_PROCESSING = "ORDER_PROCESSING"
     ORDER_PROCESSED = "ORDER_PROCESSED"
     ORDER_PROCESSING_FAILED = "ORDER_PROCESSING_FAILED"
 
@@ -43,10 +46,12 @@ class OrderType(Enum):
 
 
 class OrderService:
+    _org_id_name_mapping = None
+
     def __init__(self, obj_repo):
         self.repo = obj_repo
         self.obj_transaction_history_dao = TransactionHistoryDAO(self.repo)
-        self.lambda_client = boto3.client('lambda', region_name=REGION_NAME)
+        self.lambda_client = BotoUtils.get_client('lambda', region_name=REGION_NAME)
         self.boto_client = BotoUtils(REGION_NAME)
         self.wallet_service = WalletService()
         self.obj_blockchain_util = BlockChainUtil(
@@ -125,7 +130,7 @@ class OrderService:
 
     def get_channel_for_topup(self, username, group_id, org_id):
         channel_details = self.wallet_service.get_channel_details(
-            username=username, group_id=group_id, org_id=org_id
+            username=username, group_id=group_id, org_id=org_id, use_cache=False
         )
         wallets = channel_details["wallets"]
         for wallet in wallets:
@@ -176,9 +181,10 @@ class OrderService:
         """
             Execute Order
                 Step 1  Execute Payment
-                Step 2  Get Receipient Address
-                Step 3  Process Order
-                Step 4  Update Transaction History
+                Step 2  Create Wallet, only for CREATE_WALLET_AND_CHANNEL orders
+                Step 3  Hand over the order to process_order asynchronously
+            Every step is recorded in transaction history, the order moves from PAYMENT_EXECUTED to
+            ORDER_PROCESSING and then to ORDER_PROCESSED or ORDER_PROCESSING_FAILED.
         """
         order_id = payload_dict["order_id"]
         payment_id = payload_dict["payment_id"]
@@ -199,45 +205,134 @@ class OrderService:
         payment_method = payment["payment_details"]["payment_method"]
         paid_payment_details = payload_dict["payment_details"]
         price = payment["price"]
-        status = Status.PAYMENT_EXECUTION_FAILED.value
-        self.manage_execute_payment(
-            username=username, order_id=order_id, payment_id=payment_id,
-            payment_details=paid_payment_details, payment_method=payment_method
-        )
-
-        status = Status.PAYMENT_EXECUTED.value
+        amount_in_cogs = self.calculate_amount_in_cogs(amount=price["amount"], currency=price["currency"])
+        if amount_in_cogs < 1:
+            raise Exception("Amount in cogs should be greater than equal to 1")
         try:
-            status = Status.ORDER_PROCESSING_FAILED.value
-            amount_in_cogs = self.calculate_amount_in_cogs(amount=price["amount"], currency=price["currency"])
-            if amount_in_cogs < 1:
-                raise Exception("Amount in cogs should be greater than equal to 1")
-            processed_order_data = self.manage_process_order(
-                username=username,
-                order_id=order_id, order_type=order_type,
-                amount=price["amount"],
-                currency=price["currency"], order_data=item_details,
-                amount_in_cogs=amount_in_cogs
+            self.manage_execute_payment(
+                username=username, order_id=order_id, payment_id=payment_id,
+                payment_details=paid_payment_details, payment_method=payment_method
             )
-            status = Status.ORDER_PROCESSED.value
-            obj_transaction_history = TransactionHistory(
-                username=username, order_id=order_id, order_type=order_type,
-                status=status, payment_id=payment_id,
-                payment_method=payment_method,
-                raw_payment_data=json.dumps(paid_payment_details)
-            )
-            self.obj_transaction_history_dao.insert_transaction_history(obj_transaction_history=obj_transaction_history)
-            processed_order_data["price"] = price
-            processed_order_data["item_details"] = item_details
-            return processed_order_data
+        except Exception as e:
+            self._record_order_status(username=username, order_id=order_id, order_type=order_type,
+                                      status=Status.PAYMENT_EXECUTION_FAILED.value)
+            raise e
+        self._record_order_status(
+            username=username, order_id=order_id, order_type=order_type, status=Status.PAYMENT_EXECUTED.value,
+            payment_id=payment_id, payment_method=payment_method, raw_payment_data=json.dumps(paid_payment_details))
 
+        wallet_details = None
+        open_channel_signature = None
+        if order_type == OrderType.CREATE_WALLET_AND_CHANNEL.value:
+            # the private key of the new wallet is handed to the user only in this response, process_order gets
+            # the open channel request signed with it instead of the key
+            try:
+                wallet_details = self.manage_create_wallet(username=username)
+                open_channel_signature = self.sign_open_channel_for_new_wallet(
+                    wallet_details=wallet_details, order_data=item_details, amount_in_cogs=amount_in_cogs)
+            except Exception as e:
+                self._record_order_status(username=username, order_id=order_id, order_type=order_type,
+                                          status=Status.ORDER_PROCESSING_FAILED.value)
+                raise e
+
+        process_order_payload = {
+            "username": username, "order_id": order_id, "order_type": order_type, "payment_id": payment_id,
+            "payment_method": payment_method, "price": price, "item_details": item_details,
+            "amount_in_cogs": amount_in_cogs, "open_channel_signature": open_channel_signature
+        }
+        process_order_response = self.lambda_client.invoke(
+            FunctionName=PROCESS_ORDER_SERVICE_ARN,
+            InvocationType="Event",
+            Payload=json.dumps(process_order_payload)
+        )
+        if process_order_response["StatusCode"] != 202:
+            self._record_order_status(username=username, order_id=order_id, order_type=order_type,
+                                      status=Status.ORDER_PROCESSING_FAILED.value, payment_id=payment_id)
+            raise Exception(f"Failed to submit order {order_id} for processing")
+        self._record_order_status(username=username, order_id=order_id, order_type=order_type,
+                                  status=Status.ORDER_PROCESSING.value, payment_id=payment_id)
+        execute_order_response = {"order_id": order_id, "status": Status.ORDER_PROCESSING.value, "price": price,
+                                  "item_details": item_details}
+        if wallet_details is not None:
+            execute_order_response.update(wallet_details)
+        return execute_order_response
+
+    def process_order(self, payload):
+        """
+            Creates or funds the channel of an order whose payment is executed. It is invoked asynchronously and
+            retried, so every step is saved on the claim of the order. A duplicate delivery of an order that is
+            processed or being processed is refused, a retry resumes the order from its saved step and does not
+            submit its transaction again once it is submitted.
+        """
+        username = payload["username"]
+        order_id = payload["order_id"]
+        order_type = payload["order_type"]
+        price = payload["price"]
+        order_processing = self.obj_transaction_history_dao.claim_order_for_processing(order_id=order_id)
+        if order_processing is None:
+            logger.info(f"Order {order_id} is already claimed for processing")
+            return None
+        try:
+            transaction_hash = order_processing["transaction_hash"]
+            if not transaction_hash and \
+                    order_processing["step"] == OrderProcessingStep.TRANSACTION_SUBMITTING.value:
+                transaction_hash = self._get_submitted_transaction_hash(order_id=order_id)
+            if transaction_hash:
+                logger.info(f"Resuming order {order_id} with submitted transaction {transaction_hash}")
+                processed_order_data = {"transaction_hash": transaction_hash}
+            else:
+                self.obj_transaction_history_dao.update_order_processing_step(
+                    order_id=order_id, step=OrderProcessingStep.TRANSACTION_SUBMITTING.value)
+                processed_order_data = self.manage_process_order(
+                    username=username,
+                    order_id=order_id, order_type=order_type,
+                    amount=price["amount"],
+                    currency=price["currency"], order_data=payload["item_details"],
+                    amount_in_cogs=payload["amount_in_cogs"],
+                    open_channel_signature=payload.get("open_channel_signature", None)
+                )
+                transaction_hash = processed_order_data.get("transaction_hash", "")
+            self.obj_transaction_history_dao.update_order_processing_step(
+                order_id=order_id, step=OrderProcessingStep.TRANSACTION_SUBMITTED.value,
+                transaction_hash=transaction_hash)
+            self.wallet_service.invalidate_channel_details(
+                username=username, org_id=payload["item_details"]["org_id"],
+                group_id=payload["item_details"]["group_id"])
+            self._record_order_status(
+                username=username, order_id=order_id, order_type=order_type, status=Status.ORDER_PROCESSED.value,
+                payment_id=payload["payment_id"], payment_method=payload["payment_method"],
+                transaction_hash=transaction_hash)
+            self.obj_transaction_history_dao.update_order_processing_status(
+                order_id=order_id, status=Status.ORDER_PROCESSED.value)
         except Exception as e:
-            obj_transaction_history = TransactionHistory(
-                username=username, order_id=order_id,
-                order_type=order_type, status=status
-            )
-            self.obj_transaction_history_dao.insert_transaction_history(obj_transaction_history=obj_transaction_history)
-            print(repr(e))
+            self.obj_transaction_history_dao.update_order_processing_status(
+                order_id=order_id, status=Status.ORDER_PROCESSING_FAILED.value)
+            self._record_order_status(username=username, order_id=order_id, order_type=order_type,
+                                      status=Status.ORDER_PROCESSING_FAILED.value, payment_id=payload["payment_id"])
             raise e
+        return processed_order_data
+
+    def _get_submitted_transaction_hash(self, order_id):
+        """
+            An attempt that stopped while submitting may have sent the transaction, the wallets service records
+            every transaction it sends against the order id.
+        """
+        transactions = self.wallet_service.get_channel_transactions_for_order_ids(order_ids=[order_id])
+        for transaction in transactions.get(order_id, []):
+            if transaction["transaction_hash"]:
+                return transaction["transaction_hash"]
+        return None
+
+    def get_order_status(self, order_id):
+        return self.obj_transaction_history_dao.get_latest_transaction_status(order_id=order_id)
+
+    def _record_order_status(self, username, order_id, order_type, status, payment_id="", payment_method="",
+                             raw_payment_data="{}", transaction_hash=""):
+        obj_transaction_history = TransactionHistory(
+            username=username, order_id=order_id, order_type=order_type, status=status, payment_id=payment_id,
+            payment_method=payment_method, raw_payment_data=raw_payment_data, transaction_hash=transaction_hash
+        )
+        self.obj_transaction_history_dao.insert_transaction_history(obj_transaction_history=obj_transaction_history)
 
     def get_order_details_by_order_id(self, order_id, username):
         order_details_event = {
@@ -313,7 +408,52 @@ class OrderService:
         else:
             raise Exception(f"Error executing payment for username {username} against order_id {order_id}")
 
-    def manage_process_order(self, username, order_id, order_type, amount, currency, order_data, amount_in_cogs):
+    def manage_create_wallet(self, username):
+        wallet_create_payload = {
+            "path": "/wallet",
+            "body": json.dumps({"username": username}),
+            "httpMethod": "POST"
+        }
+        wallet_create_lambda_response = self.lambda_client.invoke(
+            FunctionName=WALLETS_SERVICE_ARN,
+            InvocationType='RequestResponse',
+            Payload=json.dumps(wallet_create_payload)
+        )
+        wallet_create_response = json.loads(wallet_create_lambda_response.get("Payload").read())
+        if wallet_create_response["statusCode"] != 200:
+            raise Exception("Failed to create wallet")
+        wallet_create_response_body = json.loads(wallet_create_response["body"])
+        return wallet_create_response_body["data"]
+
+    def sign_open_channel_for_new_wallet(self, wallet_details, order_data, amount_in_cogs):
+        """ Signs the open channel request of a new wallet, so that its private key need not leave this call. """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            current_block_no_future = executor.submit(self.obj_blockchain_util.get_current_block_no)
+            executor_wallet_address_future = executor.submit(self.boto_client.get_ssm_parameter, EXECUTOR_ADDRESS)
+        current_block_no = current_block_no_future.result()
+        # 1 block no is mined in 15 sec on average, setting expiration as 10 years
+        expiration = current_block_no + (10 * 365 * 24 * 60 * 4)
+        message_nonce = current_block_no
+        self.EXECUTOR_WALLET_ADDRESS = executor_wallet_address_future.result()
+        group_id_in_hex = "0x" + base64.b64decode(order_data["group_id"]).hex()
+        signature_details = self.generate_signature_for_open_channel_for_third_party(
+            recipient=order_data["recipient"], group_id=group_id_in_hex,
+            amount_in_cogs=amount_in_cogs, expiration=expiration,
+            message_nonce=message_nonce, sender_private_key=wallet_details["private_key"],
+            executor_wallet_address=self.EXECUTOR_WALLET_ADDRESS
+        )
+        logger.info(f"Signature Details {signature_details}")
+        return {
+            "sender": wallet_details["address"],
+            "signature": signature_details["signature"],
+            "r": signature_details["r"],
+            "s": signature_details["s"],
+            "v": signature_details["v"],
+            "current_block_no": current_block_no
+        }
+
+    def manage_process_order(self, username, order_id, order_type, amount, currency, order_data, amount_in_cogs,
+                             open_channel_signature=None):
         logger.info(f"Order Data {order_data}")
         group_id = order_data["group_id"]
         org_id = order_data["org_id"]
@@ -321,54 +461,27 @@ class OrderService:
         channel_id = order_data["channel_id"]
         sender = order_data["wallet_address"]
         if order_type == OrderType.CREATE_WALLET_AND_CHANNEL.value:
-            wallet_create_payload = {
-                "path": "/wallet",
-                "body": json.dumps({"username": username}),
-                "httpMethod": "POST"
-            }
-            wallet_create_lambda_response = self.lambda_client.invoke(
-                FunctionName=WALLETS_SERVICE_ARN,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(wallet_create_payload)
-            )
-            wallet_create_response = json.loads(wallet_create_lambda_response.get("Payload").read())
-            if wallet_create_response["statusCode"] != 200:
-                raise Exception("Failed to create wallet")
-            wallet_create_response_body = json.loads(wallet_create_response["body"])
-            wallet_details = wallet_create_response_body["data"]
-
+            if open_channel_signature is None:
+                raise ChannelCreationFailed("Open channel request of the new wallet is not signed",
+                                            wallet_details=order_data)
             try:
-                current_block_no = self.obj_blockchain_util.get_current_block_no()
-                # 1 block no is mined in 15 sec on average, setting expiration as 10 years
-                expiration = current_block_no + (10 * 365 * 24 * 60 * 4)
-                message_nonce = current_block_no
-                self.EXECUTOR_WALLET_ADDRESS = self.boto_client.get_ssm_parameter(EXECUTOR_ADDRESS)
-                group_id_in_hex = "0x" + base64.b64decode(group_id).hex()
-                signature_details = self.generate_signature_for_open_channel_for_third_party(
-                    recipient=recipient, group_id=group_id_in_hex,
-                    amount_in_cogs=amount_in_cogs, expiration=expiration,
-                    message_nonce=message_nonce, sender_private_key=wallet_details["private_key"],
-                    executor_wallet_address=self.EXECUTOR_WALLET_ADDRESS
-                )
-
-                logger.info(f"Signature Details {signature_details}")
                 open_channel_body = {
                     'order_id': order_id,
-                    'sender': wallet_details["address"],
-                    'signature': signature_details["signature"],
-                    'r': signature_details["r"],
-                    's': signature_details["s"],
-                    'v': signature_details["v"],
+                    'sender': open_channel_signature["sender"],
+                    'signature': open_channel_signature["signature"],
+                    'r': open_channel_signature["r"],
+                    's': open_channel_signature["s"],
+                    'v': open_channel_signature["v"],
                     'group_id': group_id,
                     'org_id': org_id,
                     'amount': amount,
                     'currency': currency,
                     'recipient': recipient,
-                    'current_block_no': current_block_no,
+                    'current_block_no': open_channel_signature["current_block_no"],
                     'amount_in_cogs': amount_in_cogs
                 }
                 channel_details = self.wallet_service.create_channel(open_channel_body=open_channel_body)
-                channel_details.update(wallet_details)
+                channel_details.update({"address": open_channel_signature["sender"]})
                 return channel_details
             except Exception as e:
                 logger.error("Failed to create channel")
@@ -381,9 +494,9 @@ class OrderService:
                         "amount": amount,
                         "currency": currency
                     },
-                    "item_details": order_data
+                    "item_details": order_data,
+                    "address": open_channel_signature["sender"]
                 }
-                response.update(wallet_details)
                 raise ChannelCreationFailed("Failed to create channel", wallet_details=response)
 
         elif order_type == OrderType.CREATE_CHANNEL.value:
@@ -462,11 +575,17 @@ class OrderService:
         if order_details_response["statusCode"] != 200:
             raise Exception(f"Failed to fetch order details for username{username}")
 
-        org_id_name_mapping = self.get_organizations_from_contract()
-
         order_details_response_body = json.loads(order_details_response["body"])
         orders = order_details_response_body["orders"]
 
+        order_ids = [order["order_id"] for order in orders]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            org_id_name_mapping_future = executor.submit(self.get_organizations_from_contract)
+            wallet_transactions_future = executor.submit(
+                self.wallet_service.get_channel_transactions_for_order_ids, order_ids)
+        org_id_name_mapping = org_id_name_mapping_future.result()
+        wallet_transactions = wallet_transactions_future.result()
+
         for order in orders:
             order_id = order["order_id"]
             order["wallet_type"] = "GENERAL"
@@ -475,21 +594,7 @@ class OrderService:
                 if org_id in org_id_name_mapping:
                     order["item_details"]["organization_name"] = org_id_name_mapping[org_id]
 
-            transaction_details_event = {
-                "path": f"/wallet/channel/transactions",
-                "queryStringParameters": {"order_id": order_id},
-                "httpMethod": "GET"
-            }
-            transaction_details_lambda_response = self.lambda_client.invoke(
-                FunctionName=WALLETS_SERVICE_ARN,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(transaction_details_event)
-            )
-            transaction_details_response = json.loads(transaction_details_lambda_response.get('Payload').read())
-            if transaction_details_response["statusCode"] != 200:
-                raise Exception(f"Failed to fetch transaction details for username{order_id}")
-            transaction_details_response_body = json.loads(transaction_details_response["body"])
-            order["wallet_transactions"] = transaction_details_response_body["data"]["transactions"]
+            order["wallet_transactions"] = wallet_transactions.get(order_id, [])
             order_status = TransactionStatus.SUCCESS
             for payment in order["payments"]:
                 if payment["payment_status"] != TransactionStatus.SUCCESS:
@@ -505,6 +610,10 @@ class OrderService:
         return {"orders": orders}
 
     def get_organizations_from_contract(self):
+        """ The org id to name mapping changes rarely, it is shared by the container for ORG_NAME_CACHE_TTL. """
+        cached_mapping = OrderService._org_id_name_mapping
+        if cached_mapping is not None and time.monotonic() - cached_mapping[1] < ORG_NAME_CACHE_TTL:
+            return cached_mapping[0]
         org_details_event = {
             "path": f"/org",
             "httpMethod": "GET"
@@ -522,6 +631,7 @@ class OrderService:
         for org in org_details:
             org_id_name_mapping[org["org_id"]] = org["org_name"]
 
+        OrderService._org_id_name_mapping = (org_id_name_mapping, time.monotonic())
         return org_id_name_mapping
 
     def generate_signature_for_open_channel_for_third_party(self, recipient, group_id, amount_in_cogs, expiration,
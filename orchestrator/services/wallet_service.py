@@ -1,13 +1,21 @@
+import copy
 import json
+import threading
+import time
+
 from common.boto_utils import BotoUtils
 from common.logger import get_logger
 from orchestrator.config import REGION_NAME, WALLETS_SERVICE_ARN, GET_CHANNEL_API_OLD_ARN, \
     CREATE_CHANNEL_EVENT_ARN
+from orchestrator.constant import CHANNEL_DETAILS_CACHE_TTL, CHANNEL_DETAILS_CACHE_MAX_SIZE, \
+    ORDER_IDS_PER_TRANSACTIONS_REQUEST
 
 logger = get_logger(__name__)
 
 
 class WalletService:
+    _channel_details_cache = {}
+    _channel_details_cache_lock = threading.Lock()
 
     def __init__(self):
         self.boto_client = BotoUtils(REGION_NAME)
@@ -33,8 +41,16 @@ class WalletService:
         channel_details = create_channel_response_body["data"]
         return channel_details
 
-    def get_channel_details(self, username, org_id, group_id):
-        """ Method to get wallet details for a given username. """
+    def get_channel_details(self, username, org_id, group_id, use_cache=True):
+        """
+            Method to get wallet details for a given username, served from a short lived per container cache.
+            Callers acting on the channel state, like a top up, pass use_cache=False to read it fresh.
+        """
+        cache_key = (username, org_id, group_id)
+        cached_channel_details = WalletService._channel_details_cache.get(cache_key, None)
+        if use_cache and cached_channel_details is not None and \
+                time.monotonic() - cached_channel_details[1] < CHANNEL_DETAILS_CACHE_TTL:
+            return copy.deepcopy(cached_channel_details[0])
         try:
             wallet_channel_transactions = self.get_channel_transactions(
                 username=username, org_id=org_id, group_id=group_id)
@@ -44,17 +60,36 @@ class WalletService:
                 "group_id": group_id,
                 "wallets": wallet_channel_transactions
             }
+            channels_by_address = self.get_channels_from_contract_for_wallets(
+                user_addresses=[wallet["address"] for wallet in wallet_response["wallets"]],
+                org_id=org_id,
+                group_id=group_id
+            )
             for wallet in wallet_response["wallets"]:
-                user_address = wallet["address"]
-                wallet["channels"] = self.get_channels_from_contract(
-                    user_address=user_address,
-                    org_id=org_id,
-                    group_id=group_id
-                )
-            return wallet_response
+                wallet["channels"] = channels_by_address.get(wallet["address"].lower(), [])
         except Exception as e:
             print(repr(e))
             raise e
+        self._cache_channel_details(cache_key, wallet_response)
+        return wallet_response
+
+    @staticmethod
+    def _cache_channel_details(cache_key, wallet_response):
+        now = time.monotonic()
+        with WalletService._channel_details_cache_lock:
+            channel_details_cache = WalletService._channel_details_cache
+            if len(channel_details_cache) >= CHANNEL_DETAILS_CACHE_MAX_SIZE:
+                for expired_key in [key for key, (_, cached_at) in channel_details_cache.items()
+                                    if now - cached_at >= CHANNEL_DETAILS_CACHE_TTL]:
+                    del channel_details_cache[expired_key]
+            if len(channel_details_cache) >= CHANNEL_DETAILS_CACHE_MAX_SIZE:
+                del channel_details_cache[min(channel_details_cache, key=lambda key: channel_details_cache[key][1])]
+            channel_details_cache[cache_key] = (copy.deepcopy(wallet_response), now)
+
+    @staticmethod
+    def invalidate_channel_details(username, org_id, group_id):
+        with WalletService._channel_details_cache_lock:
+            WalletService._channel_details_cache.pop((username, org_id, group_id), None)
 
     def get_channel_transactions(self, username, org_id, group_id):
 
@@ -80,12 +115,35 @@ class WalletService:
         channel_transactions = channel_transactions_response_body["data"]["wallets"]
         return channel_transactions
 
-    def get_channels_from_contract(self, user_address, org_id, group_id):
+    def get_channel_transactions_for_order_ids(self, order_ids):
+        """ Returns the wallet transactions of many orders keyed by order id, with one call per chunk of orders. """
+        transactions = {}
+        for start in range(0, len(order_ids), ORDER_IDS_PER_TRANSACTIONS_REQUEST):
+            order_ids_chunk = order_ids[start:start + ORDER_IDS_PER_TRANSACTIONS_REQUEST]
+            transaction_details_event = {
+                "path": "/wallet/channel/transactions",
+                "queryStringParameters": {"order_ids": ",".join(order_ids_chunk)},
+                "httpMethod": "GET"
+            }
+            transaction_details_response = self.boto_client.invoke_lambda(
+                lambda_function_arn=WALLETS_SERVICE_ARN,
+                invocation_type="RequestResponse",
+                payload=json.dumps(transaction_details_event)
+            )
+            if transaction_details_response["statusCode"] != 200:
+                raise Exception(f"Failed to fetch transaction details for order_ids {order_ids_chunk}")
+            transactions.update(json.loads(transaction_details_response["body"])["data"]["transactions"])
+        return transactions
+
+    def get_channels_from_contract_for_wallets(self, user_addresses, org_id, group_id):
+        """ Returns the channels of every wallet with a single contract API call, keyed by lower case address. """
+        if len(user_addresses) == 0:
+            return {}
         event = {
             "httpMethod": "GET",
             "path": "/channel",
             "queryStringParameters": {
-                "user_address": user_address,
+                "user_addresses": ",".join(user_addresses),
                 "org_id": org_id,
                 "group_id": group_id
             }
@@ -101,12 +159,12 @@ class WalletService:
             raise Exception(f"Failed to get channel details from contract API {event}")
 
         if channel_details_response["statusCode"] != 200:
-            raise Exception(f"Failed to get channel details from contract API username: {user_address} "
+            raise Exception(f"Failed to get channel details from contract API user_addresses: {user_addresses} "
                             f"group_id: {group_id} "
                             f"org_id: {org_id}")
 
         channel_details = json.loads(channel_details_response["body"])["data"]
-        return channel_details["channels"]
+        return {address.lower(): channels for address, channels in channel_details["channels"].items()}
 
     def get_wallets(self, username):
         get_wallet_event = {
@@ -1,6 +1,6 @@
 import json
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 from common.repository import Repository
 from common.utils import validate_dict
@@ -67,6 +67,116 @@ class TestOrderService(unittest.TestCase):
     def test_execute_order(self):
         pass
 
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.update_order_processing_step")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.update_order_processing_status")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.insert_transaction_history")
+    @patch("orchestrator.services.order_service.OrderService.manage_process_order")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.claim_order_for_processing")
+    def test_process_order_is_processed_once(self, mock_claim_order_for_processing, mock_manage_process_order,
+                                             mock_insert_transaction_history, mock_update_order_processing_status,
+                                             mock_update_order_processing_step):
+        payload = self._process_order_payload()
+        mock_claim_order_for_processing.return_value = None
+        assert self.order_service.process_order(payload) is None
+        mock_manage_process_order.assert_not_called()
+
+        mock_claim_order_for_processing.return_value = {"order_id": payload["order_id"], "status": "ORDER_PROCESSING",
+                                                        "step": "CLAIMED", "transaction_hash": None}
+        mock_manage_process_order.return_value = {"transaction_hash": "0x567"}
+        assert self.order_service.process_order(payload) == {"transaction_hash": "0x567"}
+        mock_update_order_processing_step.assert_called_with(
+            order_id=payload["order_id"], step="TRANSACTION_SUBMITTED", transaction_hash="0x567")
+        mock_update_order_processing_status.assert_called_with(order_id=payload["order_id"], status="ORDER_PROCESSED")
+        transaction_history = mock_insert_transaction_history.call_args[1]["obj_transaction_history"]
+        assert transaction_history.get_transaction_history()["status"] == "ORDER_PROCESSED"
+        assert transaction_history.get_transaction_history()["transaction_hash"] == "0x567"
+
+        mock_manage_process_order.side_effect = Exception("Failed to fund channel")
+        self.assertRaises(Exception, self.order_service.process_order, payload)
+        mock_update_order_processing_status.assert_called_with(
+            order_id=payload["order_id"], status="ORDER_PROCESSING_FAILED")
+
+    @patch("orchestrator.services.wallet_service.WalletService.get_channel_transactions_for_order_ids")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.update_order_processing_step")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.update_order_processing_status")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.insert_transaction_history")
+    @patch("orchestrator.services.order_service.OrderService.manage_process_order")
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.claim_order_for_processing")
+    def test_process_order_resumes_without_submitting_again(
+            self, mock_claim_order_for_processing, mock_manage_process_order, mock_insert_transaction_history,
+            mock_update_order_processing_status, mock_update_order_processing_step,
+            mock_get_channel_transactions_for_order_ids):
+        payload = self._process_order_payload()
+        order_processing = {"order_id": payload["order_id"], "status": "ORDER_PROCESSING", "step": "CLAIMED",
+                            "transaction_hash": None}
+
+        def update_order_processing_step(order_id, step, transaction_hash=None):
+            order_processing.update({"step": step, "transaction_hash": transaction_hash})
+
+        mock_claim_order_for_processing.side_effect = lambda order_id: dict(order_processing)
+        mock_update_order_processing_status.side_effect = \
+            lambda order_id, status: order_processing.update({"status": status})
+        mock_update_order_processing_step.side_effect = update_order_processing_step
+
+        # the transaction is submitted, then recording the processed order fails
+        mock_manage_process_order.return_value = {"transaction_hash": "0x567"}
+        mock_insert_transaction_history.side_effect = [Exception("Lost connection"), True]
+        self.assertRaises(Exception, self.order_service.process_order, payload)
+        assert order_processing == {"order_id": payload["order_id"], "status": "ORDER_PROCESSING_FAILED",
+                                    "step": "TRANSACTION_SUBMITTED", "transaction_hash": "0x567"}
+
+        mock_insert_transaction_history.side_effect = None
+        assert self.order_service.process_order(payload) == {"transaction_hash": "0x567"}
+        assert mock_manage_process_order.call_count == 1
+        assert order_processing["status"] == "ORDER_PROCESSED"
+        transaction_history = mock_insert_transaction_history.call_args[1]["obj_transaction_history"]
+        assert transaction_history.get_transaction_history()["status"] == "ORDER_PROCESSED"
+        assert transaction_history.get_transaction_history()["transaction_hash"] == "0x567"
+
+        # the invocation stopped while submitting, after the wallets service recorded the transaction
+        order_processing.update({"status": "ORDER_PROCESSING", "step": "TRANSACTION_SUBMITTING",
+                                 "transaction_hash": None})
+        mock_get_channel_transactions_for_order_ids.return_value = {
+            payload["order_id"]: [{"type": "channelAddFunds", "transaction_hash": "0x789"}]}
+        assert self.order_service.process_order(payload) == {"transaction_hash": "0x789"}
+        assert mock_manage_process_order.call_count == 1
+        assert order_processing["transaction_hash"] == "0x789"
+
+    @staticmethod
+    def _process_order_payload():
+        return {
+            "username": "dummy@dummy.io", "order_id": "e33404a2-f574-11e9-9a93-3abe2d8567d5",
+            "order_type": "FUND_CHANNEL", "payment_id": "PAYID-123", "payment_method": "paypal",
+            "price": {"amount": 1, "currency": "USD"}, "amount_in_cogs": 1, "open_channel_signature": None,
+            "item_details": {"org_id": "snet", "group_id": "GROUP-123", "recipient": "0x123", "channel_id": 1,
+                             "wallet_address": "0x345"}
+        }
+
+    @patch("orchestrator.dao.transaction_history_dao.TransactionHistoryDAO.insert_transaction_history")
+    @patch("orchestrator.services.order_service.OrderService.sign_open_channel_for_new_wallet")
+    @patch("orchestrator.services.order_service.OrderService.manage_create_wallet")
+    @patch("orchestrator.services.order_service.OrderService.manage_execute_payment")
+    @patch("orchestrator.services.order_service.OrderService.get_order_details_by_order_id")
+    def test_execute_order_keeps_private_key_out_of_process_order_payload(
+            self, mock_get_order_details_by_order_id, mock_manage_execute_payment, mock_manage_create_wallet,
+            mock_sign_open_channel_for_new_wallet, mock_insert_transaction_history):
+        mock_get_order_details_by_order_id.return_value = {
+            "item_details": {"order_type": "CREATE_WALLET_AND_CHANNEL", "org_id": "snet", "group_id": "GROUP-123"},
+            "payments": [{"payment_id": "PAYID-123", "payment_details": {"payment_method": "paypal"},
+                          "price": {"amount": 1, "currency": "USD"}}]
+        }
+        mock_manage_create_wallet.return_value = {"address": "0x345", "private_key": "0xabc"}
+        mock_sign_open_channel_for_new_wallet.return_value = {"sender": "0x345", "signature": "0x678"}
+        self.order_service.lambda_client = Mock()
+        self.order_service.lambda_client.invoke.return_value = {"StatusCode": 202}
+        response = self.order_service.execute_order(
+            "dummy@dummy.io", {"order_id": "order-1", "payment_id": "PAYID-123", "payment_details": {}})
+        assert response["private_key"] == "0xabc"
+        process_order_payload = self.order_service.lambda_client.invoke.call_args[1]["Payload"]
+        assert "0xabc" not in process_order_payload
+        assert json.loads(process_order_payload)["open_channel_signature"] == {"sender": "0x345",
+                                                                                "signature": "0x678"}
+
     def test_manage_execute_payment(self):
         pass
 
@@ -82,5 +192,26 @@ class TestOrderService(unittest.TestCase):
     def test_get_order_details_by_order_id(self):
         pass
 
-    def test_get_order_details_by_username(self):
-        pass
+    @patch("common.boto_utils.BotoUtils.invoke_lambda")
+    def test_get_order_details_by_username(self, mock_lambda_invoke):
+        orders = [{"order_id": f"order-{index}", "item_details": {"org_id": "snet"},
+                   "payments": [{"payment_status": "SUCCESS"}]} for index in range(3)]
+        wallet_transactions = {"order-0": [{"status": "PENDING"}], "order-1": [{"status": "SUCCESS"}],
+                               "order-2": []}
+
+        def invoke_lambda(lambda_function_arn, invocation_type, payload):
+            path = json.loads(payload)["path"]
+            if path == "/order":
+                return {"statusCode": 200, "body": json.dumps({"orders": orders})}
+            if path == "/org":
+                return {"statusCode": 200, "body": json.dumps({"data": [{"org_id": "snet", "org_name": "SNET"}]})}
+            return {"statusCode": 200, "body": json.dumps({"data": {"transactions": wallet_transactions}})}
+
+        mock_lambda_invoke.side_effect = invoke_lambda
+        OrderService._org_id_name_mapping = None
+        response = self.order_service.get_order_details_by_username("dummy@dummy.io")
+        assert mock_lambda_invoke.call_count == 3
+        assert [order["order_status"] for order in response["orders"]] == ["PENDING", "SUCCESS", "SUCCESS"]
+        assert response["orders"][0]["item_details"]["organization_name"] == "SNET"
+        self.order_service.get_order_details_by_username("dummy@dummy.io")
+        assert mock_lambda_invoke.call_count == 5
@@ -9,8 +9,9 @@ from orchestrator.services.wallet_service import WalletService
 class TestWalletClientService(unittest.TestCase):
 
     @patch("orchestrator.services.wallet_service.WalletService.get_channel_transactions")
-    @patch("orchestrator.services.wallet_service.WalletService.get_channels_from_contract")
+    @patch("orchestrator.services.wallet_service.WalletService.get_channels_from_contract_for_wallets")
     def test_get_channel_details(self, mock_channels_from_contract, mock_channel_transactions):
+        WalletService._channel_details_cache.clear()
         mock_channel_transactions.return_value = [
             {
                 "address": "0x123",
@@ -30,18 +31,20 @@ class TestWalletClientService(unittest.TestCase):
                 ]
             }
         ]
-        mock_channels_from_contract.return_value = [
-            {
-                "channel_id": 117,
-                "recipient": "0x234",
-                "balance_in_cogs": "135.00000000",
-                "pending": "0E-8",
-                "nonce": 0,
-                "expiration": 11111111,
-                "signer": "0x345",
-                "status": "active"
-            }
-        ]
+        mock_channels_from_contract.return_value = {
+            "0x123": [
+                {
+                    "channel_id": 117,
+                    "recipient": "0x234",
+                    "balance_in_cogs": "135.00000000",
+                    "pending": "0E-8",
+                    "nonce": 0,
+                    "expiration": 11111111,
+                    "signer": "0x345",
+                    "status": "active"
+                }
+            ]
+        }
 
         username = "dummy@dummy.io"
         org_id = "dummy"
@@ -52,6 +55,32 @@ class TestWalletClientService(unittest.TestCase):
         assert isinstance(channel_details["wallets"], list)
         assert validate_dict(channel_details["wallets"][0], ["channels"])
         assert isinstance(channel_details["wallets"][0]["channels"], list)
+        assert (channel_details["wallets"][0]["channels"][0]["channel_id"] == 117)
+
+        WalletService().get_channel_details(username, org_id, group_id)
+        mock_channels_from_contract.assert_called_once_with(
+            user_addresses=["0x123"], org_id=org_id, group_id=group_id)
+        WalletService().get_channel_details(username, org_id, group_id, use_cache=False)
+        assert (mock_channels_from_contract.call_count == 2)
+        WalletService.invalidate_channel_details(username, org_id, group_id)
+        WalletService().get_channel_details(username, org_id, group_id)
+        assert (mock_channels_from_contract.call_count == 3)
+
+    @patch("orchestrator.services.wallet_service.CHANNEL_DETAILS_CACHE_MAX_SIZE", 2)
+    @patch("orchestrator.services.wallet_service.time.monotonic")
+    def test_channel_details_cache_is_bounded(self, mock_monotonic):
+        WalletService._channel_details_cache.clear()
+        mock_monotonic.return_value = 0
+        WalletService._cache_channel_details(("expired@dummy.io", "dummy", "dummy-group"), {})
+        mock_monotonic.return_value = 40
+        WalletService._cache_channel_details(("oldest@dummy.io", "dummy", "dummy-group"), {})
+        WalletService._cache_channel_details(("newest@dummy.io", "dummy", "dummy-group"), {})
+        assert (list(WalletService._channel_details_cache.keys()) == [("oldest@dummy.io", "dummy", "dummy-group"),
+                                                                      ("newest@dummy.io", "dummy", "dummy-group")])
+        mock_monotonic.return_value = 41
+        WalletService._cache_channel_details(("latest@dummy.io", "dummy", "dummy-group"), {})
+        assert (len(WalletService._channel_details_cache) == 2)
+        assert (("oldest@dummy.io", "dummy", "dummy-group") not in WalletService._channel_details_cache)
 
     @patch("common.boto_utils.BotoUtils.invoke_lambda")
     def test_get_channel_transactions(self, invoke_lambda_mock):
@@ -91,44 +120,6 @@ class TestWalletClientService(unittest.TestCase):
         channel_transactions = WalletService().get_channel_transactions(username, org_id, group_id)
         assert isinstance(channel_transactions, list)
 
-    @patch("common.boto_utils.BotoUtils.invoke_lambda")
-    def test_get_channels_from_contract(self, invoke_lambda_mock):
-        invoke_lambda_mock.return_value = {
-            "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "status": "success",
-                    "data": {
-                        "username": "dummy@dummy.io",
-                        "group_id": "dummy-group",
-                        "org_id": "dummy",
-                        "channels": [
-                            {
-                                "channel_id": 117,
-                                "recipient": "0x234",
-                                "balance_in_cogs": "135.00000000",
-                                "pending": "0E-8",
-                                "nonce": 0,
-                                "expiration": 11111111,
-                                "signer": "0x345",
-                                "status": "active"
-                            }
-                        ]
-                    }
-                }
-            )
-        }
-        username = "dummy@dummy.io"
-        org_id = "dummy"
-        group_id = "dummy-group"
-        transaction_keys = ["channel_id", "recipient", "balance_in_cogs", "pending",
-                            "nonce", "expiration", "signer", "status"]
-        channel_transactions = WalletService().get_channels_from_contract(username, org_id, group_id)
-        assert isinstance(channel_transactions, list)
-        if len(channel_transactions) > 0:
-            transaction = channel_transactions[0]
-            assert validate_dict(transaction, transaction_keys)
-
     @patch("common.boto_utils.BotoUtils.invoke_lambda")
     def test_get_wallets(self, invoke_lambda_mock):
         invoke_lambda_mock.return_value = {
@@ -15,9 +15,10 @@ class PaypalPayment(Payment):
         super().__init__(payment_id, amount, currency, payment_status, created_at, payment_details)
         self.boto_utils = BotoUtils(region_name=REGION_NAME)
 
-    def initiate_payment(self, order_id, item_details):
+    def _get_payee_client_api(self):
+        """ PayPal credentials are served from the ssm parameter cache of BotoUtils. """
         try:
-            payee_client_api = paypalrestsdk.Api({
+            return paypalrestsdk.Api({
                 'mode': MODE,
                 'client_id': self.boto_utils.get_ssm_parameter(PAYPAL_CLIENT),
                 'client_secret': self.boto_utils.get_ssm_parameter(PAYPAL_SECRET)
@@ -25,6 +26,9 @@ class PaypalPayment(Payment):
         except Exception as e:
             logger.error("Failed to get ssm parameters")
             raise e
+
+    def initiate_payment(self, order_id, item_details):
+        payee_client_api = self._get_payee_client_api()
         paypal_payload = self.get_paypal_payload(order_id, item_details["org_id"], item_details["service_id"])
         payment = paypalrestsdk.Payment(paypal_payload, api=payee_client_api)
 
@@ -53,15 +57,7 @@ class PaypalPayment(Payment):
         return response_payload
 
     def execute_transaction(self, paid_payment_details):
-        try:
-            payee_client_api = paypalrestsdk.Api({
-                'mode': MODE,
-                'client_id': self.boto_utils.get_ssm_parameter(PAYPAL_CLIENT),
-                'client_secret': self.boto_utils.get_ssm_parameter(PAYPAL_SECRET)
-            })
-        except Exception as e:
-            logger.error("Failed to get ssm parameters")
-            raise e
+        payee_client_api = self._get_payee_client_api()
         paypal_payment_id = self._payment_details["payment_id"]
         payer_id = paid_payment_details["payer_id"]
         payment = paypalrestsdk.Payment.find(paypal_payment_id, api=payee_client_api)
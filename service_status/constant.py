@@ -1,2 +1,9 @@
 SRVC_STATUS_GRPC_TIMEOUT = 10
-LIMIT = 5
\ No newline at end of file
+LIMIT = 2000
+PROBE_MAX_WORKERS = 50
+NOTIFICATION_MAX_WORKERS = 4
+STATUS_UPDATE_BATCH_SIZE = 50
+# time kept back from the lambda timeout to write the last statuses once probing stops
+PROBE_DEADLINE_MARGIN_IN_SECONDS = 15
+CERTIFICATE_HANDSHAKE_TIMEOUT = 10
+CERTIFICATE_SCAN_MAX_WORKERS = 50
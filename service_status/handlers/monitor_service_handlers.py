@@ -16,7 +16,7 @@ logger = get_logger(__name__)
 @handle_exception_with_slack_notification(logger=logger, NETWORK_ID=NETWORK_ID, SLACK_HOOK=SLACK_HOOK)
 def request_handler(event, context):
     service_status = ServiceStatus(repo=db, net_id=NETWORK_ID)
-    service_status.update_service_status()
+    service_status.update_service_status(remaining_time_in_millis=context.get_remaining_time_in_millis())
 
 
 @handle_exception_with_slack_notification(logger=logger, NETWORK_ID=NETWORK_ID, SLACK_HOOK=SLACK_HOOK)
@@ -1,11 +1,13 @@
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
 from datetime import timedelta
 from urllib.request import Request, urlopen, ssl, socket
 from common.utils import Utils
 from service_status.config import REGION_NAME, NOTIFICATION_ARN, SLACK_HOOK, NETWORKS, NETWORK_ID, \
     CERTIFICATION_EXPIRATION_THRESHOLD
+from service_status.constant import CERTIFICATE_HANDSHAKE_TIMEOUT, CERTIFICATE_SCAN_MAX_WORKERS
 from common.boto_utils import BotoUtils
 from common.utils import Utils
 from common.logger import get_logger
@@ -22,6 +24,15 @@ CERT_EXP_EMAIL_NOTIFICATION_MSG = \
     "cs-marketplace@singularitynet.io.</em></p><p>Warmest regards, <br />SingularityNET Marketplace " \
     "Team</p></div></body></html>"
 CERT_EXP_EMAIL_NOTIFICATION_SUBJ = "Certificates are about to expire for service %s for %s network."
+CERT_EXP_BATCH_EMAIL_NOTIFICATION_MSG = \
+    "<html><head></head><body><div><p>Hello,</p><p>Certificates of the following services for the %s network are " \
+    "about to expire. Please take immediate action to renew them.</p><ul>%s</ul><br /> <br /><p>" \
+    "<em>Please do not reply to the email for any enquiries for any queries please email at " \
+    "cs-marketplace@singularitynet.io.</em></p><p>Warmest regards, <br />SingularityNET Marketplace " \
+    "Team</p></div></body></html>"
+CERT_EXP_BATCH_EMAIL_NOTIFICATION_ITEM = \
+    "<li>Service %s under organization %s expires in %s days.<br />Endpoint: %s</li>"
+CERT_EXP_BATCH_EMAIL_NOTIFICATION_SUBJ = "Certificates are about to expire for %s services for %s network."
 CERT_EXP_SLACK_NOTIFICATION_MSG = \
     "```Alert!\n\nCertificates for service %s under organization %s for the %s network are about to expire in %s days.\n" \
     "Endpoint: %s \n\nFor any queries please email at cs-marketplace@singularitynet.io. \n\nWarmest regards, " \
@@ -34,15 +45,27 @@ class MonitorService:
     def _get_service_endpoint_data(self, limit):
         query = "SELECT row_id, org_id, service_id, endpoint, is_available, failed_status_count FROM service_endpoint WHERE " \
                 "next_check_timestamp < UTC_TIMESTAMP AND endpoint not regexp %s ORDER BY last_check_timestamp ASC"
-        if limit is not None:
-            query = query + " LIMIT %s"
-            result = self.repo.execute(query, [self.rex_for_pb_ip, limit])
-        else:
-            result = self.repo.execute(query, [self.rex_for_pb_ip])
+        if limit is None:
+            # full table walk, stream rows instead of loading every endpoint at once
+            return self._iter_service_endpoint_data(query)
+        query = query + " LIMIT %s"
+        result = self.repo.execute(query, [self.rex_for_pb_ip, limit])
         if result is None or result == []:
             logger.info("Unable to find services.")
         return result
 
+    def _iter_service_endpoint_data(self, query):
+        """
+            Rows are read from an open server side cursor, consumers should not do slow work such as handshakes
+            or notifications while iterating.
+        """
+        found = False
+        for record in self.repo.iter_execute(query, [self.rex_for_pb_ip]):
+            found = True
+            yield record
+        if not found:
+            logger.info("Unable to find services.")
+
     @staticmethod
     def _send_email_notification(recipients, certificate_expiration_notification_subject,
                                  certificate_expiration_notification_message):
@@ -105,50 +128,90 @@ class MonitorServiceCertificate(MonitorService):
                              "(https://)*192.|^(http://)*(https://)*172.|^(http://)*(https://)*10."
 
     def notify_service_contributors_for_certificate_expiration(self):
-        service_endpoint_data = self._get_service_endpoint_data(limit=None)
-        for record in service_endpoint_data:
-            org_id = record["org_id"]
-            service_id = record["service_id"]
-            endpoint = record["endpoint"]
-            expiration_date = self._get_certification_expiration_date_for_given_service(endpoint=endpoint)
-            days_left_for_expiration = (expiration_date - dt.utcnow()).days
-            if days_left_for_expiration < CERTIFICATION_EXPIRATION_THRESHOLD:
-                self._send_notification_for_certificate_expiration(org_id=org_id, service_id=service_id,
-                                                                   endpoint=endpoint,
-                                                                   days_left_for_expiration=days_left_for_expiration)
-
-    def _send_notification_for_certificate_expiration(self, org_id, service_id, endpoint, days_left_for_expiration):
-
-        certificate_expiration_notification_subject = \
-            self._get_certificate_expiration_email_notification_subject(org_id=org_id, service_id=service_id,
-                                                                        endpoint=endpoint)
-        certificate_expiration_notification_message = \
-            self._get_certificate_expiration_email_notification_message(
-                org_id=org_id, service_id=service_id, endpoint=endpoint,
-                days_left_for_expiration=days_left_for_expiration)
-
-        recipients = self._get_service_provider_email(org_id=org_id, service_id=service_id)
+        """
+            Handshakes every distinct host:port once, concurrently. Slack gets one alert per service for all of its
+            expiring endpoints and every contributor gets one email for all of their services.
+        """
+        endpoints_by_host = {}
+        for record in self._get_service_endpoint_data(limit=None):
+            host_and_port = self._get_host_and_port(endpoint=record["endpoint"])
+            if host_and_port is not None:
+                endpoints_by_host.setdefault(host_and_port, []).append(record)
+        if len(endpoints_by_host) == 0:
+            return
+        expiring_endpoints_by_service = {}
+        with ThreadPoolExecutor(max_workers=min(CERTIFICATE_SCAN_MAX_WORKERS, len(endpoints_by_host))) as executor:
+            expiration_dates = executor.map(
+                self._get_expiration_date_or_none,
+                [records[0]["endpoint"] for records in endpoints_by_host.values()])
+            for records, expiration_date in zip(endpoints_by_host.values(), expiration_dates):
+                if expiration_date is None:
+                    continue
+                days_left_for_expiration = (expiration_date - dt.utcnow()).days
+                if days_left_for_expiration < CERTIFICATION_EXPIRATION_THRESHOLD:
+                    for record in records:
+                        expiring_endpoints_by_service.setdefault(
+                            (record["org_id"], record["service_id"]), {})[record["endpoint"]] = days_left_for_expiration
+        expiring_services_by_recipient = {}
+        for (org_id, service_id), expiring_endpoints in expiring_endpoints_by_service.items():
+            expiring_service = (org_id, service_id, ", ".join(sorted(expiring_endpoints.keys())),
+                                min(expiring_endpoints.values()))
+            slack_message = self._get_certificate_expiration_slack_notification_message(
+                org_id=org_id, service_id=service_id, endpoint=expiring_service[2],
+                days_left_for_expiration=expiring_service[3])
+            self._send_slack_notification(slack_message=slack_message)
+            for recipient in self._get_service_provider_email(org_id=org_id, service_id=service_id) or []:
+                expiring_services_by_recipient.setdefault(recipient.strip().lower(), []).append(expiring_service)
+        for recipient, expiring_services in expiring_services_by_recipient.items():
+            self._send_certificate_expiration_email(recipient=recipient, expiring_services=expiring_services)
+
+    def _send_certificate_expiration_email(self, recipient, expiring_services):
+        """ expiring_services holds (org_id, service_id, endpoint, days_left_for_expiration) tuples. """
+        if len(expiring_services) == 1:
+            org_id, service_id, endpoint, days_left_for_expiration = expiring_services[0]
+            certificate_expiration_notification_subject = \
+                self._get_certificate_expiration_email_notification_subject(org_id=org_id, service_id=service_id,
+                                                                            endpoint=endpoint)
+            certificate_expiration_notification_message = \
+                self._get_certificate_expiration_email_notification_message(
+                    org_id=org_id, service_id=service_id, endpoint=endpoint,
+                    days_left_for_expiration=days_left_for_expiration)
+        else:
+            certificate_expiration_notification_subject = \
+                CERT_EXP_BATCH_EMAIL_NOTIFICATION_SUBJ % (len(expiring_services), NETWORK_NAME)
+            certificate_expiration_notification_message = \
+                self._get_certificate_expiration_batch_email_notification_message(expiring_services=expiring_services)
         self._send_email_notification(
             certificate_expiration_notification_subject=certificate_expiration_notification_subject,
             certificate_expiration_notification_message=certificate_expiration_notification_message,
-            recipients=recipients)
-        slack_message = self._get_certificate_expiration_slack_notification_message(
-            org_id=org_id, service_id=service_id, endpoint=endpoint, days_left_for_expiration=days_left_for_expiration)
-        self._send_slack_notification(slack_message=slack_message)
+            recipients=[recipient])
+
+    def _get_host_and_port(self, endpoint):
+        """ Returns (hostname, port) of a public https endpoint, None for endpoints without a certificate to check. """
+        endpoint = endpoint.strip()
+        if not self._valid_url(url=endpoint) or not self._is_https_endpoint(endpoint):
+            return None
+        endpoint = self.obj_util.remove_http_https_prefix(url=endpoint).split("/")[0]
+        hostname, _, port = endpoint.partition(":")
+        return hostname.lower(), int(port) if port else 443
+
+    def _get_expiration_date_or_none(self, endpoint):
+        try:
+            return self._get_certification_expiration_date_for_given_service(endpoint=endpoint)
+        except Exception as e:
+            logger.info(f"Unable to read certificate of endpoint {endpoint}, error: {repr(e)}")
+            return None
 
     def _get_certification_expiration_date_for_given_service(self, endpoint):
-        endpoint = endpoint.lstrip()
-        if self._valid_url(url=endpoint):
-            if self._is_https_endpoint(endpoint):
-                endpoint = self.obj_util.remove_http_https_prefix(url=endpoint)
-                hostname = endpoint.split(":")[0]
-                port = endpoint.split(":")[1]
-                context = ssl.create_default_context()
-                with socket.create_connection((hostname, port)) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        data = json.dumps(ssock.getpeercert())
-                        expiration_date = json.loads(data)["notAfter"]
-                        return dt.strptime(expiration_date, "%b %d %H:%M:%S %Y %Z")
+        host_and_port = self._get_host_and_port(endpoint=endpoint)
+        if host_and_port is None:
+            return None
+        hostname, port = host_and_port
+        context = ssl.create_default_context()
+        with socket.create_connection((hostname, port), timeout=CERTIFICATE_HANDSHAKE_TIMEOUT) as sock:
+            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+                expiration_date = ssock.getpeercert()["notAfter"]
+        return dt.strptime(expiration_date, "%b %d %H:%M:%S %Y %Z")
 
     @staticmethod
     def _get_certificate_expiration_email_notification_subject(org_id, service_id, endpoint):
@@ -158,6 +221,12 @@ class MonitorServiceCertificate(MonitorService):
     def _get_certificate_expiration_email_notification_message(org_id, service_id, endpoint, days_left_for_expiration):
         return CERT_EXP_EMAIL_NOTIFICATION_MSG % (service_id, org_id, NETWORK_NAME, days_left_for_expiration, endpoint)
 
+    @staticmethod
+    def _get_certificate_expiration_batch_email_notification_message(expiring_services):
+        return CERT_EXP_BATCH_EMAIL_NOTIFICATION_MSG % (NETWORK_NAME, "".join(
+            CERT_EXP_BATCH_EMAIL_NOTIFICATION_ITEM % (service_id, org_id, days_left_for_expiration, endpoint)
+            for org_id, service_id, endpoint, days_left_for_expiration in expiring_services))
+
     @staticmethod
     def _get_certificate_expiration_slack_notification_message(org_id, service_id, endpoint, days_left_for_expiration):
         return CERT_EXP_SLACK_NOTIFICATION_MSG % (service_id, org_id, NETWORK_NAME, days_left_for_expiration, endpoint)
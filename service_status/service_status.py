@@ -1,5 +1,8 @@
 import re
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime as dt
 from datetime import timedelta
 from common.utils import Utils
@@ -8,7 +11,8 @@ from service_status.config import REGION_NAME, NOTIFICATION_ARN, SLACK_HOOK, NET
 from common.boto_utils import BotoUtils
 from common.utils import Utils
 from common.logger import get_logger
-from service_status.constant import SRVC_STATUS_GRPC_TIMEOUT, LIMIT
+from service_status.constant import SRVC_STATUS_GRPC_TIMEOUT, LIMIT, PROBE_MAX_WORKERS, \
+    NOTIFICATION_MAX_WORKERS, STATUS_UPDATE_BATCH_SIZE, PROBE_DEADLINE_MARGIN_IN_SECONDS
 from grpc_health.v1 import health_pb2 as heartb_pb2
 from grpc_health.v1 import health_pb2_grpc as heartb_pb2_grpc
 import grpc
@@ -27,16 +31,32 @@ class ServiceStatus:
         self.rex_for_pb_ip = "^(http://)*(https://)*127.0.0.1|^(http://)*(https://)*localhost|^(http://)*(https://)*192.|^(http://)*(https://)*172.|^(http://)*(https://)*10."
         self.obj_util = Utils()
         self.net_id = net_id
+        self._channels = {}
+        self._channels_lock = threading.Lock()
+
+    def _get_channel(self, url, secure):
+        """ Endpoints served from the same host and port share one gRPC channel for the whole run. """
+        key = (url, secure)
+        with self._channels_lock:
+            channel = self._channels.get(key, None)
+            if channel is None:
+                if secure:
+                    channel = grpc.secure_channel(url, grpc.ssl_channel_credentials())
+                else:
+                    channel = grpc.insecure_channel(url)
+                self._channels[key] = channel
+            return channel
+
+    def _close_channels(self):
+        with self._channels_lock:
+            channels = list(self._channels.values())
+            self._channels = {}
+        for channel in channels:
+            channel.close()
 
     def _get_service_status(self, url, secure=True):
         try:
-            if secure:
-                channel = grpc.secure_channel(
-                    url, grpc.ssl_channel_credentials())
-            else:
-                channel = grpc.insecure_channel(url)
-
-            stub = heartb_pb2_grpc.HealthStub(channel)
+            stub = heartb_pb2_grpc.HealthStub(self._get_channel(url=url, secure=secure))
             response = stub.Check(heartb_pb2.HealthCheckRequest(
                 service=""), timeout=SRVC_STATUS_GRPC_TIMEOUT)
             if response is not None and response.status == 1:
@@ -57,42 +77,106 @@ class ServiceStatus:
             return self._get_service_status(url=url, secure=secure)
         return 0
 
-    def _get_service_endpoint_data(self):
+    def _get_service_endpoint_data(self, limit=LIMIT):
         query = "SELECT row_id, org_id, service_id, endpoint, is_available, failed_status_count FROM service_endpoint WHERE " \
                 "next_check_timestamp < UTC_TIMESTAMP AND endpoint not regexp %s ORDER BY last_check_timestamp ASC " \
                 "LIMIT %s"
-        result = self.repo.execute(query, [self.rex_for_pb_ip, LIMIT])
+        result = self.repo.execute(query, [self.rex_for_pb_ip, limit])
         if result is None or result == []:
             logger.info("Unable to find services.")
         return result
 
-    def _update_service_status_parameters(self, status, next_check_timestamp, failed_status_count, row_id):
-        update_query = "UPDATE service_endpoint SET is_available = %s, last_check_timestamp = current_timestamp, " \
-                       "next_check_timestamp = %s, failed_status_count = %s WHERE row_id = %s "
-        response = self.repo.execute(update_query, [status, next_check_timestamp, failed_status_count, row_id])
-        return response
-
-    def update_service_status(self):
-        service_endpoint_data = self._get_service_endpoint_data()
+    def _update_service_status_parameters_in_batch(self, endpoint_statuses):
+        """ endpoint_statuses holds (row_id, status, next_check_timestamp, failed_status_count) tuples. """
+        if len(endpoint_statuses) == 0:
+            return 0
+        cases = " ".join(["WHEN %s THEN %s"] * len(endpoint_statuses))
+        update_query = "UPDATE service_endpoint SET is_available = CASE row_id " + cases + \
+                       " END, last_check_timestamp = current_timestamp, next_check_timestamp = CASE row_id " + cases + \
+                       " END, failed_status_count = CASE row_id " + cases + \
+                       " END WHERE row_id IN (" + ",".join(["%s"] * len(endpoint_statuses)) + ")"
+        update_params = []
+        for position in range(1, 4):
+            for endpoint_status in endpoint_statuses:
+                update_params.extend([endpoint_status[0], endpoint_status[position]])
+        update_params.extend([endpoint_status[0] for endpoint_status in endpoint_statuses])
+        response = self.repo.execute(update_query, update_params)
+        return response[0]
+
+    def _probe_endpoint(self, record):
+        status = self._ping_url(record["endpoint"])
+        failed_status_count = self._calculate_failed_status_count(
+            current_status=status, old_status=int.from_bytes(record["is_available"], "big"),
+            old_failed_status_count=record["failed_status_count"])
+        next_check_timestamp = self._calculate_next_check_timestamp(failed_status_count=failed_status_count)
+        return record["row_id"], status, next_check_timestamp, failed_status_count
+
+    def _notify_service_down(self, org_id, service_id, endpoint):
+        try:
+            recipients = self._get_service_provider_email(org_id=org_id, service_id=service_id)
+            self._send_notification(org_id=org_id, service_id=service_id, recipients=recipients or [],
+                                    endpoint=endpoint)
+        except Exception as e:
+            logger.info(f"Failed to notify service down for org_id: {org_id} service_id: {service_id} "
+                        f"endpoint: {endpoint}, error: {repr(e)}")
+
+    def update_service_status(self, remaining_time_in_millis=None):
+        """
+            Probes the due endpoints on a bounded pool of workers, writes their statuses in batches and hands
+            notifications for the endpoints found down to a separate pool so slow Slack or email calls never
+            hold up probing. With remaining_time_in_millis the run only picks as many endpoints as it can probe
+            in time and stops starting probes near the deadline, endpoints left over are due in the next run.
+        """
+        deadline = None
+        limit = LIMIT
+        if remaining_time_in_millis is not None:
+            deadline = time.monotonic() + remaining_time_in_millis / 1000 - PROBE_DEADLINE_MARGIN_IN_SECONDS
+            probe_rounds = max(int((deadline - time.monotonic()) // SRVC_STATUS_GRPC_TIMEOUT), 1)
+            limit = min(LIMIT, probe_rounds * PROBE_MAX_WORKERS)
+        pending_records = iter(self._get_service_endpoint_data(limit=limit) or [])
         rows_updated = 0
-        for record in service_endpoint_data:
-            status = self._ping_url(record["endpoint"])
-            failed_status_count = self._calculate_failed_status_count(
-                current_status=status, old_status=int.from_bytes(record["is_available"], "big"),
-                old_failed_status_count=record["failed_status_count"])
-            next_check_timestamp = self._calculate_next_check_timestamp(failed_status_count=failed_status_count)
-            query_data = self._update_service_status_parameters(status=status,
-                                                                next_check_timestamp=next_check_timestamp,
-                                                                failed_status_count=failed_status_count,
-                                                                row_id=record["row_id"])
-            if status == 0:
-                org_id = record["org_id"]
-                service_id = record["service_id"]
-                recipients = self._get_service_provider_email(org_id=org_id, service_id=service_id)
-                self._send_notification(org_id=org_id, service_id=service_id, recipients=recipients,
-                                        endpoint=record["endpoint"])
-            rows_updated = rows_updated + query_data[0]
-        logger.info(f"no of rows updated: {rows_updated}")
+        endpoint_statuses = []
+        notifications = []
+        probes = {}
+
+        def submit_next_probe(probe_executor):
+            if deadline is not None and time.monotonic() + SRVC_STATUS_GRPC_TIMEOUT > deadline:
+                return False
+            record = next(pending_records, None)
+            if record is None:
+                return False
+            probes[probe_executor.submit(self._probe_endpoint, record)] = record
+            return True
+
+        try:
+            with ThreadPoolExecutor(max_workers=NOTIFICATION_MAX_WORKERS) as notification_executor:
+                with ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS) as probe_executor:
+                    while len(probes) < PROBE_MAX_WORKERS and submit_next_probe(probe_executor):
+                        pass
+                    while len(probes) > 0:
+                        completed_probes, _ = wait(probes, return_when=FIRST_COMPLETED)
+                        for probe in completed_probes:
+                            record = probes.pop(probe)
+                            submit_next_probe(probe_executor)
+                            try:
+                                endpoint_status = probe.result()
+                            except Exception as e:
+                                logger.info(f"Failed to probe endpoint {record['endpoint']}, error: {repr(e)}")
+                                continue
+                            endpoint_statuses.append(endpoint_status)
+                            if endpoint_status[1] == 0:
+                                notifications.append(notification_executor.submit(
+                                    self._notify_service_down, record["org_id"], record["service_id"],
+                                    record["endpoint"]))
+                            if len(endpoint_statuses) == STATUS_UPDATE_BATCH_SIZE:
+                                rows_updated = rows_updated + self._update_service_status_parameters_in_batch(
+                                    endpoint_statuses)
+                                endpoint_statuses = []
+                    rows_updated = rows_updated + self._update_service_status_parameters_in_batch(endpoint_statuses)
+        finally:
+            self._close_channels()
+        logger.info(f"no of rows updated: {rows_updated}, notifications sent: {len(notifications)}, "
+                    f"endpoints left for the next run: {len(list(pending_records))}")
 
     def _calculate_failed_status_count(self, current_status, old_status, old_failed_status_count):
         if current_status == old_status == 0:
@@ -57,3 +57,37 @@ class TestMonitorServiceCertificatesExpiry(TestCase):
         endpoint = "127.0.0.1:9999"
         response = MonitorServiceCertificate(repo=None)._valid_url(url=endpoint)
         assert (response == False)
+
+    def test_get_host_and_port(self):
+        monitor_service_certificate = MonitorServiceCertificate(repo=None)
+        assert (monitor_service_certificate._get_host_and_port(endpoint=" https://Dummy.com:8088") == ("dummy.com", 8088))
+        assert (monitor_service_certificate._get_host_and_port(endpoint="https://dummy.com") == ("dummy.com", 443))
+        assert (monitor_service_certificate._get_host_and_port(endpoint="http://dummy.com:8088") is None)
+
+    @patch("service_status.monitor_service.MonitorServiceCertificate._send_email_notification")
+    @patch("service_status.monitor_service.MonitorServiceCertificate._send_slack_notification")
+    @patch("service_status.monitor_service.MonitorServiceCertificate._get_service_provider_email")
+    @patch("service_status.monitor_service.MonitorServiceCertificate._get_certification_expiration_date_for_given_service")
+    @patch("service_status.monitor_service.MonitorServiceCertificate._get_service_endpoint_data")
+    def test_certificate_expiry_is_notified_once_per_host_and_contributor(
+            self, mock_get_service_endpoint_data, mock_get_certification_expiration_date,
+            mock_get_service_provider_email, mock_send_slack_notification, mock_send_email_notification):
+        mock_get_service_endpoint_data.return_value = [
+            {"endpoint": "https://dummy.com:8088", "org_id": "test_org_id", "service_id": "test_service_id_1"},
+            {"endpoint": "https://dummy.com:8088", "org_id": "test_org_id", "service_id": "test_service_id_2"},
+            {"endpoint": "https://dummy.com:8089", "org_id": "test_org_id", "service_id": "test_service_id_1"}
+        ]
+        mock_get_certification_expiration_date.return_value = dt.utcnow() + timedelta(days=10, hours=1)
+        mock_get_service_provider_email.side_effect = lambda org_id, service_id: \
+            ["owner@dummy.io"] if service_id == "test_service_id_1" else ["Owner@dummy.io", "member@dummy.io"]
+        MonitorServiceCertificate(repo=None).notify_service_contributors_for_certificate_expiration()
+        assert (mock_get_certification_expiration_date.call_count == 2)
+        assert (mock_send_slack_notification.call_count == 2)
+        emails = {call[1]["recipients"][0]: call[1] for call in mock_send_email_notification.call_args_list}
+        assert (sorted(emails.keys()) == ["member@dummy.io", "owner@dummy.io"])
+        assert (emails["owner@dummy.io"]["certificate_expiration_notification_subject"] ==
+                "Certificates are about to expire for 2 services for TEST network.")
+        assert ("https://dummy.com:8088, https://dummy.com:8089" in
+                emails["owner@dummy.io"]["certificate_expiration_notification_message"])
+        assert (emails["member@dummy.io"]["certificate_expiration_notification_subject"] ==
+                "Certificates are about to expire for service test_service_id_2 for TEST network.")
@@ -0,0 +1,67 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from service_status.config import NETWORK_ID
+from service_status.service_status import ServiceStatus
+
+
+class TestServiceStatus(TestCase):
+
+    @patch("service_status.service_status.ServiceStatus._notify_service_down")
+    @patch("service_status.service_status.ServiceStatus._ping_url")
+    def test_update_service_status_writes_statuses_in_one_batch(self, mock_ping_url, mock_notify_service_down):
+        repo = Mock()
+        repo.execute.side_effect = [
+            [
+                {"row_id": 1, "org_id": "test_org_id", "service_id": "test_service_id",
+                 "endpoint": "https://dummy.io:8080", "is_available": b"\x01", "failed_status_count": 1},
+                {"row_id": 2, "org_id": "test_org_id", "service_id": "test_service_id",
+                 "endpoint": "https://dummy.io:8081", "is_available": b"\x00", "failed_status_count": 3}
+            ],
+            [2, {"last_row_id": 0}]
+        ]
+        mock_ping_url.side_effect = lambda url: 1 if url.endswith("8080") else 0
+        ServiceStatus(repo=repo, net_id=NETWORK_ID).update_service_status()
+        assert (repo.execute.call_count == 2)
+        update_query, update_params = repo.execute.call_args[0]
+        assert (update_query.startswith("UPDATE service_endpoint SET is_available = CASE row_id"))
+        assert (sorted(update_params[-2:]) == [1, 2])
+        mock_notify_service_down.assert_called_once_with("test_org_id", "test_service_id", "https://dummy.io:8081")
+
+    @patch("service_status.service_status.ServiceStatus._notify_service_down")
+    @patch("service_status.service_status.ServiceStatus._ping_url")
+    def test_update_service_status_fits_the_remaining_time(self, mock_ping_url, mock_notify_service_down):
+        repo = Mock()
+        repo.execute.side_effect = [
+            [
+                {"row_id": 1, "org_id": "test_org_id", "service_id": "test_service_id",
+                 "endpoint": "https://dummy.io:8080", "is_available": b"\x01", "failed_status_count": 1},
+                {"row_id": 2, "org_id": "test_org_id", "service_id": "test_service_id",
+                 "endpoint": "https://dummy.io:8081", "is_available": b"\x01", "failed_status_count": 1}
+            ],
+            [1, {"last_row_id": 0}]
+        ]
+
+        def ping_url(url):
+            if url.endswith("8081"):
+                raise Exception("probe failed")
+            return 1
+
+        mock_ping_url.side_effect = ping_url
+        ServiceStatus(repo=repo, net_id=NETWORK_ID).update_service_status(remaining_time_in_millis=60000)
+        assert (repo.execute.call_args_list[0][0][1][1] == 200)
+        update_query, update_params = repo.execute.call_args[0]
+        assert (update_params[-1:] == [1])
+        mock_notify_service_down.assert_not_called()
+
+    def test_calculate_failed_status_count(self):
+        service_status = ServiceStatus(repo=None, net_id=NETWORK_ID)
+        assert (service_status._calculate_failed_status_count(
+            current_status=0, old_status=0, old_failed_status_count=3) == 4)
+        assert (service_status._calculate_failed_status_count(
+            current_status=1, old_status=0, old_failed_status_count=3) == 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
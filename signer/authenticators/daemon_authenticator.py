@@ -1,10 +1,16 @@
-import web3
 import base64
+import threading
+import time
+
+import web3
 from eth_account.messages import defunct_hash_message
 
-from common.blockchain_util import BlockChainUtil
+from common.block_height import BlockHeightCache
 from common.repository import Repository
 from signer.config import NETWORKS, NET_ID
+from signer.constant import AUTH_KEYS_CACHE_TTL
+
+repo = Repository(net_id=NET_ID, NETWORKS=NETWORKS)
 
 
 class SignatureAuthenticator(object):
@@ -18,7 +24,7 @@ class SignatureAuthenticator(object):
     def get_signature_message(self):
         pass
 
-    def get_public_keys(self):
+    def get_public_keys(self, refresh=False):
         pass
 
     def get_signature(self):
@@ -30,8 +36,8 @@ class SignatureAuthenticator(object):
     def verify_current_block_number(self):
         signed_block_number = int(
             self.event['headers']['x-currentblocknumber'])
-        blockchain_util = BlockChainUtil(provider_type="WS_PROVIDER", provider=self.networks[self.net_id]['ws_provider'])
-        current_block_number = blockchain_util.get_current_block_no()
+        current_block_number = BlockHeightCache.for_provider(
+            provider_type="WS_PROVIDER", provider=self.networks[self.net_id]['ws_provider']).get_block_number()
         print(f"current block {current_block_number}\n"
               f"signed clock number {signed_block_number}")
         if current_block_number > signed_block_number + self.BLOCK_LIMIT or current_block_number < signed_block_number - self.BLOCK_LIMIT:
@@ -42,6 +48,8 @@ class SignatureAuthenticator(object):
 
 
 class DaemonAuthenticator(SignatureAuthenticator):
+    _public_keys_cache = {}
+    _public_keys_cache_lock = threading.Lock()
 
     def __init__(self, events, networks, net_id):
         super().__init__(events, networks, net_id)
@@ -56,18 +64,25 @@ class DaemonAuthenticator(SignatureAuthenticator):
                                          ['_usage', username, organization_id, service_id, group_id, int(block_number)])
         return defunct_hash_message(message)
 
-    def get_public_keys(self):
+    def get_public_keys(self, refresh=False):
+        """ Reads the daemon keys of the group through a container wide cache, refresh bypasses it. """
         organization_id = self.event['headers']['x-organizationid']
         group_id = self.event['headers']['x-groupid']
         service_id = self.event['headers']['x-serviceid']
+        cache_key = (organization_id, service_id, group_id)
+        cached_public_keys = DaemonAuthenticator._public_keys_cache.get(cache_key, None)
+        if not refresh and cached_public_keys is not None and \
+                time.monotonic() - cached_public_keys[1] < AUTH_KEYS_CACHE_TTL:
+            return cached_public_keys[0]
 
         query = 'SELECT public_key FROM demon_auth_keys WHERE org_id = %s AND service_id = %s AND group_id = %s '
-        stored_public_keys = Repository(net_id=NET_ID, NETWORKS=NETWORKS).execute(
-            query, [organization_id, service_id, group_id])
+        stored_public_keys = repo.execute(query, [organization_id, service_id, group_id])
         public_keys = []
         if stored_public_keys:
             for stored_public_key in stored_public_keys:
                 public_keys.append(stored_public_key['public_key'])
+        with DaemonAuthenticator._public_keys_cache_lock:
+            DaemonAuthenticator._public_keys_cache[cache_key] = (public_keys, time.monotonic())
         return public_keys
 
     def get_signature(self):
@@ -3,3 +3,14 @@ REG_CNTRCT_PATH = COMMON_CNTRCT_PATH + '/abi/Registry.json'
 MPE_CNTRCT_PATH = COMMON_CNTRCT_PATH + '/abi/MultiPartyEscrow.json'
 REG_ADDR_PATH = COMMON_CNTRCT_PATH + '/networks/Registry.json'
 MPE_ADDR_PATH = COMMON_CNTRCT_PATH + '/networks/MultiPartyEscrow.json'
+SERVICE_GROUPS_CACHE_TTL = 300
+FREE_CALL_USAGE_CACHE_TTL = 60
+FREE_CALL_USAGE_CACHE_MARGIN = 5
+FREE_CALL_USAGE_CACHE_MAX_SIZE = 10000
+DAEMON_CALL_TIMEOUT = 10
+DAEMON_CALL_MIN_TIMEOUT = 1
+DAEMON_CHANNEL_IDLE_TIMEOUT = 600
+# a revoked daemon key is still accepted by a warm authorizer for at most AUTH_KEYS_CACHE_TTL seconds
+AUTH_KEYS_CACHE_TTL = 60
+RECOVERED_SIGNER_CACHE_SIZE = 4096
+SIGNATURE_BATCH_MAX_SIZE = 100
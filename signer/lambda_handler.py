@@ -10,6 +10,7 @@ from common.exceptions import BadRequestException
 from common.logger import get_logger
 from common.utils import Utils, generate_lambda_response, handle_exception_with_slack_notification
 from signer.config import NETWORK_ID, NET_ID, SIGNER_ADDRESS, SLACK_HOOK
+from signer.constant import DAEMON_CALL_TIMEOUT, DAEMON_CALL_MIN_TIMEOUT
 from signer.signers import Signer
 
 patch_all()
@@ -18,16 +19,27 @@ obj_util = Utils()
 
 logger = get_logger(__name__)
 
+signer = None
+
+
+def get_signer():
+    """ The signer holds no per request state, so one instance serves every request of the container. """
+    global signer
+    if signer is None:
+        signer = Signer(net_id=NET_ID)
+    return signer
+
+
 @handle_exception_with_slack_notification(SLACK_HOOK=SLACK_HOOK, NETWORK_ID=NETWORK_ID, logger=logger)
 def request_handler(event, context):
-    logger.info("Signer::event: ", event)
+    logger.info(f"Signer::event: {event}")
     if "path" not in event:
         return generate_lambda_response(400, "Bad Request", cors_enabled=True)
     try:
         payload_dict = None
         path = event["path"].lower()
         path = re.sub(r"^(\/signer)", "", path)
-        signer_object = Signer(net_id=NET_ID)
+        signer_object = get_signer()
         method = event["httpMethod"]
         response_data = None
 
@@ -61,6 +73,12 @@ def request_handler(event, context):
                 amount=payload_dict["amount"],
             )
 
+        elif "/batch-signatures" == path:
+
+            response_data = signer_object.signatures_for_channels(
+                user_data=event["requestContext"],
+                signature_requests=payload_dict["signatures"])
+
         elif "/open-channel-for-third-party" == path:
 
             response_data = signer_object.signature_for_open_channel_for_third_party(
@@ -71,7 +89,7 @@ def request_handler(event, context):
                 executor_wallet_address=payload_dict["executor_wallet_address"])
         else:
             return generate_lambda_response(404, "Not Found", cors_enabled=True)
-        logger.info("Signer::response_data: ", response_data)
+        logger.info(f"Signer::response_data: {response_data}")
         if response_data is None:
             err_msg = {
                 "status": "failed",
@@ -87,6 +105,15 @@ def request_handler(event, context):
                 "status": "success",
                 "data": response_data
             }, cors_enabled=True)
+    except BadRequestException as e:
+        err_msg = {
+            "status": "failed",
+            "error": repr(e),
+            "api": event["path"],
+            "payload": payload_dict,
+            "network_id": NET_ID,
+        }
+        response = generate_lambda_response(StatusCode.BAD_REQUEST, err_msg, cors_enabled=True)
     except Exception as e:
         err_msg = {
             "status": "failed",
@@ -104,7 +131,6 @@ def request_handler(event, context):
 @handle_exception_with_slack_notification(SLACK_HOOK=SLACK_HOOK, NETWORK_ID=NETWORK_ID, logger=logger)
 def free_call_token_handler(event, context):
     logger.info(f"Request for freecall token event {event}")
-    signer = Signer(net_id=NET_ID)
     payload_dict = event.get("queryStringParameters")
     email = event["requestContext"]["authorizer"]["claims"]["email"]
     org_id = payload_dict["org_id"]
@@ -114,7 +140,12 @@ def free_call_token_handler(event, context):
     logger.info(
         f"Free call token generation for email:{email} org_id:{org_id} service_id:{service_id} group_id:{group_id} public_key:{public_key}")
 
-    token_data = signer.token_for_free_call(email, org_id, service_id, group_id, public_key)
+    timeout = DAEMON_CALL_TIMEOUT
+    if context is not None:
+        # leave a second of the invocation to respond when the daemon does not answer in time, but never hand
+        # grpc a deadline that is not positive
+        timeout = max(min(timeout, context.get_remaining_time_in_millis() / 1000 - 1), DAEMON_CALL_MIN_TIMEOUT)
+    token_data = get_signer().token_for_free_call(email, org_id, service_id, group_id, public_key, timeout=timeout)
 
     return generate_lambda_response(200, {
         "status": "success",
@@ -1,9 +1,13 @@
+from functools import lru_cache
+
 from web3.auto import w3
 
 from signer.authenticators.daemon_authenticator import DaemonAuthenticator
 from signer.config import NETWORKS, NET_ID
+from signer.constant import RECOVERED_SIGNER_CACHE_SIZE
 
 
+@lru_cache(maxsize=RECOVERED_SIGNER_CACHE_SIZE)
 def extract_public_key(message_data, signature):
     public_key = w3.eth.account.recoverHash(message_data, signature=signature)
     return public_key
@@ -56,6 +60,9 @@ def main(event, context):
         principal = authenticator.get_principal()
         derived_public_key = extract_public_key(message, signature)
         print("Derived public key is %s", derived_public_key)
+        if not verify_public_key(public_keys, derived_public_key):
+            # the key may have been registered after the cached keys were read
+            public_keys = authenticator.get_public_keys(refresh=True)
         verified = (verify_public_key(public_keys, derived_public_key)
                     and authenticator.verify_current_block_number())
         if verified:
@@ -1,28 +1,40 @@
 import json
-from urllib.parse import urlparse
+import threading
+import time
 
-import boto3
 import grpc
-import web3
-from eth_account.messages import defunct_hash_message
 from web3 import Web3
 
+from common.block_height import BlockHeightCache
 from common.blockchain_util import BlockChainUtil
+from common.exceptions import BadRequestException
+from common.grpc_channel_pool import GrpcChannelPool
+from common.lambda_transport import get_lambda_client
 from common.logger import get_logger
-from common.utils import Utils
+from common.utils import Utils, validate_dict
 from signer.config import GET_SERVICE_DETAILS_FOR_GIVEN_ORG_ID_AND_SERVICE_ID_ARN, METERING_ARN, NETWORKS, \
     PREFIX_FREE_CALL, REGION_NAME, SIGNER_ADDRESS, SIGNER_KEY
-from signer.constant import MPE_ADDR_PATH
+from signer.constant import DAEMON_CALL_TIMEOUT, DAEMON_CHANNEL_IDLE_TIMEOUT, FREE_CALL_USAGE_CACHE_MARGIN, \
+    FREE_CALL_USAGE_CACHE_MAX_SIZE, FREE_CALL_USAGE_CACHE_TTL, MPE_ADDR_PATH, SERVICE_GROUPS_CACHE_TTL, \
+    SIGNATURE_BATCH_MAX_SIZE
 from signer.stubs import state_service_pb2, state_service_pb2_grpc
 
 logger = get_logger(__name__)
 
 FREE_CALL_EXPIRY=172800
+SIGNATURE_REQUEST_REQUIRED_KEYS = {"regular-call": ["channel_id", "nonce", "amount"],
+                                   "state-service": ["channel_id"]}
 
 class Signer:
+    # service groups and free call usage are shared by every Signer of the container
+    _service_groups_cache = {}
+    _free_call_usage_cache = {}
+    _cache_lock = threading.Lock()
+    _daemon_channel_pool = GrpcChannelPool(idle_timeout=DAEMON_CHANNEL_IDLE_TIMEOUT)
+
     def __init__(self, net_id):
         self.net_id = net_id
-        self.lambda_client = boto3.client("lambda", region_name=REGION_NAME)
+        self.lambda_client = get_lambda_client(region_name=REGION_NAME)
         self.obj_utils = Utils()
         self.obj_blockchain_utils = BlockChainUtil(
             provider_type="HTTP_PROVIDER",
@@ -30,10 +42,29 @@ class Signer:
         )
         self.mpe_address = self.obj_blockchain_utils.read_contract_address(
             net_id=self.net_id, path=MPE_ADDR_PATH, key="address")
-        self.current_block_no = self.obj_blockchain_utils.get_current_block_no(
-        )
+        self.block_height = BlockHeightCache.for_provider(provider_type="HTTP_PROVIDER",
+                                                          provider=NETWORKS[self.net_id]["http_provider"])
 
-    def _get_free_calls_allowed(self, org_id, service_id, group_id):
+    @property
+    def current_block_no(self):
+        return self.block_height.get_block_number()
+
+    def _get_service_groups(self, org_id, service_id, group_id):
+        """
+            Returns the groups of the service keyed by group id. They are read through a container wide cache
+            which is refreshed when stale or when the requested group is not known yet.
+        """
+        cache_key = (org_id, service_id)
+        cached_groups = Signer._service_groups_cache.get(cache_key, None)
+        if cached_groups is not None and group_id in cached_groups[0] and \
+                time.monotonic() - cached_groups[1] < SERVICE_GROUPS_CACHE_TTL:
+            return cached_groups[0]
+        groups = self._fetch_service_groups(org_id=org_id, service_id=service_id)
+        with Signer._cache_lock:
+            Signer._service_groups_cache[cache_key] = (groups, time.monotonic())
+        return groups
+
+    def _fetch_service_groups(self, org_id, service_id):
         lambda_payload = {
             "httpMethod": "GET",
             "pathParameters": {
@@ -50,9 +81,19 @@ class Signer:
         get_service_response = json.loads(response_body_raw)
         if get_service_response["status"] == "success":
             groups_data = get_service_response["data"].get("groups", [])
-            for group_data in groups_data:
-                if group_data["group_id"] == group_id:
-                    return group_data["free_calls"]
+            return {group_data["group_id"]: group_data for group_data in groups_data}
+        raise Exception("Unable to fetch service details for service %s under organization %s.",
+                        service_id, org_id)
+
+    @classmethod
+    def invalidate_service_groups(cls, org_id, service_id):
+        with cls._cache_lock:
+            cls._service_groups_cache.pop((org_id, service_id), None)
+
+    def _get_free_calls_allowed(self, org_id, service_id, group_id):
+        group_data = self._get_service_groups(org_id, service_id, group_id).get(group_id, None)
+        if group_data is not None:
+            return group_data["free_calls"]
         raise Exception("Unable to fetch free calls information for service %s under organization %s for %s group.",
                         service_id, org_id, group_id)
 
@@ -82,13 +123,41 @@ class Signer:
     def _free_calls_allowed(self, username, org_id, service_id, group_id):
         """
             Method to check free calls exists for given user or not.
-            Call monitoring service to get the details
+            The calls made reported by the metering service are cached for a short time together with the
+            free call signatures issued since. Other containers issue signatures the estimate does not see, so
+            metering is called again when the estimate is stale or leaves FREE_CALL_USAGE_CACHE_MARGIN free
+            calls or less.
         """
         free_calls_allowed = self._get_free_calls_allowed(org_id, service_id, group_id)
+        usage_key = (username, org_id, service_id, group_id)
+        usage = Signer._free_call_usage_cache.get(usage_key, None)
+        if usage is not None and time.monotonic() - usage[2] < FREE_CALL_USAGE_CACHE_TTL and \
+                free_calls_allowed - usage[0] - usage[1] > FREE_CALL_USAGE_CACHE_MARGIN:
+            return True
         total_calls_made = self._get_total_calls_made(username, org_id, service_id, group_id)
+        self._cache_free_call_usage(usage_key, total_calls_made)
         is_free_calls_allowed = (True if ((free_calls_allowed - total_calls_made) > 0) else False)
         return is_free_calls_allowed
 
+    @staticmethod
+    def _cache_free_call_usage(usage_key, total_calls_made):
+        now = time.monotonic()
+        with Signer._cache_lock:
+            usage_cache = Signer._free_call_usage_cache
+            if usage_key not in usage_cache and len(usage_cache) >= FREE_CALL_USAGE_CACHE_MAX_SIZE:
+                for expired_key in [key for key, usage in usage_cache.items()
+                                    if now - usage[2] >= FREE_CALL_USAGE_CACHE_TTL]:
+                    del usage_cache[expired_key]
+            if usage_key not in usage_cache and len(usage_cache) >= FREE_CALL_USAGE_CACHE_MAX_SIZE:
+                del usage_cache[min(usage_cache, key=lambda key: usage_cache[key][2])]
+            usage_cache[usage_key] = [total_calls_made, 0, now]
+
+    def _record_free_call_signature(self, username, org_id, service_id, group_id):
+        with Signer._cache_lock:
+            usage = Signer._free_call_usage_cache.get((username, org_id, service_id, group_id), None)
+            if usage is not None:
+                usage[1] += 1
+
     def signature_for_free_call(self, user_data, org_id, service_id, group_id):
         """
             Method to generate signature for free call.
@@ -97,27 +166,12 @@ class Signer:
             username = user_data["authorizer"]["claims"]["email"]
             if self._free_calls_allowed(
                 username=username, org_id=org_id, service_id=service_id, group_id=group_id):
-                current_block_no = self.obj_utils.get_current_block_no(
-                    ws_provider=NETWORKS[self.net_id]["ws_provider"])
-                provider = Web3.HTTPProvider(
-                    NETWORKS[self.net_id]["http_provider"])
-                w3 = Web3(provider)
-                message = web3.Web3.soliditySha3(
-                    ["string", "string", "string", "string", "uint256"],
-                    [
-                        PREFIX_FREE_CALL, username, org_id, service_id,
-                        current_block_no
-                    ],
-                )
-                signer_key = SIGNER_KEY
-                if not signer_key.startswith("0x"):
-                    signer_key = "0x" + signer_key
-                signature = bytes(
-                    w3.eth.account.signHash(defunct_hash_message(message),
-                                            signer_key).signature)
-                signature = signature.hex()
-                if not signature.startswith("0x"):
-                    signature = "0x" + signature
+                current_block_no = self.current_block_no
+                signature = self.obj_blockchain_utils.generate_signature(
+                    data_types=["string", "string", "string", "string", "uint256"],
+                    values=[PREFIX_FREE_CALL, username, org_id, service_id, current_block_no],
+                    signer_key=SIGNER_KEY)
+                self._record_free_call_signature(username, org_id, service_id, group_id)
                 return {
                     "snet-free-call-user-id": username,
                     "snet-payment-channel-signature-bin": signature,
@@ -133,22 +187,25 @@ class Signer:
             logger.error(repr(e))
             raise e
 
+    def _sign_claim_message(self, channel_id, nonce, amount):
+        data_types = ["string", "address", "uint256", "uint256", "uint256"]
+        values = ["__MPE_claim_message", self.mpe_address, channel_id, nonce, amount]
+        return self.obj_blockchain_utils.generate_signature(
+            data_types=data_types, values=values, signer_key=SIGNER_KEY)
+
+    def _sign_channel_state(self, channel_id, current_block_no):
+        data_types = ["string", "address", "uint256", "uint256"]
+        values = ["__get_channel_state", self.mpe_address, channel_id, current_block_no]
+        return self.obj_blockchain_utils.generate_signature(
+            data_types=data_types, values=values, signer_key=SIGNER_KEY)
+
     def signature_for_regular_call(self, user_data, channel_id, nonce, amount):
         """
             Method to generate signature for regular call.
         """
         try:
             username = user_data["authorizer"]["claims"]["email"]
-            data_types = ["string", "address", "uint256", "uint256", "uint256"]
-            values = [
-                "__MPE_claim_message",
-                self.mpe_address,
-                channel_id,
-                nonce,
-                amount,
-            ]
-            signature = self.obj_blockchain_utils.generate_signature(
-                data_types=data_types, values=values, signer_key=SIGNER_KEY)
+            signature = self._sign_claim_message(channel_id=channel_id, nonce=nonce, amount=amount)
             return {
                 "snet-payment-channel-signature-bin": signature,
                 "snet-payment-type": "escrow",
@@ -169,18 +226,11 @@ class Signer:
         """
         try:
             username = user_data["authorizer"]["claims"]["email"]
-            data_types = ["string", "address", "uint256", "uint256"]
-            values = [
-                "__get_channel_state",
-                self.mpe_address,
-                channel_id,
-                self.current_block_no,
-            ]
-            signature = self.obj_blockchain_utils.generate_signature(
-                data_types=data_types, values=values, signer_key=SIGNER_KEY)
+            current_block_no = self.current_block_no
+            signature = self._sign_channel_state(channel_id=channel_id, current_block_no=current_block_no)
             return {
                 "signature": signature,
-                "snet-current-block-number": self.current_block_no,
+                "snet-current-block-number": current_block_no,
             }
         except Exception as e:
             logger.error(repr(e))
@@ -188,6 +238,46 @@ class Signer:
                 "Unable to generate signature for daemon call for username %s",
                 username)
 
+    def signatures_for_channels(self, user_data, signature_requests):
+        """
+            Method to generate regular call and state service signatures for many channels in one call.
+            Every signature of the batch is made against the same block number. The whole batch is validated
+            before any signature is made.
+        """
+        username = user_data["authorizer"]["claims"]["email"]
+        if not isinstance(signature_requests, list) or len(signature_requests) > SIGNATURE_BATCH_MAX_SIZE:
+            raise BadRequestException(f"At most {SIGNATURE_BATCH_MAX_SIZE} signatures can be requested at once")
+        for signature_request in signature_requests:
+            signature_type = signature_request.get("type") if isinstance(signature_request, dict) else None
+            if signature_type not in SIGNATURE_REQUEST_REQUIRED_KEYS:
+                raise BadRequestException(f"Invalid signature type {signature_type} requested by username {username}")
+            if not validate_dict(signature_request, SIGNATURE_REQUEST_REQUIRED_KEYS[signature_type]):
+                raise BadRequestException(f"Missing parameters for {signature_type} signature")
+        current_block_no = self.current_block_no
+        signatures = []
+        for signature_request in signature_requests:
+            signature_type = signature_request.get("type")
+            channel_id = signature_request["channel_id"]
+            if signature_type == "regular-call":
+                signature = self._sign_claim_message(channel_id=channel_id, nonce=signature_request["nonce"],
+                                                     amount=signature_request["amount"])
+                signatures.append({
+                    "snet-payment-channel-signature-bin": signature,
+                    "snet-payment-type": "escrow",
+                    "snet-payment-channel-id": channel_id,
+                    "snet-payment-channel-nonce": signature_request["nonce"],
+                    "snet-payment-channel-amount": signature_request["amount"],
+                    "snet-current-block-number": current_block_no,
+                })
+            else:
+                signature = self._sign_channel_state(channel_id=channel_id, current_block_no=current_block_no)
+                signatures.append({
+                    "signature": signature,
+                    "snet-payment-channel-id": channel_id,
+                    "snet-current-block-number": current_block_no,
+                })
+        return signatures
+
     def signature_for_open_channel_for_third_party(self, recipient, group_id, amount_in_cogs, expiration, message_nonce,
                                                    sender_private_key, executor_wallet_address):
         data_types = ["string", "address", "address", "address", "address", "bytes32", "uint256", "uint256",
@@ -200,7 +290,7 @@ class Signer:
         return {"r": r, "s": s, "v": v, "signature": signature}
 
     def _is_free_call_available(self, email, token_for_free_call, expiry_date_block, signature,
-                               current_block_number,daemon_endpoint):
+                               current_block_number,daemon_endpoint, timeout=DAEMON_CALL_TIMEOUT):
 
         request = state_service_pb2.FreeCallStateRequest()
         request.user_id = email
@@ -209,52 +299,28 @@ class Signer:
         request.signature = signature
         request.current_block = current_block_number
 
-        endpoint_object = urlparse(daemon_endpoint)
-        if endpoint_object.port is not None:
-            channel_endpoint = endpoint_object.hostname + ":" + str(endpoint_object.port)
-        else:
-            channel_endpoint = endpoint_object.hostname
-
-        if endpoint_object.scheme == "http":
-            channel = grpc.insecure_channel(channel_endpoint)
-        elif endpoint_object.scheme == "https":
-            channel = grpc.secure_channel(channel_endpoint, grpc.ssl_channel_credentials())
-        else:
-            raise ValueError('Unsupported scheme in service metadata ("{}")'.format(endpoint_object.scheme))
-
+        channel = Signer._daemon_channel_pool.get_channel(daemon_endpoint)
         stub = state_service_pb2_grpc.FreeCallStateServiceStub(channel)
-        response = stub.GetFreeCallsAvailable(request)
+        try:
+            response = stub.GetFreeCallsAvailable(request, timeout=timeout)
+        except grpc.RpcError:
+            Signer._daemon_channel_pool.discard(daemon_endpoint)
+            raise
         if response.free_calls_available >0:
             return True
         return False
 
 
     def _get_daemon_endpoint_for_group(self,org_id,service_id,group_id):
-        lambda_payload = {
-            "httpMethod": "GET",
-            "pathParameters": {
-                "orgId": org_id,
-                "serviceId": service_id
-            },
-        }
-        response = self.lambda_client.invoke(
-            FunctionName=GET_SERVICE_DETAILS_FOR_GIVEN_ORG_ID_AND_SERVICE_ID_ARN,
-            InvocationType="RequestResponse",
-            Payload=json.dumps(lambda_payload),
-        )
-        response_body_raw = json.loads(response.get("Payload").read())["body"]
-        get_service_response = json.loads(response_body_raw)
-        if get_service_response["status"] == "success":
-            groups_data = get_service_response["data"].get("groups", [])
-            for group_data in groups_data:
-                if group_data["group_id"] == group_id:
-                    return group_data["endpoints"][0]["endpoint"]
+        group_data = self._get_service_groups(org_id, service_id, group_id).get(group_id, None)
+        if group_data is not None and len(group_data.get("endpoints", [])) > 0:
+            return group_data["endpoints"][0]["endpoint"]
         raise Exception("Unable to fetch daemon Endpoint information for service %s under organization %s for %s group.",
                         service_id, org_id, group_id)
 
-    def token_for_free_call(self, email, org_id, service_id, group_id,user_public_key):
+    def token_for_free_call(self, email, org_id, service_id, group_id,user_public_key, timeout=DAEMON_CALL_TIMEOUT):
         signer_public_key_checksum = Web3.toChecksumAddress(SIGNER_ADDRESS)
-        current_block_number = self.obj_blockchain_utils.get_current_block_no()
+        current_block_number = self.current_block_no
         expiry_date_block = current_block_number + FREE_CALL_EXPIRY
         token_for_free_call = self.obj_blockchain_utils.generate_signature_bytes(["string", "address", "uint256"],
                                                                                  [email, signer_public_key_checksum,
@@ -271,8 +337,15 @@ class Signer:
         daemon_endpoint = self._get_daemon_endpoint_for_group(org_id, service_id, group_id)
         logger.info(f"Got daemon endpoint {daemon_endpoint} for org {org_id} service {service_id} group {group_id}")
 
-        if self._is_free_call_available(email, token_for_free_call, expiry_date_block, signature,
-                                        current_block_number, daemon_endpoint):
+        try:
+            is_free_call_available = self._is_free_call_available(email, token_for_free_call, expiry_date_block,
+                                                                  signature, current_block_number, daemon_endpoint,
+                                                                  timeout=timeout)
+        except Exception:
+            # the daemon may have moved, read the service groups again on the next request
+            self.invalidate_service_groups(org_id, service_id)
+            raise
+        if is_free_call_available:
 
             token_with_expiry_for_free_call = self.obj_blockchain_utils.generate_signature_bytes(
                 ["string", "address", "uint256"],
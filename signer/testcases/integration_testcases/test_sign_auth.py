@@ -1,13 +1,30 @@
 import unittest
+from unittest.mock import patch
 
 from eth_account.messages import defunct_hash_message
 from web3.auto import w3
 import web3
 
+from signer.authenticators.daemon_authenticator import DaemonAuthenticator
+from signer.config import NETWORKS, NET_ID
+from signer.constant import AUTH_KEYS_CACHE_TTL
 from signer.signature_authenticator import main
 
 
 class TestSignAuth(unittest.TestCase):
+    def setUp(self):
+        DaemonAuthenticator._public_keys_cache = {}
+        self.event = {
+            'headers': {
+                'x-username': 'test-user',
+                'x-organizationid': 'snet',
+                'x-groupid': 'cOyJHJdvvig73r+o8pijgMDcXOX+bt8LkvIeQbufP7g=',
+                'x-serviceid': 'example-service',
+                'x-currentblocknumber': 1234,
+                'x-signature': 'h9Ssz1bi+aT4NKERkGqJOfx2E9/4Y9czj+YNr4XzXDcnlay37v9Jfown278MFF+VrKsz1r1Ip/CeppwtjhiBtAA='
+            },
+            'methodArn': 'abc'
+        }
 
     def test_generate_sign(self):
         username = 'test-user'
@@ -30,6 +47,42 @@ class TestSignAuth(unittest.TestCase):
         response = main(event, None)
         # assert response['policyDocument']['Statement'][0]['Effect'] == 'Allow'
 
+    @patch("signer.authenticators.daemon_authenticator.repo.execute")
+    def test_public_keys_are_served_from_cache_until_they_expire(self, mock_execute):
+        mock_execute.return_value = [{'public_key': '0x123'}]
+        authenticator = DaemonAuthenticator(self.event, NETWORKS, NET_ID)
+        with patch("signer.authenticators.daemon_authenticator.time.monotonic", return_value=1000):
+            assert authenticator.get_public_keys() == ['0x123']
+        mock_execute.return_value = [{'public_key': '0x456'}]
+        with patch("signer.authenticators.daemon_authenticator.time.monotonic",
+                   return_value=1000 + AUTH_KEYS_CACHE_TTL - 1):
+            assert DaemonAuthenticator(self.event, NETWORKS, NET_ID).get_public_keys() == ['0x123']
+        assert mock_execute.call_count == 1
+        with patch("signer.authenticators.daemon_authenticator.time.monotonic",
+                   return_value=1000 + AUTH_KEYS_CACHE_TTL):
+            assert DaemonAuthenticator(self.event, NETWORKS, NET_ID).get_public_keys() == ['0x456']
+        assert mock_execute.call_count == 2
+
+    @patch("signer.authenticators.daemon_authenticator.DaemonAuthenticator.verify_current_block_number")
+    @patch("signer.signature_authenticator.extract_public_key")
+    @patch("signer.authenticators.daemon_authenticator.repo.execute")
+    def test_public_keys_are_refreshed_when_the_signer_is_not_cached(self, mock_execute, mock_extract_public_key,
+                                                                     mock_verify_current_block_number):
+        mock_verify_current_block_number.return_value = True
+        mock_extract_public_key.return_value = '0x456'
+        mock_execute.return_value = [{'public_key': '0x123'}]
+        DaemonAuthenticator(self.event, NETWORKS, NET_ID).get_public_keys()
+
+        mock_execute.return_value = [{'public_key': '0x123'}, {'public_key': '0x456'}]
+        response = main(self.event, None)
+        assert response['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+        assert mock_execute.call_count == 2
+
+        mock_extract_public_key.return_value = '0x789'
+        response = main(self.event, None)
+        assert response['policyDocument']['Statement'][0]['Effect'] == 'Deny'
+        assert mock_execute.call_count == 3
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,13 +2,18 @@ import json
 import unittest
 from unittest.mock import patch
 
+from common.block_height import BlockHeightCache
 from signer import lambda_handler
+from signer.config import NET_ID
+from signer.constant import FREE_CALL_USAGE_CACHE_MARGIN, SIGNATURE_BATCH_MAX_SIZE
 from signer.lambda_handler import get_free_call_signer_address
+from signer.signers import Signer
 
 
 class TestSignUPAPI(unittest.TestCase):
     def setUp(self):
-        pass
+        BlockHeightCache._caches = {}
+        lambda_handler.signer = None
 
     @patch("common.utils.Utils.report_slack")
     def test_signature_for_free_call(self, report_slack_mock):
@@ -96,6 +101,67 @@ class TestSignUPAPI(unittest.TestCase):
         assert (response_body["data"]["snet-current-block-number"] ==
                 mock_current_block_no.return_value)
 
+    @patch("common.utils.Utils.report_slack")
+    @patch("common.blockchain_util.BlockChainUtil.get_current_block_no")
+    @patch("common.blockchain_util.BlockChainUtil.read_contract_address")
+    @patch("boto3.client")
+    def test_batch_signatures(self, mock_boto_client, mock_read_contract_address, mock_current_block_no,
+                              mock_report_slack):
+        batch_signatures = {
+            "path": "/signer/batch-signatures",
+            "httpMethod": "POST",
+            "body": '{"signatures": [{"type": "regular-call", "channel_id": 1, "nonce": 6487832, "amount": 1}, '
+                    '{"type": "state-service", "channel_id": 1}]}',
+            "requestContext": {
+                "stage": "ropsten",
+                "authorizer": {
+                    "claims": {
+                        "email": "dummy@dummy.com"
+                    }
+                },
+            },
+        }
+        mock_current_block_no.return_value = 6521925
+        mock_read_contract_address.return_value = "0x8FB1dC8df86b388C7e00689d1eCb533A160B4D0C"
+        response = lambda_handler.request_handler(event=batch_signatures, context=None)
+        assert response["statusCode"] == 200
+        response_body = json.loads(response["body"])
+        assert response_body["status"] == "success"
+        regular_call_signature, state_service_signature = response_body["data"]
+        assert (
+                regular_call_signature["snet-payment-channel-signature-bin"] ==
+                "0x505dec3d328eced279a2953e7ba614936a239fb558c80615ff1c97115f8b76ea0530dc47acab7bca8c1dd4563f0299d9b1f61933902919097d82eb0eeb12cb501c"
+        )
+        assert (
+                state_service_signature["signature"] ==
+                "0xf4fad486513c6e514869a2af9423de3c1e03c9953b4cd79c4d78f7f8f54da1a01812d7c58120c038ead631e2462ab788746972cad46f4e7f2f1bd79b863b54681c"
+        )
+        assert (state_service_signature["snet-current-block-number"] == mock_current_block_no.return_value)
+
+    @patch("common.utils.Utils.report_slack")
+    @patch("common.blockchain_util.BlockChainUtil.get_current_block_no")
+    @patch("common.blockchain_util.BlockChainUtil.read_contract_address")
+    @patch("boto3.client")
+    def test_invalid_batch_signatures_are_bad_requests(self, mock_boto_client, mock_read_contract_address,
+                                                       mock_current_block_no, mock_report_slack):
+        mock_current_block_no.return_value = 6521925
+        mock_read_contract_address.return_value = "0x8FB1dC8df86b388C7e00689d1eCb533A160B4D0C"
+        for signatures in [
+            [{"type": "state-service", "channel_id": 1}] * (SIGNATURE_BATCH_MAX_SIZE + 1),
+            [{"type": "free-call", "channel_id": 1}],
+            [{"type": "regular-call", "channel_id": 1, "nonce": 6487832}]
+        ]:
+            batch_signatures = {
+                "path": "/signer/batch-signatures",
+                "httpMethod": "POST",
+                "body": json.dumps({"signatures": signatures}),
+                "requestContext": {"stage": "ropsten", "authorizer": {"claims": {"email": "dummy@dummy.com"}}},
+            }
+            response = lambda_handler.request_handler(event=batch_signatures, context=None)
+            assert response["statusCode"] == 400
+        mock_current_block_no.assert_not_called()
+        mock_report_slack.assert_not_called()
+
     @patch("common.utils.Utils.report_slack")
     @patch("common.blockchain_util.BlockChainUtil.get_current_block_no")
     @patch("common.blockchain_util.BlockChainUtil.read_contract_address")
@@ -152,3 +218,46 @@ class TestSignUPAPI(unittest.TestCase):
     def test_token_for_free_call(self):
         pass
 
+
+    @patch("signer.signers.Signer._get_total_calls_made")
+    @patch("signer.signers.Signer._fetch_service_groups")
+    @patch("common.blockchain_util.BlockChainUtil.read_contract_address")
+    @patch("boto3.client")
+    def test_free_calls_allowed_is_served_from_cache(self, mock_boto_client, mock_read_contract_address,
+                                                     mock_fetch_service_groups, mock_get_total_calls_made):
+        mock_read_contract_address.return_value = "0x8FB1dC8df86b388C7e00689d1eCb533A160B4D0C"
+        mock_fetch_service_groups.return_value = {
+            "test_group_id": {"group_id": "test_group_id", "free_calls": FREE_CALL_USAGE_CACHE_MARGIN + 2,
+                              "endpoints": [{"endpoint": "https://dummy.io:8088"}]}}
+        mock_get_total_calls_made.return_value = 0
+        Signer.invalidate_service_groups("test_org_id", "test_service_id")
+        Signer._free_call_usage_cache = {}
+        signer = Signer(net_id=NET_ID)
+        for _ in range(2):
+            assert signer._free_calls_allowed("dummy@dummy.com", "test_org_id", "test_service_id", "test_group_id")
+            signer._record_free_call_signature("dummy@dummy.com", "test_org_id", "test_service_id", "test_group_id")
+        assert signer._get_daemon_endpoint_for_group("test_org_id", "test_service_id",
+                                                     "test_group_id") == "https://dummy.io:8088"
+        assert mock_fetch_service_groups.call_count == 1
+        assert mock_get_total_calls_made.call_count == 1
+        # the estimate leaves no more than the margin, metering is called again
+        mock_get_total_calls_made.return_value = FREE_CALL_USAGE_CACHE_MARGIN + 2
+        assert not signer._free_calls_allowed("dummy@dummy.com", "test_org_id", "test_service_id", "test_group_id")
+        assert mock_get_total_calls_made.call_count == 2
+
+    @patch("signer.signers.FREE_CALL_USAGE_CACHE_MAX_SIZE", 2)
+    @patch("signer.signers.Signer._get_total_calls_made")
+    @patch("signer.signers.Signer._fetch_service_groups")
+    @patch("common.blockchain_util.BlockChainUtil.read_contract_address")
+    @patch("boto3.client")
+    def test_free_call_usage_cache_is_bounded(self, mock_boto_client, mock_read_contract_address,
+                                              mock_fetch_service_groups, mock_get_total_calls_made):
+        mock_read_contract_address.return_value = "0x8FB1dC8df86b388C7e00689d1eCb533A160B4D0C"
+        mock_fetch_service_groups.return_value = {"test_group_id": {"group_id": "test_group_id", "free_calls": 10}}
+        mock_get_total_calls_made.return_value = 0
+        Signer.invalidate_service_groups("test_org_id", "test_service_id")
+        Signer._free_call_usage_cache = {}
+        signer = Signer(net_id=NET_ID)
+        for username in ["first@dummy.com", "second@dummy.com", "third@dummy.com"]:
+            signer._free_calls_allowed(username, "test_org_id", "test_service_id", "test_group_id")
+        assert sorted(key[0] for key in Signer._free_call_usage_cache) == ["second@dummy.com", "third@dummy.com"]
@@ -0,0 +1,30 @@
+"""channel transaction history order id index
+
+Revision ID: 5a9e2c7d1b4f
+Revises: d35eb13038d8
+Create Date: 2026-10-18 14:05:22.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9e2c7d1b4f'
+down_revision = 'd35eb13038d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute("""
+            CREATE INDEX `idx_channel_txn_history_order_id` ON `channel_transaction_history` (`order_id`)
+        """)
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute("""
+            DROP INDEX `idx_channel_txn_history_order_id` ON `channel_transaction_history`
+        """)
@@ -50,6 +50,14 @@ class ChannelDAO:
         transaction_history = self.repo.execute(query, order_id)
         return transaction_history
 
+    def get_channel_transactions_against_order_ids(self, order_ids):
+        if len(order_ids) == 0:
+            return []
+        query = "SELECT order_id, amount, currency, type, address, transaction_hash, status, row_created as created_at " \
+                "FROM channel_transaction_history WHERE order_id IN (" + ",".join(["%s"] * len(order_ids)) + ")"
+        transaction_history = self.repo.execute(query, order_ids)
+        return transaction_history
+
     def persist_create_channel_event(self, payload, created_at):
         query = "INSERT INTO create_channel_event (payload, row_created, row_updated, status)" \
                 "VALUES (%s, %s, %s, %s)"
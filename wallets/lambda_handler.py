@@ -51,6 +51,7 @@ def route_path(path, method, payload_dict, path_parameters):
 
     elif "/wallet/channel/transactions" == path and method == 'GET':
         order_id = payload_dict.get('order_id', None)
+        order_ids = payload_dict.get('order_ids', None)
         username = payload_dict.get('username', None)
         org_id = payload_dict.get('org_id', None)
         group_id = payload_dict.get('group_id', None)
@@ -60,6 +61,10 @@ def route_path(path, method, payload_dict, path_parameters):
 
             response_data = wallet_manager.get_channel_transactions_against_order_id(
                 order_id=payload_dict["order_id"])
+        elif order_ids is not None:
+            logger.info(f"Received request to fetch transactions against order_ids: {order_ids}")
+            response_data = wallet_manager.get_channel_transactions_against_order_ids(
+                order_ids=[order_id for order_id in order_ids.split(",") if order_id])
         elif username is not None and group_id is not None and org_id is not None:
             logger.info(f"Received request to fetch transactions for username: {username} "
                         f"group_id: {group_id} "
@@ -229,6 +229,21 @@ class WalletService:
             "transactions": transaction_history
         }
 
+    def get_channel_transactions_against_order_ids(self, order_ids):
+        """
+            Returns the transactions of every order in one query, keyed by the order ids as requested. Order ids
+            are compared case insensitively, like the database collation does, and every record keeps its stored
+            order_id like the records of get_channel_transactions_against_order_id.
+        """
+        transactions = {order_id: [] for order_id in order_ids}
+        transactions_by_order_id = {order_id.lower(): transactions[order_id] for order_id in order_ids}
+        for record in self.channel_dao.get_channel_transactions_against_order_ids(order_ids):
+            record["created_at"] = record["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+            order_transactions = transactions_by_order_id.get(record["order_id"].lower(), None)
+            if order_transactions is not None:
+                order_transactions.append(record)
+        return {"transactions": transactions}
+
     def __validate__cogs(self, amount_in_cogs):
         if amount_in_cogs < MINIMUM_AMOUNT_IN_COGS_ALLOWED:
             raise Exception("Insufficient amount to buy minimum amount in cogs allowed.")
@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime as dt
 from unittest.mock import patch
 
 from common.repository import Repository
@@ -63,6 +64,21 @@ class TestWalletService(unittest.TestCase):
         else:
             assert False
 
+    @patch("wallets.dao.channel_dao.ChannelDAO.get_channel_transactions_against_order_ids")
+    def test_get_channel_transactions_against_order_ids(self, mock_get_channel_transactions_against_order_ids):
+        mock_get_channel_transactions_against_order_ids.return_value = [
+            {"order_id": "ORDER-1", "amount": 1, "currency": "USD", "type": "openChannelByThirdParty",
+             "address": "0x123", "transaction_hash": "0x345", "status": "SUCCESS",
+             "created_at": dt(2019, 10, 18, 9, 59, 13)}
+        ]
+        response = self.wallet_service.get_channel_transactions_against_order_ids(["order-1", "order-2"])
+        assert (response == {"transactions": {
+            "order-1": [{"order_id": "ORDER-1", "amount": 1, "currency": "USD", "type": "openChannelByThirdParty",
+                         "address": "0x123", "transaction_hash": "0x345", "status": "SUCCESS",
+                         "created_at": "2019-10-18 09:59:13"}],
+            "order-2": []
+        }})
+
     def tearDown(self):
         self.repo.execute("DELETE FROM wallet")
         self.repo.execute("DELETE FROM user_wallet")